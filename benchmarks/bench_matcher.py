@@ -0,0 +1,86 @@
+"""
+Benchmark single transaction categorisation with CategoryMatcher.
+
+Measures per-transaction latency of:
+-CategoryMatcher.categorise without cache (every pair matched)
+-CategoryMatcher.categorise with cache (repeated pairs)
+-categorise_data called with one-row DataFrame, for comparison
+
+Usage:
+    python benchmarks/bench_matcher.py [--transactions 10000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# pylint: disable=wrong-import-position
+from config import CATEGORIES_MAPPING
+from utils.matcher_handling import CategoryMatcher
+
+
+def sample_transactions(categories: dict, count: int) -> list[tuple[str, str]]:
+    """
+    Return (contractor, title) pairs built from mapping keys and unknown values.
+    """
+    contractors = list(categories["Contractor"]) + ["Kiosk", "Sklep 24h"]
+    titles = list(categories["Title"]) + ["Płatność kartą", "Przelew"]
+    generator = random.Random(0)
+    return [
+        (f" {generator.choice(contractors)} ", f"{generator.choice(titles)} 01.02")
+        for _ in range(count)
+    ]
+
+
+def per_transaction_us(function, transactions: list[tuple[str, str]]) -> float:
+    """
+    Return mean time of 'function(contractor, title)' in microseconds.
+    """
+    start = time.perf_counter()
+    for contractor, title in transactions:
+        function(contractor, title)
+    return (time.perf_counter() - start) / len(transactions) * 1e6
+
+
+def main() -> None:
+    """
+    Print matcher benchmark results.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark CategoryMatcher")
+    parser.add_argument("--transactions", type=int, default=10_000)
+    parser.add_argument("--mapping", default=os.path.join(ROOT, CATEGORIES_MAPPING))
+    args = parser.parse_args()
+
+    with open(args.mapping, "r", encoding="utf-8") as file:
+        categories = json.load(file)
+    transactions = sample_transactions(categories, args.transactions)
+
+    uncached = CategoryMatcher(categories, cache_size=0)
+    uncached_us = per_transaction_us(uncached.categorise, transactions)
+    print(f"matcher, no cache: {uncached_us:.2f} us")
+    cached = CategoryMatcher(categories)
+    cached.categorise_many(transactions)
+    cached_us = per_transaction_us(cached.categorise, transactions)
+    print(f"matcher, cached:   {cached_us:.2f} us")
+
+    # pylint: disable=import-outside-toplevel
+    import pandas as pd
+
+    from utils.parallel_handling import categorise_data
+
+    def categorise_frame(contractor: str, title: str) -> str:
+        data = pd.DataFrame({"Dane kontrahenta": [contractor], "Tytuł": [title]})
+        return categorise_data(data, categories)["category"].iloc[0]
+
+    frame_us = per_transaction_us(categorise_frame, transactions[:100])
+    print(f"one-row DataFrame: {frame_us:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
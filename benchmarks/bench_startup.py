@@ -0,0 +1,86 @@
+"""
+Benchmark start-up time of main.py.
+
+Measures:
+-cumulative import time of 'main' module reported by 'python -X importtime'
+-wall time of 'python main.py' run with empty input folder (nothing to do)
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 5]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module: str = "main") -> dict[str, int]:
+    """
+    Run 'python -X importtime -c "import module"' and return
+    cumulative import time in microseconds per imported module.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def nothing_to_do_time() -> float:
+    """
+    Return wall time in seconds of 'python main.py' with empty input folder.
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.makedirs(os.path.join(work_dir, "files", "input"))
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, os.path.join(ROOT, "main.py")],
+            cwd=work_dir,
+            capture_output=True,
+            check=True,
+        )
+        return time.perf_counter() - start
+
+
+def main() -> None:
+    """
+    Print start-up benchmark results.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark start-up of main.py")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.repeat)]
+    totals = [run["main"] for run in runs]
+    print(f"import main (cumulative): median {statistics.median(totals) / 1000:.1f} ms")
+    heavy = [name for name in ("pandas", "numpy") if name in runs[-1]]
+    print(f"heavy modules imported: {', '.join(heavy) or 'none'}")
+
+    print(f"top {args.top} modules by cumulative import time:")
+    for name, cumulative in sorted(
+        runs[-1].items(), key=lambda item: item[1], reverse=True
+    )[: args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    walls = [nothing_to_do_time() for _ in range(args.repeat)]
+    print(f"main.py nothing to do (wall): median {statistics.median(walls) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
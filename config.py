@@ -15,3 +15,92 @@ FIELD_MAPPING = os.path.join(FILES_FOLDER, MAPPING_FOLDER, "field_mapping.json")
 UNCATEGORISED = os.path.join(FILES_FOLDER, "uncategorised")
 INTPUT_FOLDER = os.path.join(FILES_FOLDER, "input")
 OUTPUT_FOLDER = os.path.join(FILES_FOLDER, "output")
+
+# Parallel categorisation. Smaller files are categorised in a single process
+PARALLEL_MIN_ROWS = 50_000
+PARALLEL_WORKERS = None  # None -> number of CPUs
+
+# Optional SQLite store with history of categorised transactions
+USE_STORE = False
+STORE_FILE = os.path.join(FILES_FOLDER, "store", "transactions.sqlite")
+
+# Monthly summary saved in output folder. Merge mode for months already summarised: "replace" or "add".
+# Not used with deduplication: contribution of each input file is replaced instead
+SUMMARY_BY_CONTRACTOR = False
+SUMMARY_MERGE_MODE = "replace"
+
+# Number of suggested categories for each uncategorised value
+SUGGESTIONS_TOP_K = 3
+
+# Streaming mode. Chunk size is derived from memory budget and sample of rows
+STREAM = False
+STREAM_MEMORY_BUDGET_MB = 64
+STREAM_SAMPLE_ROWS = 1000
+# Distinct uncategorised (and categorised, for suggestions) values kept per field
+# in streaming mode. Memory of uncategorised reports depends on it, not on rows
+STREAM_MAX_VALUES = 100_000
+
+# Cache of transformed input data, keyed by input file content and transform parameters
+CACHE_FOLDER = os.path.join(FILES_FOLDER, "cache")
+SNAPSHOT_CACHE = True
+SNAPSHOT_FOLDER = os.path.join(CACHE_FOLDER, "snapshots")
+SNAPSHOT_CACHE_MAX_MB = 512
+
+# Incremental re-categorisation. Per-row categories of last run are saved next to output
+INCREMENTAL = True
+CATEGORY_STATE = os.path.join(OUTPUT_FOLDER, "output_categories")
+
+# Accounts kept in output. With partitioning each account gets its own output files
+ACCOUNTS = ["KONTO Direct - KD"]
+PARTITION_BY_ACCOUNT = False
+
+# Transaction date format in input file. With partitioning each month gets its own output Excel file
+DATE_FORMAT = "%d.%m.%Y"
+PARTITION_BY_MONTH = False
+
+# Deduplication of transactions from overlapping exports, by hash of identifying fields
+DEDUP = True
+DEDUP_INDEX = os.path.join(FILES_FOLDER, "dedup", "hash_index.npz")
+
+# Cache of whole run results, keyed by input file, mapping files, run parameters and code version
+RESULT_CACHE = True
+RESULT_FOLDER = os.path.join(CACHE_FOLDER, "results")
+RESULT_CACHE_MAX_MB = 256
+
+# Rule statistics accumulated across runs and report of rules which never fire or are always overwritten
+RULE_STATS = False
+RULE_STATS_FILE = os.path.join(FILES_FOLDER, "stats", "rule_stats.json")
+RULE_REPORT_FILE = os.path.join(FILES_FOLDER, "stats", "rule_report.json")
+
+# Evaluate rules from the highest priority down and stop at deciding rule. Rules with the same
+# category are ordered by hits from rule statistics file. Not used when rule statistics are collected
+EARLY_EXIT = True
+
+# Local categorisation service (service.py)
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+SERVICE_WORKERS = 4
+SERVICE_QUEUE_SIZE = 16
+SERVICE_BATCH_SIZE = 1000
+SERVICE_MAX_BODY_MB = 64
+
+# File-based work queue (main.py --worker). Claimed input files are moved to 'processing',
+# then to 'done' or 'failed' subfolders of input folder. Lease not renewed for QUEUE_LEASE_SECONDS expires
+QUEUE_LEASE_SECONDS = 300
+
+# Dry run (main.py --dry-run --sample): rows sampled for each stratum when only coverage is estimated
+DRY_RUN_SAMPLE_SIZE = 10_000
+
+# Memory profiling of pipeline stages (tracemalloc and RSS). Report of each run and history line
+# are saved in MEMORY_PROFILE_FOLDER
+PROFILE_FOLDER = os.path.join(FILES_FOLDER, "profiles")
+MEMORY_PROFILE = False
+MEMORY_PROFILE_FOLDER = PROFILE_FOLDER
+MEMORY_PROFILE_TOP = 10
+
+# CPU profiling of each processed file (main.py --profile): None, "cprofile" or "sample".
+# Environment variable CPU_PROFILE_ENV overrides the default. '.pstats' and '.collapsed' files are saved
+# in PROFILE_FOLDER
+CPU_PROFILE = None
+CPU_PROFILE_ENV = "ING_PROFILE"
+CPU_PROFILE_INTERVAL = 0.005
@@ -1,41 +1,96 @@
 """
 Process banking transactions files.
+
+Heavy modules (pandas, numpy) are imported only when a transaction file is
+processed, so importing this module and runs with nothing to do stay fast.
 """
 
+import argparse
+import contextlib
 import logging
 import os
 import json
-
-import pandas as pd
+from collections.abc import Callable
+from contextlib import AbstractContextManager
 
 
 from log_config.logging_config import setup_root_logger
-from utils.data_handling import (
-    transform_data,
-    categorise_contractor,
-    categorise_title,
-    start_with_no_category,
-    no_category_dict,
-)
 from utils.file_handling import (
+    is_transaction_file,
     get_transaction_file,
-    read_csv_file,
-    verify_csv_file,
     InvalidCSVFileError,
 )
+from utils.memory_handling import MemoryProfiler
+from utils.profile_handling import CpuProfiler, PROFILE_MODES
+from utils.queue_handling import WorkQueue
 from config import (
     TASK_NAME,
     LOGS_FOLDER,
-    FILES_FOLDER,
     CATEGORIES_MAPPING,
     FIELD_MAPPING,
     UNCATEGORISED,
     INTPUT_FOLDER,
     OUTPUT_FOLDER,
+    PARALLEL_MIN_ROWS,
+    PARALLEL_WORKERS,
+    USE_STORE,
+    STORE_FILE,
+    SUMMARY_BY_CONTRACTOR,
+    SUMMARY_MERGE_MODE,
+    SUGGESTIONS_TOP_K,
+    STREAM,
+    STREAM_MEMORY_BUDGET_MB,
+    STREAM_MAX_VALUES,
+    STREAM_SAMPLE_ROWS,
+    SNAPSHOT_CACHE,
+    SNAPSHOT_FOLDER,
+    SNAPSHOT_CACHE_MAX_MB,
+    INCREMENTAL,
+    CATEGORY_STATE,
+    ACCOUNTS,
+    PARTITION_BY_ACCOUNT,
+    DATE_FORMAT,
+    PARTITION_BY_MONTH,
+    DEDUP,
+    DEDUP_INDEX,
+    RESULT_CACHE,
+    RESULT_FOLDER,
+    RESULT_CACHE_MAX_MB,
+    RULE_STATS,
+    RULE_STATS_FILE,
+    RULE_REPORT_FILE,
+    EARLY_EXIT,
+    QUEUE_LEASE_SECONDS,
+    DRY_RUN_SAMPLE_SIZE,
+    MEMORY_PROFILE,
+    MEMORY_PROFILE_FOLDER,
+    MEMORY_PROFILE_TOP,
+    PROFILE_FOLDER,
+    CPU_PROFILE,
+    CPU_PROFILE_ENV,
+    CPU_PROFILE_INTERVAL,
 )
 
+logger = logging.getLogger(__name__)
+
 
-def process_transaction_file(file_path, logger: logging.Logger) -> None:
+def process_transaction_file(
+    file_path,
+    logger: logging.Logger,
+    stream: bool = False,
+    memory_budget_mb: float = STREAM_MEMORY_BUDGET_MB,
+    snapshot: bool = SNAPSHOT_CACHE,
+    incremental: bool = INCREMENTAL,
+    partition_by_account: bool = PARTITION_BY_ACCOUNT,
+    partition_by_month: bool = PARTITION_BY_MONTH,
+    dedup: bool = DEDUP,
+    result_cache: bool = RESULT_CACHE,
+    rule_stats: bool = RULE_STATS,
+    early_exit: bool = EARLY_EXIT,
+    output_lock: Callable[[], AbstractContextManager] = contextlib.nullcontext,
+    file_outputs: bool = False,
+    profiler: MemoryProfiler | None = None,
+) -> list[str]:
     """
     Process banking transactions.
 
@@ -43,11 +98,91 @@ def process_transaction_file(file_path, logger: logging.Logger) -> None:
     ---------
     file_path: str
         Transaction file path.
+    stream: bool
+        Streaming mode. Chunks are transformed, categorised and written
+        one by one, so the whole file is never held in memory.
+    memory_budget_mb: float
+        Memory budget used to size chunks in streaming mode.
+    snapshot: bool
+        Load transformed data from snapshot cache if input file and transform
+        parameters did not change. Not used in streaming mode.
+    incremental: bool
+        Reuse per-row categories of previous run for the same input file and
+        categorise again only rows affected by changed mapping keys.
+        Not used in streaming mode.
+    partition_by_account: bool
+        Write separate outputs for each account from 'ACCOUNTS'.
+        Otherwise all accounts from 'ACCOUNTS' are written to one output.
+    partition_by_month: bool
+        Write separate output Excel file for each month of transaction date.
+    dedup: bool
+        Drop transactions already processed from other (overlapping) files.
+        Hash index is updated after all outputs are saved.
+    result_cache: bool
+        Restore outputs of previous run with the same input file, mapping
+        files, parameters and code instead of processing file again.
+        Not used with transaction store, which needs rows to be appended.
+    rule_stats: bool
+        Count hits of each mapping rule in the matching pass and add them to
+        rule statistics file. Needs full categorisation, so incremental
+        re-categorisation and result cache are not used.
+    early_exit: bool
+        Evaluate rules from the highest priority down and stop at the rule
+        which decides category. Rules with the same category are ordered by
+        hits from rule statistics file. Not used when 'rule_stats' is set,
+        because then every match is counted.
+    output_lock: Callable
+        Returns context manager held while shared files (outputs, summary,
+        hash index, statistics, result cache) are written, so several
+        workers do not merge them at the same time.
+    file_outputs: bool
+        Add input file name to names of output and uncategorised files, so
+        files processed one after another (work queue) do not overwrite
+        outputs of each other. Summary is still merged into one file.
+    profiler: MemoryProfiler | None
+        Records memory use of pipeline stages (CSV parse, transformation,
+        concatenation, categorisation, output writing).
 
     Returns
     -------
-    None
+    list[str]
+        Paths of written output, summary and uncategorised files.
     """
+    # pylint: disable=import-outside-toplevel,too-many-locals,too-many-statements
+    import pandas as pd
+
+    from utils.cache_handling import (
+        file_hash,
+        snapshot_key,
+        save_snapshot,
+        load_snapshot,
+        evict_snapshots,
+    )
+    from utils.data_handling import transform_data, split_by_account
+    from utils.dedup_handling import HashIndex
+    from utils.file_handling import read_csv_file, verify_csv_file
+    from utils.incremental_handling import (
+        recategorise,
+        category_state_key,
+        save_category_state,
+        load_category_state,
+    )
+    from utils.output_handling import OutputWriter, output_suffix
+    from utils.parallel_handling import categorise_data
+    from utils.rule_stats_handling import (
+        update_rule_stats,
+        read_rule_stats,
+        save_rule_stats,
+        rule_report,
+    )
+    from utils.result_handling import (
+        result_key,
+        save_result,
+        restore_result,
+        evict_results,
+    )
+    from utils.store_handling import open_store, append_transactions
+    from utils.stream_handling import chunk_size_for_budget
 
     # Fields mapping
     with open(FIELD_MAPPING, "r", encoding="utf-8") as file:
@@ -69,87 +204,723 @@ def process_transaction_file(file_path, logger: logging.Logger) -> None:
         account_field,
     ]
 
-    csv_generator = read_csv_file(file_path, custom_separator=";", custom_chunksize=10)
-    verify_csv_file(csv_generator, mandatory_columns)
+    transform_parameters = {
+        "mandatory_fields": mandatory_columns,
+        "amount_field_name": amount_field,
+        "account_field_name": account_field,
+        "account_field_value": ACCOUNTS,
+        "date_field_name": transaction_date_field,
+        "date_format": DATE_FORMAT,
+    }
+
+    profiler = profiler or MemoryProfiler(enabled=False)
+    with profiler.stage("verify_csv"):
+        csv_generator = read_csv_file(
+            file_path, custom_separator=";", custom_chunksize=10
+        )
+        verify_csv_file(csv_generator, mandatory_columns)
+
+    with open(CATEGORIES_MAPPING, "r", encoding="utf-8") as file:
+        categories = json.load(file)
+
+    # Input file is hashed once for hash index, result and snapshot keys
+    input_hash = file_hash(file_path)
+    hash_index = (
+        HashIndex(DEDUP_INDEX, mandatory_columns, input_hash) if dedup else None
+    )
+    # Deduplicated run adds only rows new to the index, so summary is merged
+    # per source file instead of replacing whole months
+    summary_source = hash_index.source if hash_index is not None else None
+
+    # Rule hits and wins of this run, filled by categorise_data
+    rule_counts = {} if rule_stats else None
+    early_exit = early_exit and not rule_stats
+    rule_hits = None
+    if early_exit and os.path.exists(RULE_STATS_FILE):
+        rule_hits = {
+            name: {key: rule["hits"] for key, rule in rules.items()}
+            for name, rules in read_rule_stats(RULE_STATS_FILE)["rules"].items()
+        }
+    categorised_rows = 0
+
+    result_folder = None
+    if result_cache and not USE_STORE and not rule_stats:
+        run_parameters = {
+            **transform_parameters,
+            # Streaming mode keeps bounded uncategorised values and splits
+            # outputs in chunks sized by memory budget
+            "stream": stream,
+            "memory_budget_mb": memory_budget_mb if stream else None,
+            "stream_max_values": STREAM_MAX_VALUES if stream else None,
+            "partition_by_account": partition_by_account,
+            "partition_by_month": partition_by_month,
+            "dedup": dedup,
+            "summary_by_contractor": SUMMARY_BY_CONTRACTOR,
+            "suggestions_top_k": SUGGESTIONS_TOP_K,
+            "output_folder": OUTPUT_FOLDER,
+            "uncategorised_folder": UNCATEGORISED,
+            "file_outputs": file_outputs,
+        }
+        result_folder = os.path.join(
+            RESULT_FOLDER,
+            result_key(
+                file_path,
+                [CATEGORIES_MAPPING, FIELD_MAPPING],
+                run_parameters,
+                input_hash,
+            ),
+        )
+        if hash_index is None or hash_index.known_source:
+            with output_lock():
+                restored = restore_result(
+                    result_folder, SUMMARY_MERGE_MODE, summary_source
+                )
+            if restored is not None:
+                logger.info("Outputs restored from result cache: %s", result_folder)
+                return restored
+
+    def categorised_chunks():
+        """
+        Yield categorised data. One chunk with all data in default mode,
+        chunks sized by memory budget in streaming mode.
+        """
+        if not stream:
+            snapshot_folder = None
+            all_data = None
+            key = snapshot_key(file_path, transform_parameters, input_hash)
+            if snapshot:
+                snapshot_folder = os.path.join(SNAPSHOT_FOLDER, key)
+                with profiler.stage("load_snapshot"):
+                    all_data = load_snapshot(snapshot_folder)
+
+            if all_data is None:
+                # Create 2nd generator. The 1st one exhausted 1 element for fiel verification
+                all_data = pd.DataFrame()
+                for chunk in profiler.iterate(
+                    "read_csv",
+                    read_csv_file(file_path, custom_separator=";", custom_chunksize=10),
+                ):
+                    with profiler.stage("transform_data"):
+                        data = transform_data(chunk, **transform_parameters)
+                    with profiler.stage("concat"):
+                        all_data = pd.concat([all_data, data], ignore_index=True)
+                if snapshot_folder:
+                    with profiler.stage("save_snapshot"):
+                        save_snapshot(snapshot_folder, all_data)
+                        evict_snapshots(SNAPSHOT_FOLDER, SNAPSHOT_CACHE_MAX_MB)
+            else:
+                logger.info("Transformed data loaded from: %s", snapshot_folder)
+
+            if hash_index is not None:
+                with profiler.stage("dedup"):
+                    all_data = hash_index.drop_seen(all_data)
+
+            result = None
+            state_key = category_state_key(key, all_data, mandatory_columns)
+            if incremental and not rule_stats:
+                with profiler.stage("recategorise"):
+                    state = load_category_state(CATEGORY_STATE, state_key)
+                    if state is not None:
+                        result = recategorise(
+                            all_data,
+                            *state,
+                            categories,
+                            contractor_field,
+                            title_field,
+                            category_field,
+                            min_rows=PARALLEL_MIN_ROWS,
+                            workers=PARALLEL_WORKERS,
+                            early_exit=early_exit,
+                            rule_hits=rule_hits,
+                        )
+            if result is not None:
+                all_data, affected = result
+                logger.info("Recategorised %s of %s rows", affected, len(all_data))
+            else:
+                with profiler.stage("categorise"):
+                    all_data = categorise_data(
+                        all_data,
+                        categories,
+                        contractor_field,
+                        title_field,
+                        min_rows=PARALLEL_MIN_ROWS,
+                        workers=PARALLEL_WORKERS,
+                        rule_counts=rule_counts,
+                        early_exit=early_exit,
+                        rule_hits=rule_hits,
+                    )
+            with profiler.stage("save_category_state"):
+                save_category_state(
+                    CATEGORY_STATE, state_key, categories, all_data[category_field]
+                )
+            yield all_data
+            return
+
+        sample = next(read_csv_file(file_path, ";", STREAM_SAMPLE_ROWS))
+        chunksize = chunk_size_for_budget(sample, memory_budget_mb)
+        del sample
+        logger.info("Streaming mode: %s rows per chunk", chunksize)
+
+        offset = 0
+        for chunk in profiler.iterate(
+            "read_csv", read_csv_file(file_path, ";", chunksize)
+        ):
+            with profiler.stage("transform_data"):
+                data = transform_data(chunk, **transform_parameters)
+            # Keep row numbers of default mode (index of concatenated data)
+            data.index = pd.RangeIndex(offset, offset + len(data))
+            offset += len(data)
+            if hash_index is not None:
+                with profiler.stage("dedup"):
+                    data = hash_index.drop_seen(data)
+            with profiler.stage("categorise"):
+                data = categorise_data(
+                    data,
+                    categories,
+                    contractor_field,
+                    title_field,
+                    workers=1,
+                    rule_counts=rule_counts,
+                    early_exit=early_exit,
+                    rule_hits=rule_hits,
+                )
+            yield data
+
+    partition_names = ACCOUNTS if partition_by_account else [""]
+    file_suffix = (
+        output_suffix(os.path.splitext(os.path.basename(file_path))[0])
+        if file_outputs
+        else ""
+    )
+    connection = open_store(STORE_FILE) if USE_STORE else None
+
+    def collect_outputs(stack: contextlib.ExitStack) -> dict[str, OutputWriter]:
+        """
+        Categorise file and collect outputs of each partition in writers
+        entered into 'stack'. Rows are added to open store transaction.
+        """
+        nonlocal categorised_rows
+        categorised_rows = 0
+        if rule_counts is not None:
+            rule_counts.clear()
+        writers = {
+            name: stack.enter_context(
+                OutputWriter(
+                    fields_mapping,
+                    mandatory_columns + [category_field],
+                    output_suffix(name),
+                    stream,
+                    partition_by_month,
+                    file_suffix,
+                    STREAM_MAX_VALUES if stream else None,
+                )
+            )
+            for name in partition_names
+        }
+
+        stored_chunks = 0
+        for data in categorised_chunks():
+            categorised_rows += len(data)
+            with profiler.stage("collect_outputs"):
+                if partition_by_account:
+                    partitions = split_by_account(data, account_field, ACCOUNTS)
+                else:
+                    partitions = {"": data}
+                for name, partition in partitions.items():
+                    writers[name].add(partition, SUMMARY_BY_CONTRACTOR)
+
+            if connection is not None:
+                with profiler.stage("store"):
+                    # Rows of previous run of this file are replaced once
+                    append_transactions(
+                        connection,
+                        data,
+                        fields_mapping,
+                        file_path,
+                        commit=False,
+                        replace_source=not stored_chunks,
+                    )
+                    stored_chunks += 1
+        return writers
 
-    # Create 2nd generator. The 1st one exhausted 1 element for fiel verification
-    csv_generator = read_csv_file(file_path, custom_separator=";", custom_chunksize=10)
+    with contextlib.ExitStack() as stack:
+        if connection is not None:
+            stack.enter_context(contextlib.closing(connection))
+        writers_stack = stack.enter_context(contextlib.ExitStack())
+        writers = collect_outputs(writers_stack)
 
-    all_data = pd.DataFrame()
-    for chunk in csv_generator:
-        data = transform_data(chunk, mandatory_columns)
-        all_data = pd.concat([all_data, data], ignore_index=True)
+        # Shared files are written by one worker at a time
+        stack.enter_context(output_lock())
+        if hash_index is not None and hash_index.reload():
+            # Another worker saved rows of this file meanwhile. Under the lock
+            # index cannot change, so file is checked and categorised again
+            logger.info("Hash index changed by another worker, processing again")
+            writers_stack.close()
+            writers = collect_outputs(writers_stack)
 
-    # Categorise
+        # Store rows are committed once per file
+        if connection is not None:
+            connection.commit()
+            logger.info("Transactions saved in store: %s", STORE_FILE)
+        # Save outputs
+        for name, writer in writers.items():
+            if name:
+                logger.info("Saving outputs for account: %s", name)
+            with profiler.stage("write_output"):
+                writer.write_output(OUTPUT_FOLDER)
+            with profiler.stage("write_summary"):
+                writer.write_summary(OUTPUT_FOLDER, SUMMARY_MERGE_MODE, summary_source)
+            with profiler.stage("write_uncategorised"):
+                writer.write_uncategorised(
+                    UNCATEGORISED, categories, SUGGESTIONS_TOP_K
+                )
+
+        if hash_index is not None:
+            with profiler.stage("dedup_commit"):
+                hash_index.commit()
+
+        if rule_counts is not None:
+            stats = update_rule_stats(
+                read_rule_stats(RULE_STATS_FILE),
+                categories,
+                {"Contractor": contractor_field, "Title": title_field},
+                rule_counts,
+                categorised_rows,
+            )
+            save_rule_stats(stats, RULE_STATS_FILE)
+            report = rule_report(stats, categories)
+            with open(RULE_REPORT_FILE, "w", encoding="utf-8") as file:
+                json.dump(report, file, indent=True, ensure_ascii=False)
+            logger.info(
+                "Rules never fired: %s, always overwritten: %s. Report saved in: %s",
+                sum(len(keys) for keys in report["never_fired"].values()),
+                sum(len(keys) for keys in report["always_shadowed"].values()),
+                RULE_REPORT_FILE,
+            )
+
+        written_files = [
+            path for writer in writers.values() for path in writer.written_files
+        ]
+        if result_folder:
+            save_result(
+                result_folder,
+                written_files,
+                [(writer.summary, writer.summary_file) for writer in writers.values()],
+            )
+            evict_results(RESULT_FOLDER, RESULT_CACHE_MAX_MB)
+    return written_files + [writer.summary_file for writer in writers.values()]
+
+
+def estimate_coverage(
+    file_path,
+    logger: logging.Logger,
+    sample_size: int | None = None,
+    stratify_by: str | None = None,
+    seed: int | None = None,
+    memory_budget_mb: float = STREAM_MEMORY_BUDGET_MB,
+    early_exit: bool = EARLY_EXIT,
+) -> dict:
+    """
+    Dry run: report share of rows and spend without category.
+    Nothing is written.
+
+    Parameters
+    ---------
+    file_path: str
+        Transaction file path.
+    sample_size: int | None
+        Number of rows sampled (for each stratum) with reservoir sampling
+        while file is read in chunks. Only sampled rows are categorised.
+        None categorises all rows and gives exact shares.
+    stratify_by: str | None
+        "month" or "account" to sample each month or account separately.
+    seed: int | None
+        Seed of random sample.
+    memory_budget_mb: float
+        Memory budget used to size chunks read from file.
+    early_exit: bool
+        Evaluate rules from the highest priority down, see
+        'process_transaction_file'.
+
+    Returns
+    -------
+    dict
+        Coverage report, see 'coverage_report'.
+    """
+    # pylint: disable=import-outside-toplevel,too-many-locals
+    import time
+
+    from utils.cache_handling import snapshot_key, load_snapshot
+    from utils.coverage_handling import StratifiedSample, coverage_report
+    from utils.data_handling import transform_data, split_by_account, split_by_month
+    from utils.file_handling import read_csv_file, verify_csv_file
+    from utils.parallel_handling import categorise_data
+    from utils.stream_handling import chunk_size_for_budget
+
+    start = time.perf_counter()
+    with open(FIELD_MAPPING, "r", encoding="utf-8") as file:
+        fields_mapping = json.load(file)["ing"]
+    title_field = fields_mapping["title"]
+    contractor_field = fields_mapping["contractor"]
+    transaction_date_field = fields_mapping["transaction_date"]
+    amount_field = fields_mapping["amount"]
+    account_field = fields_mapping["account"]
+
+    mandatory_columns = [
+        transaction_date_field,
+        contractor_field,
+        title_field,
+        amount_field,
+        account_field,
+    ]
+    transform_parameters = {
+        "mandatory_fields": mandatory_columns,
+        "amount_field_name": amount_field,
+        "account_field_name": account_field,
+        "account_field_value": ACCOUNTS,
+        "date_field_name": transaction_date_field,
+        "date_format": DATE_FORMAT,
+    }
+    verify_csv_file(read_csv_file(file_path, ";", 10), mandatory_columns)
     with open(CATEGORIES_MAPPING, "r", encoding="utf-8") as file:
         categories = json.load(file)
 
-    all_data = categorise_contractor(
-        all_data, categories["Contractor"], contractor_field
+    strata = {
+        None: None,
+        "month": lambda data: split_by_month(data, transaction_date_field),
+        "account": lambda data: split_by_account(data, account_field),
+    }[stratify_by]
+    sample = StratifiedSample(sample_size, amount_field, strata, seed)
+
+    snapshot_folder = os.path.join(
+        SNAPSHOT_FOLDER, snapshot_key(file_path, transform_parameters)
     )
-    all_data = categorise_title(all_data, categories["Title"], title_field)
-    all_data = start_with_no_category(all_data, category_field, "NO CATEGORY")
+    data = load_snapshot(snapshot_folder)
+    if data is not None:
+        logger.info("Transformed data loaded from: %s", snapshot_folder)
+        sample.add(data)
+    else:
+        first = next(read_csv_file(file_path, ";", STREAM_SAMPLE_ROWS))
+        chunksize = chunk_size_for_budget(first, memory_budget_mb)
+        del first
+        for chunk in read_csv_file(file_path, ";", chunksize):
+            sample.add(transform_data(chunk, **transform_parameters))
 
-    no_category_rows = all_data[all_data[category_field] == "NO CATEGORY"].shape[0]
-    logger.info("Number of uncategorised rows: %s", no_category_rows)
+    categorised = {
+        name: categorise_data(
+            data,
+            categories,
+            contractor_field,
+            title_field,
+            min_rows=PARALLEL_MIN_ROWS,
+            workers=PARALLEL_WORKERS,
+            early_exit=early_exit,
+        )
+        for name, data in sample.samples().items()
+        if len(data)
+    }
+    report = coverage_report(sample, categorised, fields_mapping["category"])
+    report["seconds"] = round(time.perf_counter() - start, 3)
 
-    # Save outputs
-    output_file = os.path.join(OUTPUT_FOLDER, "output.xlsx")
-    all_data.to_excel(output_file)
-    logger.info("Output file saved in: %s", output_file)
+    for name in ("no_category_rows", "no_category_spend"):
+        low, high = report[name]["interval"]
+        logger.info(
+            "%s: %.1f%% (%.0f%% CI %.1f%% - %.1f%%)",
+            name.replace("_", " ").capitalize(),
+            report[name]["share"] * 100,
+            report["confidence"] * 100,
+            low * 100,
+            high * 100,
+        )
+    logger.info(
+        "Categorised %s of %s rows (%s strata) in %s s. Nothing was written",
+        report["sampled_rows"],
+        report["rows"],
+        report["strata"],
+        report["seconds"],
+    )
+    return report
 
-    no_category = no_category_dict(all_data, title_field)
-    no_catregory_title_file = os.path.join(UNCATEGORISED, "title.json")
-    with open(no_catregory_title_file, "w", encoding="utf-8") as f:
-        json.dump(no_category, f, indent=True)
-    logger.info("Uncategorised title saved in: %s", no_catregory_title_file)
 
-    no_category = no_category_dict(all_data, contractor_field)
-    no_catregory_contractor_file = os.path.join(UNCATEGORISED, "contractor.json")
-    with open(no_catregory_contractor_file, "w", encoding="utf-8") as f:
-        json.dump(no_category, f, indent=True)
-    logger.info("Uncategorised contractors saved in: %s", no_catregory_contractor_file)
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """
+    Parse command line arguments. Defaults come from 'config.py'.
+    """
+    parser = argparse.ArgumentParser(description="Categorise banking transactions.")
+    parser.add_argument(
+        "--stream",
+        action=argparse.BooleanOptionalAction,
+        default=STREAM,
+        help="Process file in chunks without holding all rows in memory",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=float,
+        default=STREAM_MEMORY_BUDGET_MB,
+        metavar="MB",
+        help="Memory budget used to size chunks in streaming mode",
+    )
+    parser.add_argument(
+        "--snapshot",
+        action=argparse.BooleanOptionalAction,
+        default=SNAPSHOT_CACHE,
+        help="Reuse transformed data cached for unchanged input file",
+    )
+    parser.add_argument(
+        "--incremental",
+        action=argparse.BooleanOptionalAction,
+        default=INCREMENTAL,
+        help="Categorise again only rows affected by changed mapping keys",
+    )
+    parser.add_argument(
+        "--partition-by-account",
+        action=argparse.BooleanOptionalAction,
+        default=PARTITION_BY_ACCOUNT,
+        help="Write separate outputs for each account from ACCOUNTS in config.py",
+    )
+    parser.add_argument(
+        "--partition-by-month",
+        action=argparse.BooleanOptionalAction,
+        default=PARTITION_BY_MONTH,
+        help="Write separate output Excel file for each month of transaction date",
+    )
+    parser.add_argument(
+        "--dedup",
+        action=argparse.BooleanOptionalAction,
+        default=DEDUP,
+        help="Drop transactions already processed from overlapping files",
+    )
+    parser.add_argument(
+        "--result-cache",
+        action=argparse.BooleanOptionalAction,
+        default=RESULT_CACHE,
+        help="Restore outputs of previous run if input, mapping and code are unchanged",
+    )
+    parser.add_argument(
+        "--rule-stats",
+        action=argparse.BooleanOptionalAction,
+        default=RULE_STATS,
+        help="Collect rule hit statistics and report rules which could be pruned",
+    )
+    parser.add_argument(
+        "--early-exit",
+        action=argparse.BooleanOptionalAction,
+        default=EARLY_EXIT,
+        help="Stop evaluating rules for a row once its category is decided",
+    )
+    parser.add_argument(
+        "--memory-profile",
+        action=argparse.BooleanOptionalAction,
+        default=MEMORY_PROFILE,
+        help="Save peak traced memory, RSS change and top allocation sites "
+        "of each pipeline stage",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=PROFILE_MODES,
+        default=os.environ.get(CPU_PROFILE_ENV) or CPU_PROFILE,
+        help="Save CPU profile of each file: 'cprofile' profiles every call, "
+        "'sample' samples call stacks with low overhead. "
+        f"Default from {CPU_PROFILE_ENV} environment variable",
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="Claim and process input files until the folder is drained. "
+        "Several workers (also on other hosts) may share the input folder",
+    )
+    parser.add_argument(
+        "--lease",
+        type=float,
+        default=QUEUE_LEASE_SECONDS,
+        metavar="SECONDS",
+        help="Time after which file claimed by a stopped worker is claimed again",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only report share of rows and spend without category. Nothing is written",
+    )
+    parser.add_argument(
+        "--sample",
+        type=int,
+        nargs="?",
+        const=DRY_RUN_SAMPLE_SIZE,
+        default=None,
+        metavar="ROWS",
+        help="Dry run: categorise only random sample of rows "
+        f"(default {DRY_RUN_SAMPLE_SIZE}) and report confidence intervals",
+    )
+    parser.add_argument(
+        "--stratify",
+        choices=["month", "account"],
+        default=None,
+        help="Dry run: sample each month or account separately",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None, help="Dry run: seed of random sample"
+    )
+    args = parser.parse_args(argv)
+    if args.dry_run and args.worker:
+        parser.error("--dry-run cannot be used with --worker")
+    if not args.dry_run:
+        for option, value in (
+            ("--sample", args.sample),
+            ("--stratify", args.stratify),
+            ("--seed", args.seed),
+        ):
+            if value is not None:
+                parser.error(f"{option} can be used only with --dry-run")
+    return args
 
 
-#  Main code
-log_file = os.path.join(LOGS_FOLDER, f"{TASK_NAME}.log")
-setup_root_logger(log_file)
-logger = logging.getLogger(__name__)
+def process_item(
+    item: str,
+    item_number: str,
+    memory_profile: bool = False,
+    cpu_profile: str | None = None,
+    **parameters,
+) -> str | None:
+    """
+    Process one transaction file with 'process_transaction_file' and log
+    its status. Return error message or None when file was processed.
+    With 'memory_profile' memory use of pipeline stages is saved in
+    'MEMORY_PROFILE_FOLDER'. With 'cpu_profile' ("cprofile" or "sample")
+    CPU profile of the file is saved in 'PROFILE_FOLDER'.
+    """
+    error = None
+    label = os.path.basename(item).split(".")[0]
+    profiler = MemoryProfiler(
+        memory_profile, MEMORY_PROFILE_TOP, preload=("pandas", "openpyxl")
+    )
+    cpu_profiler = CpuProfiler(cpu_profile, CPU_PROFILE_INTERVAL)
+    try:
+        logger.info("#" * 100)  # Mark start point for item. Easy to see in log
+        logger.info("Started processing item: %s", item_number)
+        # Profiles are saved also for failed files, CPU profile without saving time
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(profiler)
+            if memory_profile:
+                stack.callback(
+                    profiler.save,
+                    MEMORY_PROFILE_FOLDER,
+                    label,
+                    {"file": item, "parameters": parameters},
+                )
+            stack.callback(cpu_profiler.save, PROFILE_FOLDER, label)
+            stack.enter_context(cpu_profiler)
+            # main function
+            process_transaction_file(item, logger, profiler=profiler, **parameters)
+        logger.info("Status: Success for %s", item)
+
+    except (FileNotFoundError, InvalidCSVFileError) as e:
+        error = str(e)
+        logger.error("Known error: %s", e)
+        logger.info("Status: Failed for %s", item)
+    # Catch all unexpected errors
+    except Exception as e:  # pylint: disable=broad-except
+        error = f"{type(e).__name__}: {e}"
+        logger.exception("Unknown error: %s", e)
+        logger.info("Status: Failed for %s", item)
+    logger.info("Finished processing file: %s", item_number)
+    logger.info("#" * 100)  # Mark end point for item. Easy to see in log
+    return error
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Process transaction files from input folder.
+    Return 0 when all files were processed successfully, otherwise 1.
+    """
+    args = parse_args(argv)
+    file_pattern = "Lista_transakcji_nr_"
+    file_extension = ".csv"
+
+    os.makedirs(LOGS_FOLDER, exist_ok=True)
+    setup_root_logger(os.path.join(LOGS_FOLDER, f"{TASK_NAME}.log"))
 
-if __name__ == "__main__":
     # Add two empty log to mark the beggining
     # Usefull when logs are saved in the same file
     logger.info("")
     logger.info("")
     logger.info("Execution started.")
 
-    file_pattern = "Lista_transakcji_nr_"
-    file_extension = ".csv"
+    parameters = {
+        "stream": args.stream,
+        "memory_budget_mb": args.memory_budget,
+        "snapshot": args.snapshot,
+        "incremental": args.incremental,
+        "partition_by_account": args.partition_by_account,
+        "partition_by_month": args.partition_by_month,
+        "dedup": args.dedup,
+        "result_cache": args.result_cache,
+        "rule_stats": args.rule_stats,
+        "early_exit": args.early_exit,
+        "memory_profile": args.memory_profile,
+        "cpu_profile": args.profile,
+    }
+    failed = 0
+
+    if args.worker:
+        queue = WorkQueue(
+            INTPUT_FOLDER,
+            lambda file: is_transaction_file(file, file_pattern, file_extension),
+            args.lease,
+        )
+        logger.info("Worker %s started", queue.worker_id)
+        processed = 0
+        for item, lease in queue:
+            processed += 1
+            error = process_item(
+                item,
+                str(processed),
+                **parameters,
+                output_lock=lambda: queue.lock("outputs"),
+                file_outputs=True,
+            )
+            failed += error is not None
+            logger.info("Moved to: %s", queue.finish(item, lease, error))
+        logger.info("Queue drained: %s processed, %s failed", processed, failed)
+        logger.info("Execution finished.")
+        return 1 if failed else 0
+
+    # Fast path: nothing to do, heavy modules are never imported
+    try:
+        transaction_file_path = get_transaction_file(
+            folder_path=INTPUT_FOLDER, pattern=file_pattern, extension=file_extension
+        )
+    except FileNotFoundError as e:
+        logger.info("No items to process: %s", e)
+        logger.info("Execution finished.")
+        return 0
+
+    if args.dry_run:
+        try:
+            estimate_coverage(
+                transaction_file_path,
+                logger,
+                sample_size=args.sample,
+                stratify_by=args.stratify,
+                seed=args.seed,
+                memory_budget_mb=args.memory_budget,
+                early_exit=args.early_exit,
+            )
+        except (FileNotFoundError, InvalidCSVFileError) as e:
+            logger.error("Known error: %s", e)
+            return 1
+        logger.info("Execution finished.")
+        return 0
 
-    transaction_file_path = get_transaction_file(
-        folder_path=INTPUT_FOLDER, pattern=file_pattern, extension=file_extension
-    )
     items = []
     items.append(transaction_file_path)
     num_items = len(items)
-    if not num_items:
-        logger.info("No items to process")
 
     for item_index, item in enumerate(items):
-        try:
-            logger.info("#" * 100)  # Mark start point for item. Easy to see in log
-            logger.info("Started processing item: %s/%s", item_index + 1, num_items)
-            # main function
-            process_transaction_file(item, logger)
-            logger.info("Status: Success for %s", item)
-
-        except (FileNotFoundError, InvalidCSVFileError) as e:
-            logger.error("Known error: %s", e)
-            logger.info("Status: Failed for %s", item)
-        # Catch all unexpected errors
-        except Exception as e:  # pylint: disable=broad-except
-            logger.exception("Unknown error: %s", e)
-            logger.info("Status: Failed for %s", item)
-        logger.info("Finished processing file: %s/%s", item_index + 1, num_items)
-        logger.info("#" * 100)  # Mark end point for item. Easy to see in log
+        error = process_item(item, f"{item_index + 1}/{num_items}", **parameters)
+        failed += error is not None
     logger.info("Execution finished.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,54 @@
+"""
+Query SQLite transaction store.
+
+Examples:
+    python query.py monthly --year 2025
+    python query.py top-contractors PALIWO --year 2025 --limit 5
+"""
+
+import argparse
+
+from utils.amount_handling import format_amount
+from utils.store_handling import (
+    open_store,
+    spend_per_category_per_month,
+    top_contractors,
+)
+from config import STORE_FILE
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Parse arguments and print query result as tab separated rows.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", default=STORE_FILE, help="Store file path")
+    subparsers = parser.add_subparsers(dest="query", required=True)
+
+    monthly = subparsers.add_parser("monthly", help="Spend per category per month")
+    monthly.add_argument("--year", type=int)
+
+    top = subparsers.add_parser("top-contractors", help="Top contractors in category")
+    top.add_argument("category")
+    top.add_argument("--year", type=int)
+    top.add_argument("--limit", type=int, default=10)
+
+    args = parser.parse_args(argv)
+    connection = open_store(args.db)
+    try:
+        if args.query == "monthly":
+            for month, category, spend, count in spend_per_category_per_month(
+                connection, args.year
+            ):
+                print(f"{month}\t{category}\t{format_amount(spend)}\t{count}")
+        else:
+            for contractor, spend, count in top_contractors(
+                connection, args.category, args.year, args.limit
+            ):
+                print(f"{contractor}\t{format_amount(spend)}\t{count}")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Run local categorisation service.
+
+Examples:
+    python service.py --port 8765
+    curl --data-binary @transactions.jsonl http://127.0.0.1:8765/categorise
+    curl -H "Content-Type: text/csv" --data-binary @transactions.csv \
+        "http://127.0.0.1:8765/categorise?sep=;"
+    curl http://127.0.0.1:8765/metrics
+"""
+
+import argparse
+import json
+import logging
+import os
+
+from log_config.logging_config import setup_root_logger
+from utils.service_handling import CategorisationServer
+from config import (
+    LOGS_FOLDER,
+    CATEGORIES_MAPPING,
+    FIELD_MAPPING,
+    SERVICE_HOST,
+    SERVICE_PORT,
+    SERVICE_WORKERS,
+    SERVICE_QUEUE_SIZE,
+    SERVICE_BATCH_SIZE,
+    SERVICE_MAX_BODY_MB,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Parse arguments and serve until interrupted.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS)
+    parser.add_argument("--queue-size", type=int, default=SERVICE_QUEUE_SIZE)
+    parser.add_argument("--batch-size", type=int, default=SERVICE_BATCH_SIZE)
+    parser.add_argument("--mapping", default=CATEGORIES_MAPPING)
+    args = parser.parse_args(argv)
+
+    os.makedirs(LOGS_FOLDER, exist_ok=True)
+    setup_root_logger(os.path.join(LOGS_FOLDER, "service.log"))
+
+    with open(FIELD_MAPPING, "r", encoding="utf-8") as file:
+        fields_mapping = json.load(file)["ing"]
+
+    server = CategorisationServer(
+        (args.host, args.port),
+        args.mapping,
+        fields_mapping["contractor"],
+        fields_mapping["title"],
+        workers=args.workers,
+        queue_size=args.queue_size,
+        batch_size=args.batch_size,
+        max_body_mb=SERVICE_MAX_BODY_MB,
+    )
+    logger.info("Serving on http://%s:%s", *server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Service stopped.")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
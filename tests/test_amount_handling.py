@@ -0,0 +1,20 @@
+"""
+This file is used to test function in 'amount_handling.py' file
+"""
+
+import pytest
+import numpy as np
+from utils.amount_handling import format_amount
+
+
+# #################################################
+# #### format_amount ##############################
+# #################################################
+
+
+@pytest.mark.amount
+def test_format_amount():
+    assert format_amount(-12345) == "-123.45"
+    assert format_amount(-5) == "-0.05"
+    assert format_amount(100) == "1.00"
+    assert format_amount(np.int64(0)) == "0.00"
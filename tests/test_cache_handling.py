@@ -0,0 +1,113 @@
+"""
+This file is used to test function in 'cache_handling.py' file
+"""
+
+import os
+
+import numpy as np
+import pytest
+import pandas as pd
+from utils.cache_handling import (
+    file_hash,
+    snapshot_key,
+    save_snapshot,
+    load_snapshot,
+    evict_snapshots,
+)
+
+
+@pytest.fixture
+def transformed_data():
+    data = pd.DataFrame(
+        {
+            "Dane kontrahenta": [" Kiosk Ruchu ", "ORLEN", None],
+            "Tytuł": ["Płatność kartą", np.nan, "Blik"],
+            "Amount": [-1.5, -2.25, -100.0],
+        },
+        index=[3, 7, 8],
+    )
+    return data
+
+
+# #################################################
+# #### snapshot_key ###############################
+# #################################################
+
+
+@pytest.mark.snapshot
+def test_snapshot_key_depends_on_content_and_parameters(tmp_path):
+    file_path = tmp_path / "input.csv"
+    file_path.write_text("a;b\n1;2")
+    key = snapshot_key(str(file_path), {"account": "A"})
+
+    assert key == snapshot_key(str(file_path), {"account": "A"})
+    assert key != snapshot_key(str(file_path), {"account": "B"})
+
+    file_hash_before = file_hash(str(file_path))
+    file_path.write_text("a;b\n1;3")
+    assert file_hash(str(file_path)) != file_hash_before
+    assert key != snapshot_key(str(file_path), {"account": "A"})
+    # Precomputed hash of input file gives the same key
+    input_hash = file_hash(str(file_path))
+    assert snapshot_key("other.csv", {"account": "A"}, input_hash) == snapshot_key(
+        str(file_path), {"account": "A"}
+    )
+
+
+# #################################################
+# #### save_snapshot / load_snapshot ##############
+# #################################################
+
+
+@pytest.mark.snapshot
+def test_load_snapshot_missing(tmp_path):
+    assert load_snapshot(str(tmp_path / "missing")) is None
+
+
+@pytest.mark.snapshot
+def test_save_and_load_snapshot(
+    tmp_path, transformed_data
+):  # pylint: disable=redefined-outer-name
+    folder = str(tmp_path / "snapshots" / "key")
+    save_snapshot(folder, transformed_data)
+    data = load_snapshot(folder)
+
+    assert data.columns.tolist() == transformed_data.columns.tolist()
+    assert data.index.tolist() == [3, 7, 8]
+    assert data["Dane kontrahenta"].tolist()[:2] == [" Kiosk Ruchu ", "ORLEN"]
+    assert data["Dane kontrahenta"].isna().tolist() == [False, False, True]
+    assert data["Tytuł"].isna().tolist() == [False, True, False]
+    assert data["Amount"].tolist() == [-1.5, -2.25, -100.0]
+
+
+@pytest.mark.snapshot
+def test_save_snapshot_replace_existing(
+    tmp_path, transformed_data
+):  # pylint: disable=redefined-outer-name
+    folder = str(tmp_path / "key")
+    save_snapshot(folder, transformed_data)
+    save_snapshot(folder, transformed_data.iloc[:1])
+    assert len(load_snapshot(folder)) == 1
+
+
+# #################################################
+# #### evict_snapshots ############################
+# #################################################
+
+
+@pytest.mark.snapshot
+def test_evict_snapshots_least_recently_used(
+    tmp_path, transformed_data
+):  # pylint: disable=redefined-outer-name
+    cache_folder = tmp_path / "snapshots"
+    for position, key in enumerate(["old", "used", "new"]):
+        save_snapshot(str(cache_folder / key), transformed_data)
+        meta_file = cache_folder / key / "meta.json"
+        os.utime(meta_file, (1000 + position, 1000 + position))
+    load_snapshot(str(cache_folder / "used"))
+    size = sum(entry.stat().st_size for entry in os.scandir(cache_folder / "new"))
+
+    removed = evict_snapshots(str(cache_folder), 2.5 * size / 1024 / 1024)
+    assert removed == [str(cache_folder / "old")]
+    assert sorted(os.listdir(cache_folder)) == ["new", "used"]
+    assert evict_snapshots(str(tmp_path / "missing"), 0) == []
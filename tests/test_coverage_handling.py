@@ -0,0 +1,116 @@
+"""
+This file is used to test function in 'coverage_handling.py' file
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from utils.coverage_handling import (
+    Reservoir,
+    StratifiedSample,
+    wilson_interval,
+    coverage_report,
+)
+
+
+@pytest.fixture
+def categorised_data():
+    data = pd.DataFrame(
+        {
+            "Month": ["2025-01"] * 6 + ["2025-02"] * 4,
+            "Amount": [-100, -200, -300, -400, -500, -600, -10, -20, -30, -40],
+            "category": ["NO CATEGORY", "A", "A", "A", "A", "A"]
+            + ["NO CATEGORY", "NO CATEGORY", "B", "B"],
+        }
+    )
+    return data
+
+
+def by_month(data):
+    return dict(tuple(data.groupby("Month")))
+
+
+# #################################################
+# #### Reservoir ##################################
+# #################################################
+
+
+@pytest.mark.coverage
+def test_reservoir_keeps_size_and_unique_rows():
+    reservoir = Reservoir(5, np.random.default_rng(0))
+    for start in range(0, 50, 7):
+        reservoir.add(pd.DataFrame({"row": np.arange(start, min(start + 7, 50))}))
+
+    assert reservoir.seen == 50
+    assert len(reservoir.sample) == 5
+    assert reservoir.sample["row"].is_unique
+
+
+@pytest.mark.coverage
+def test_reservoir_is_uniform():
+    counts = np.zeros(20)
+    for seed in range(300):
+        reservoir = Reservoir(4, np.random.default_rng(seed))
+        for start in range(0, 20, 3):
+            reservoir.add(pd.DataFrame({"row": np.arange(start, min(start + 3, 20))}))
+        counts[reservoir.sample["row"]] += 1
+
+    # Each row is sampled with probability 4/20
+    assert np.allclose(counts / 300, 0.2, atol=0.1)
+
+
+@pytest.mark.coverage
+def test_reservoir_without_size_keeps_all_rows():
+    reservoir = Reservoir(None, np.random.default_rng(0))
+    reservoir.add(pd.DataFrame({"row": [1, 2]}))
+    reservoir.add(pd.DataFrame({"row": [3]}))
+    assert reservoir.sample["row"].tolist() == [1, 2, 3]
+
+
+# #################################################
+# #### wilson_interval / coverage_report ##########
+# #################################################
+
+
+@pytest.mark.coverage
+def test_wilson_interval():
+    low, high = wilson_interval(0.0, 100)
+    assert low == 0.0
+    assert high == pytest.approx(0.037, abs=0.001)
+    low, high = wilson_interval(0.5, 100)
+    assert (low, high) == pytest.approx((0.404, 0.596), abs=0.001)
+
+
+@pytest.mark.coverage
+def test_coverage_report_all_rows_is_exact(
+    categorised_data,
+):  # pylint: disable=redefined-outer-name
+    sample = StratifiedSample(None, "Amount", by_month)
+    sample.add(categorised_data)
+    report = coverage_report(sample, sample.samples())
+
+    assert report["rows"] == report["sampled_rows"] == 10
+    assert report["strata"] == 2
+    assert report["no_category_rows"]["share"] == pytest.approx(0.3)
+    assert report["no_category_rows"]["interval"] == pytest.approx([0.3, 0.3])
+    assert report["no_category_spend"]["share"] == pytest.approx(130 / 2200)
+    assert report["no_category_spend"]["interval"] == pytest.approx([130 / 2200] * 2)
+
+
+@pytest.mark.coverage
+def test_coverage_report_sample_interval_contains_share(
+    categorised_data,
+):  # pylint: disable=redefined-outer-name
+    data = pd.concat([categorised_data] * 100, ignore_index=True)
+    sample = StratifiedSample(200, "Amount", by_month, seed=0)
+    for start in range(0, len(data), 64):
+        sample.add(data.iloc[start : start + 64])
+    report = coverage_report(sample, sample.samples())
+
+    assert report["rows"] == 1000
+    assert report["sampled_rows"] == 400
+    low, high = report["no_category_rows"]["interval"]
+    assert low < 0.3 < high
+    assert high - low < 0.2
+    low, high = report["no_category_spend"]["interval"]
+    assert low < 130 / 2200 < high
@@ -7,15 +7,53 @@ import pytest
 import pandas as pd
 import numpy as np
 from utils.data_handling import (
+    parse_amount_minor,
     transform_data,
+    split_by_account,
+    split_by_month,
     categorise_field,
     categorise_contractor,
     categorise_title,
     start_with_no_category,
     no_category_dict,
+    compile_categories,
+    evaluation_order,
+    categorise_early_exit,
 )
 
 
+# #################################################
+# #### parse_amount_minor ########################
+# #################################################
+
+
+@pytest.mark.amount
+def test_parse_amount_minor_text():
+    values = pd.Series(["-123,45", "100", "-0,5", "1 234,56", "-7,05", "12.3", "0,00"])
+    assert parse_amount_minor(values).tolist() == [
+        -12345,
+        10000,
+        -50,
+        123456,
+        -705,
+        1230,
+        0,
+    ]
+
+
+@pytest.mark.amount
+def test_parse_amount_minor_numeric():
+    assert parse_amount_minor(pd.Series([-100, 200])).tolist() == [-10000, 20000]
+    assert parse_amount_minor(pd.Series([-1.1, 2.25])).tolist() == [-110, 225]
+
+
+@pytest.mark.amount
+@pytest.mark.parametrize("value", ["abc", "1,2,3", "1,234", "-", "--1", "12a"])
+def test_parse_amount_minor_invalid(value):
+    with pytest.raises(ValueError, match="Invalid amount"):
+        parse_amount_minor(pd.Series(["-1,00", value]))
+
+
 # #################################################
 # #### transform_data #############################
 # #################################################
@@ -182,6 +220,23 @@ def test_transform_filter_by_account(
     assert len(data) == 3
 
 
+# filter by list of accounts
+@pytest.mark.transform_data
+def test_transform_filter_by_account_list(
+    raw_data_account, mandatory_fields, amount_field_name, account_field_name
+):  # pylint: disable=redefined-outer-name
+
+    data = transform_data(
+        raw_data_account,
+        mandatory_fields,
+        amount_field_name,
+        account_field_name,
+        ["KONTO Direct - KD", "another accout"],
+    )
+
+    assert len(data) == 6
+
+
 # unify decimal points
 @pytest.mark.transform_data
 def test_transform_unify_decimal_points(
@@ -214,9 +269,10 @@ def test_transform_unify_decimal_points(
         "KONTO Direct - KD",
     )
 
-    assert data.iloc[0, 0] == np.float64("-100.50")
-    assert data.iloc[1, 0] == np.float64("-250.75")
-    assert data.iloc[2, 0] == np.float64("-45.25")
+    assert data.iloc[0, 0] == np.int64("-10050")
+    assert data.iloc[1, 0] == np.int64("-25075")
+    assert data.iloc[2, 0] == np.int64("-4525")
+    assert data["Amount"].dtype == np.int64
 
 
 # unify decimal points - int64
@@ -251,9 +307,9 @@ def test_transform_unify_decimal_points_int64(
         "KONTO Direct - KD",
     )
 
-    assert data.iloc[0, 0] == np.int64("-100")
-    assert data.iloc[1, 0] == np.int64("-200")
-    assert data.iloc[2, 0] == np.int64("-300")
+    assert data.iloc[0, 0] == np.int64("-10000")
+    assert data.iloc[1, 0] == np.int64("-20000")
+    assert data.iloc[2, 0] == np.int64("-30000")
 
 
 # keep_only_negative_numbers
@@ -288,6 +344,116 @@ def test_transform_keep_only_negative_numbers(
     assert len(data) == 1
 
 
+# parse_dates
+@pytest.mark.transform_data
+def test_transform_parse_dates(
+    mandatory_fields, amount_field_name, account_field_name
+):  # pylint: disable=redefined-outer-name
+    data = pd.DataFrame(
+        {
+            "Amount": ["-1,00", "-2,00", "3,00"],
+            "Account": ["KONTO Direct - KD"] * 3,
+            "Date": ["31.01.2025", "01.02.2025", "02.02.2025"],
+        }
+    )
+
+    data = transform_data(
+        data,
+        mandatory_fields + ["Date"],
+        amount_field_name,
+        account_field_name,
+        "KONTO Direct - KD",
+        date_field_name="Date",
+    )
+    assert data["Date"].dtype == "datetime64[s]"
+    assert data["Date"].dt.strftime("%Y-%m-%d").tolist() == ["2025-01-31", "2025-02-01"]
+
+
+@pytest.mark.transform_data
+def test_transform_date_day_precision(
+    mandatory_fields, amount_field_name, account_field_name
+):  # pylint: disable=redefined-outer-name
+    data = pd.DataFrame(
+        {
+            "Amount": ["-1,00", "-2,00"],
+            "Account": ["KONTO Direct - KD"] * 2,
+            "Date": ["31.01.2025 23:59", "01.02.2025 00:01"],
+        }
+    )
+
+    data = transform_data(
+        data,
+        mandatory_fields + ["Date"],
+        amount_field_name,
+        account_field_name,
+        "KONTO Direct - KD",
+        date_field_name="Date",
+        date_format="%d.%m.%Y %H:%M",
+    )
+    # Time is dropped, so dates convert to NumPy days without loss
+    days = data["Date"].to_numpy().astype("datetime64[D]")
+    assert (data["Date"].to_numpy() == days).all()
+    assert days.astype(str).tolist() == ["2025-01-31", "2025-02-01"]
+
+
+@pytest.mark.transform_data
+def test_transform_invalid_date(
+    mandatory_fields, amount_field_name, account_field_name
+):  # pylint: disable=redefined-outer-name
+    data = pd.DataFrame(
+        {"Amount": ["-1,00"], "Account": ["KONTO Direct - KD"], "Date": ["2025-01-31"]}
+    )
+    with pytest.raises(ValueError):
+        transform_data(
+            data,
+            mandatory_fields + ["Date"],
+            amount_field_name,
+            account_field_name,
+            "KONTO Direct - KD",
+            date_field_name="Date",
+        )
+
+
+# #################################################
+# #### split_by_month #############################
+# #################################################
+
+
+@pytest.mark.split_by_month
+def test_split_by_month():
+    data = pd.DataFrame(
+        {
+            "Date": pd.to_datetime(
+                ["15.02.2025", "31.01.2025", "01.02.2025"], format="%d.%m.%Y"
+            ),
+            "Amount": [-1, -2, -3],
+        }
+    )
+    partitions = split_by_month(data, "Date")
+
+    assert list(partitions) == ["2025-01", "2025-02"]
+    assert partitions["2025-01"].index.tolist() == [1]
+    assert partitions["2025-02"].index.tolist() == [0, 2]
+
+
+# #################################################
+# #### split_by_account ###########################
+# #################################################
+
+
+@pytest.mark.split_by_account
+def test_split_by_account(raw_data_account):  # pylint: disable=redefined-outer-name
+    partitions = split_by_account(
+        raw_data_account, "Account", ["KONTO Direct - KD", "Savings"]
+    )
+
+    assert list(partitions) == ["KONTO Direct - KD", "another accout", "Savings"]
+    assert partitions["KONTO Direct - KD"].index.tolist() == [0, 1, 2]
+    assert partitions["another accout"].index.tolist() == [3, 4, 5]
+    assert partitions["Savings"].empty
+    assert partitions["Savings"].columns.tolist() == ["Amount", "Account"]
+
+
 # #################################################
 # #### categorise_field ###########################
 # #################################################
@@ -532,6 +698,106 @@ def test_categorise_title_happy_path(
     assert len(data) == len(title_data)
 
 
+class SearchSpy:  # pylint: disable=too-few-public-methods
+    """
+    Compiled pattern of rule 'position' recording searched texts.
+    """
+
+    def __init__(self, pattern, position, searched):
+        self.pattern = pattern
+        self.position = position
+        self.searched = searched
+
+    def search(self, text):
+        self.searched.append((self.position, text))
+        return self.pattern.search(text)
+
+# #################################################
+# #### evaluation_order / categorise_early_exit ###
+# #################################################
+
+
+@pytest.mark.early_exit
+def test_evaluation_order():
+    rules = [("a", "X"), ("b", "Y"), ("c", "Y"), ("d", "Y"), ("e", "X")]
+    assert evaluation_order(rules) == [4, 3, 2, 1, 0]
+    # Only rules with the same category next to each other are reordered
+    assert evaluation_order(rules, [100, 1, 5, 2, 0]) == [4, 2, 3, 1, 0]
+
+
+@pytest.mark.early_exit
+def test_categorise_early_exit_same_as_categorise_field(
+    field_data, field_mapping
+):  # pylint: disable=redefined-outer-name
+    field_data["Title"] = ["Blik", None, "Kiosk", "", "Blik", "x", "y", "z", "Blik"]
+    title_mapping = {"Blik": "GOTÓWKA", "kiosk": "PRASA"}
+    # Later key wins: 'Polska' overrides 'Lidl'
+    field_mapping = {**field_mapping, "Polska": "INNE"}
+    expected = categorise_field(field_data, field_mapping, "Dane kontrahenta")
+    expected = categorise_field(expected, title_mapping, "Title")
+
+    data = categorise_early_exit(
+        field_data,
+        [
+            ("Dane kontrahenta", compile_categories(field_mapping), None),
+            ("Title", compile_categories(title_mapping), None),
+        ],
+    )
+    assert data.equals(expected)
+
+
+@pytest.mark.early_exit
+def test_categorise_early_exit_stops_at_deciding_rule():
+    data = pd.DataFrame(
+        {
+            "Dane kontrahenta": ["Kiosk", "Kiosk", "Lidl"],
+            "Title": ["Gazeta", "Gazeta blik", "x"],
+        }
+    )
+    contractor_rules = compile_categories(
+        {"^kiosk": {"category": "PRASA", "kind": "regex"}}
+    )
+    title_rules = compile_categories(
+        {
+            "gazeta": {"category": "PRASA", "kind": "regex"},
+            "blik": {"category": "PRASA", "kind": "regex"},
+        }
+    )
+    searched = []
+    for rules in (contractor_rules, title_rules):
+        rules.patterns = [
+            SearchSpy(pattern, position, searched)
+            for position, pattern in enumerate(rules.patterns)
+        ]
+
+    data = categorise_early_exit(
+        data,
+        [
+            ("Dane kontrahenta", contractor_rules, None),
+            # Rule 'gazeta' had more hits, so it is tested first
+            ("Title", title_rules, evaluation_order(title_rules, [5, 0])),
+        ],
+    )
+    assert data["category"].tolist() == ["PRASA", "PRASA", "NO CATEGORY"]
+    # Later rules are not evaluated once value is decided
+    assert searched == [
+        (0, "gazeta"),
+        (0, "gazeta blik"),
+        (0, "x"),
+        (1, "x"),
+        (0, "lidl"),
+    ]
+
+@pytest.mark.early_exit
+def test_categorise_early_exit_missing_column(
+    field_data, field_mapping
+):  # pylint: disable=redefined-outer-name
+    with pytest.raises(KeyError):
+        categorise_early_exit(
+            field_data, [("Contractor", compile_categories(field_mapping), None)]
+        )
+
+
 # #################################################
 # #### categorise_title ###########################
 # #################################################
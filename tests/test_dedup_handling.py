@@ -0,0 +1,164 @@
+"""
+This file is used to test function in 'dedup_handling.py' file
+"""
+
+import pytest
+import pandas as pd
+from utils.dedup_handling import add_field_counts, row_hashes, HashIndex
+
+
+@pytest.fixture
+def fields():
+    return ["Data transakcji", "Dane kontrahenta", "Tytuł", "Amount", "Konto"]
+
+
+@pytest.fixture
+def january_export():
+    data = pd.DataFrame(
+        {
+            "Data transakcji": pd.to_datetime(
+                ["02.01.2025", "02.01.2025", "15.01.2025"], format="%d.%m.%Y"
+            ),
+            "Dane kontrahenta": ["Kiosk", "Kiosk", "ORLEN"],
+            "Tytuł": ["Gazeta", "Gazeta", None],
+            "Amount": [-500, -500, -10000],
+            "Konto": ["KONTO Direct - KD"] * 3,
+        }
+    )
+    return data
+
+
+# #################################################
+# #### row_hashes #################################
+# #################################################
+
+
+@pytest.mark.dedup
+def test_row_hashes_identical_rows_differ(
+    january_export, fields
+):  # pylint: disable=redefined-outer-name
+    hashes, field_hashes = row_hashes(january_export, fields)
+
+    assert hashes.dtype == "uint64"
+    assert field_hashes[0] == field_hashes[1]
+    assert len(set(hashes.tolist())) == 3
+
+
+@pytest.mark.dedup
+def test_row_hashes_chunks_equal_whole(
+    january_export, fields
+):  # pylint: disable=redefined-outer-name
+    whole, _ = row_hashes(january_export, fields)
+    first, field_hashes = row_hashes(january_export.iloc[:1], fields)
+    previous = {}
+    add_field_counts(previous, field_hashes)
+    second, _ = row_hashes(january_export.iloc[1:], fields, previous)
+
+    assert whole.tolist() == first.tolist() + second.tolist()
+
+
+# #################################################
+# #### HashIndex ##################################
+# #################################################
+
+
+@pytest.mark.dedup
+def test_hash_index_drops_rows_of_overlapping_file(
+    tmp_path, january_export, fields
+):  # pylint: disable=redefined-outer-name
+    file_path = str(tmp_path / "dedup" / "hash_index.npz")
+    index = HashIndex(file_path, fields, "january")
+    assert len(index.drop_seen(january_export)) == 3
+    index.commit()
+
+    # Overlapping export: one of two identical rows and a new row
+    overlapping = pd.concat(
+        [january_export.iloc[1:], january_export.iloc[[0]].assign(Amount=-700)],
+        ignore_index=True,
+    )
+    index = HashIndex(file_path, fields, "january_february")
+    kept = index.drop_seen(overlapping)
+    assert kept["Amount"].tolist() == [-700]
+    index.commit()
+    assert len(HashIndex(file_path, fields, "other")) == 4
+
+
+@pytest.mark.dedup
+def test_hash_index_chunks_equal_whole(
+    tmp_path, january_export, fields
+):  # pylint: disable=redefined-outer-name
+    file_path = str(tmp_path / "hash_index.npz")
+    index = HashIndex(file_path, fields, "january")
+    index.drop_seen(january_export.iloc[:2])
+    index.commit()
+
+    # Identical rows in different chunks keep their occurrence numbers
+    index = HashIndex(file_path, fields, "january_february")
+    kept = [index.drop_seen(january_export.iloc[[row]]) for row in range(3)]
+    assert [len(chunk) for chunk in kept] == [0, 0, 1]
+    index.commit()
+    assert len(index) == 3
+
+
+@pytest.mark.dedup
+def test_hash_index_same_file_again(
+    tmp_path, january_export, fields
+):  # pylint: disable=redefined-outer-name
+    file_path = str(tmp_path / "hash_index.npz")
+    index = HashIndex(file_path, fields, "january")
+    index.drop_seen(january_export)
+    index.commit()
+
+    index = HashIndex(file_path, fields, "january")
+    assert len(index.drop_seen(january_export.iloc[:2])) == 2
+    assert len(index.drop_seen(january_export.iloc[2:])) == 1
+    index.commit()
+    assert len(index) == 3
+
+
+@pytest.mark.dedup
+def test_hash_index_not_saved_without_commit(
+    tmp_path, january_export, fields
+):  # pylint: disable=redefined-outer-name
+    file_path = str(tmp_path / "hash_index.npz")
+    HashIndex(file_path, fields, "january").drop_seen(january_export)
+
+    index = HashIndex(file_path, fields, "other")
+    assert len(index.drop_seen(january_export)) == 3
+
+
+@pytest.mark.dedup
+def test_hash_index_commit_merges_concurrent_commit(
+    tmp_path, january_export, fields
+):  # pylint: disable=redefined-outer-name
+    file_path = str(tmp_path / "hash_index.npz")
+    first = HashIndex(file_path, fields, "january")
+    second = HashIndex(file_path, fields, "february")
+    first.drop_seen(january_export)
+    second.drop_seen(january_export.assign(Amount=-1))
+    first.commit()
+    second.commit()
+
+    index = HashIndex(file_path, fields, "other")
+    assert index.source_names == ["january", "february", "other"]
+    assert len(index) == 6
+    assert index.drop_seen(january_export).empty
+
+
+@pytest.mark.dedup
+def test_hash_index_reload_after_concurrent_commit(
+    tmp_path, january_export, fields
+):  # pylint: disable=redefined-outer-name
+    file_path = str(tmp_path / "hash_index.npz")
+    first = HashIndex(file_path, fields, "january")
+    second = HashIndex(file_path, fields, "january_february")
+    assert not first.reload()
+    first.drop_seen(january_export)
+    second.drop_seen(january_export.iloc[1:])
+    second.commit()
+
+    # Rows kept by first index were saved meanwhile, so file is checked again
+    assert first.reload()
+    assert len(first.drop_seen(january_export)) == 1
+    first.commit()
+    assert len(HashIndex(file_path, fields, "other")) == 3
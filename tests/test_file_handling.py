@@ -2,11 +2,15 @@
 This file is used to test function in 'file_handling.py' file
 """
 
+import gzip
+import lzma
 import os
 import re
+import zipfile
 import pytest
 from utils.file_handling import (
     get_transaction_file,
+    open_transaction_file,
     read_csv_file,
     verify_csv_file,
     InvalidCSVFileError,
@@ -283,3 +287,85 @@ def test_verify_csv_file_success(tmp_path):
     gen = read_csv_file(str(file_path))
 
     assert verify_csv_file(gen, mandatory_cols) is None
+
+
+# #################################################
+# #### compressed files ###########################
+# #################################################
+
+
+@pytest.fixture
+def csv_content():
+    return "Dane kontrahenta;Tytuł\nŁódź Sklep;Płatność\nORLEN;Blik\n".encode("cp1250")
+
+
+@pytest.mark.compressed
+@pytest.mark.parametrize(
+    "file_name",
+    ["Lista_1.csv.gz", "Lista_1.CSV.XZ", "Lista_1.zip", "Lista_1.csv.zip"],
+)
+def test_get_transaction_file_compressed(tmp_path, file_name):
+    """
+    Test function get_transaction_file for compressed files
+    """
+    (tmp_path / file_name).write_bytes(b"")
+    (tmp_path / "Lista_2.txt.gz").write_bytes(b"")
+
+    output = get_transaction_file(str(tmp_path), pattern="lista_")
+    assert output == os.path.join(str(tmp_path), file_name)
+
+    with pytest.raises(FileNotFoundError):
+        get_transaction_file(str(tmp_path), pattern="lista_1", compressed=False)
+
+
+@pytest.mark.compressed
+@pytest.mark.parametrize("extension", [".csv", ".csv.gz", ".csv.xz", ".zip"])
+def test_read_csv_file_compressed(
+    tmp_path, csv_content, extension
+):  # pylint: disable=redefined-outer-name
+    """
+    Test read_csv_file function for compressed files, decoded as cp1250
+    """
+    file_path = tmp_path / f"transactions{extension}"
+    if extension == ".csv.gz":
+        file_path.write_bytes(gzip.compress(csv_content))
+    elif extension == ".csv.xz":
+        file_path.write_bytes(lzma.compress(csv_content))
+    elif extension == ".zip":
+        with zipfile.ZipFile(file_path, "w") as archive:
+            archive.writestr("readme.txt", "not transactions")
+            archive.writestr("transactions.csv", csv_content)
+    else:
+        file_path.write_bytes(csv_content)
+
+    output = next(read_csv_file(str(file_path), custom_separator=";"))
+    assert output["Dane kontrahenta"].tolist() == ["Łódź Sklep", "ORLEN"]
+
+
+@pytest.mark.compressed
+def test_open_transaction_file_counts_uncompressed_bytes(
+    tmp_path, csv_content
+):  # pylint: disable=redefined-outer-name
+    """
+    Test open_transaction_file counts uncompressed bytes read
+    """
+    file_path = tmp_path / "transactions.csv.gz"
+    file_path.write_bytes(gzip.compress(csv_content * 100))
+
+    with open_transaction_file(str(file_path)) as stream:
+        assert stream.read() == csv_content * 100
+        assert stream.raw.bytes_read == len(csv_content) * 100
+
+
+@pytest.mark.compressed
+def test_open_transaction_file_zip_without_csv(tmp_path):
+    """
+    Test open_transaction_file for zip archive without CSV file
+    """
+    file_path = tmp_path / "transactions.zip"
+    with zipfile.ZipFile(file_path, "w") as archive:
+        archive.writestr("readme.txt", "not transactions")
+
+    with pytest.raises(FileNotFoundError, match="No file"):
+        with open_transaction_file(str(file_path)):
+            pass
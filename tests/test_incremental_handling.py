@@ -0,0 +1,186 @@
+"""
+This file is used to test function in 'incremental_handling.py' file
+"""
+
+import pytest
+import pandas as pd
+from utils.incremental_handling import (
+    changed_keys,
+    changed_rules,
+    affected_rows,
+    recategorise,
+    category_state_key,
+    save_category_state,
+    load_category_state,
+)
+from utils.parallel_handling import categorise_data
+
+
+@pytest.fixture
+def transaction_data():
+    data = pd.DataFrame(
+        {
+            "Dane kontrahenta": ["Lidl Polska", "ORLEN 12", "Kiosk", "ORLEN 3", "Kiosk"],
+            "Tytuł": ["Płatność kartą", "Płatność kartą", "Blik", "Blik", "Przelew"],
+        }
+    )
+    return data
+
+
+@pytest.fixture
+def previous_mapping():
+    mapping = {
+        "Contractor": {"Lidl": "LIDL", "ORLEN": "PALIWO"},
+        "Title": {"Blik": "GOTÓWKA"},
+    }
+    return mapping
+
+
+# #################################################
+# #### changed_keys ###############################
+# #################################################
+
+
+@pytest.mark.incremental
+def test_changed_keys_added_removed_changed():
+    old = {"a": "A", "b": "B", "c": "C"}
+    new = {"a": "A", "c": "X", "d": "D"}
+    assert sorted(changed_keys(old, new)) == ["b", "c", "d"]
+
+
+@pytest.mark.incremental
+def test_changed_keys_order_changed():
+    assert changed_keys({"a": "A", "b": "B"}, {"b": "B", "a": "A"}) is None
+
+
+# #################################################
+# #### affected_rows ##############################
+# #################################################
+
+
+@pytest.mark.incremental
+def test_affected_rows(transaction_data):  # pylint: disable=redefined-outer-name
+    mask = affected_rows(transaction_data, ["kiosk"], ["Przelew"])
+    assert mask.tolist() == [False, False, True, False, True]
+
+
+@pytest.mark.incremental
+def test_affected_rows_rule_kind_changed(
+    transaction_data,
+):  # pylint: disable=redefined-outer-name
+    old = {"orlen 1": "PALIWO"}
+    new = {"orlen 1": {"category": "PALIWO", "kind": "word"}}
+    keys = changed_keys(old, new)
+    assert keys == ["orlen 1"]
+    # Rows matched by the old literal rule are affected too
+    rules = changed_rules(old, new, keys)
+    mask = affected_rows(transaction_data, rules, [])
+    assert mask.tolist() == [False, True, False, False, False]
+
+
+# #################################################
+# #### recategorise ###############################
+# #################################################
+
+
+@pytest.mark.incremental
+def test_recategorise_same_as_full_run(
+    transaction_data, previous_mapping
+):  # pylint: disable=redefined-outer-name
+    previous = categorise_data(transaction_data, previous_mapping)["category"]
+    categories = {
+        "Contractor": {"Lidl": "LIDL", "ORLEN": "STACJA", "Kiosk": "KIOSK"},
+        "Title": {"Blik": "GOTÓWKA"},
+    }
+
+    data, affected = recategorise(
+        transaction_data, previous.to_numpy(), previous_mapping, categories
+    )
+    expected = categorise_data(transaction_data, categories)
+    assert affected == 4
+    assert data["category"].tolist() == expected["category"].tolist()
+
+
+@pytest.mark.incremental
+def test_recategorise_full_run_needed(
+    transaction_data, previous_mapping
+):  # pylint: disable=redefined-outer-name
+    categories = {
+        "Contractor": {"ORLEN": "PALIWO", "Lidl": "LIDL"},
+        "Title": {"Blik": "GOTÓWKA"},
+    }
+    previous = ["NO CATEGORY"] * len(transaction_data)
+    assert recategorise(transaction_data, previous, previous_mapping, categories) is None
+    assert recategorise(transaction_data, previous[1:], previous_mapping, {}) is None
+
+
+@pytest.mark.incremental
+def test_recategorise_category_field(
+    transaction_data, previous_mapping
+):  # pylint: disable=redefined-outer-name
+    data = categorise_data(transaction_data, previous_mapping)
+    previous = data["category"].tolist()
+    data = data.rename(columns={"category": "Kategoria"})
+    categories = {
+        "Contractor": {"Lidl": "LIDL", "ORLEN": "PALIWO", "Kiosk": "PRASA"},
+        "Title": {"Blik": "GOTÓWKA"},
+    }
+
+    result, recategorised = recategorise(
+        data,
+        previous,
+        previous_mapping,
+        categories,
+        category_field="Kategoria",
+        min_rows=1,
+        workers=1,
+    )
+    expected = categorise_data(transaction_data, categories)["category"]
+    assert recategorised == 2
+    assert "category" not in result.columns
+    assert result["Kategoria"].tolist() == expected.tolist()
+
+
+# #################################################
+# #### category_state_key #########################
+# #################################################
+
+
+@pytest.mark.incremental
+def test_category_state_key(transaction_data):  # pylint: disable=redefined-outer-name
+    fields = ["Dane kontrahenta", "Tytuł"]
+    key = category_state_key("input", transaction_data, fields)
+    assert key == category_state_key("input", transaction_data.copy(), fields)
+    assert key != category_state_key("other input", transaction_data, fields)
+
+    changed = transaction_data.copy()
+    changed.loc[2, "Tytuł"] = "Przelew"
+    assert key != category_state_key("input", changed, fields)
+    assert key != category_state_key("input", transaction_data.iloc[1:], fields)
+
+
+# #################################################
+# #### save_category_state / load_category_state ##
+# #################################################
+
+
+@pytest.mark.incremental
+def test_save_and_load_category_state(
+    tmp_path, previous_mapping
+):  # pylint: disable=redefined-outer-name
+    file_path = str(tmp_path / "output_categories")
+    assert load_category_state(file_path, "key") is None
+
+    save_category_state(
+        file_path, "key", previous_mapping, pd.Series(["LIDL", "NO CATEGORY"])
+    )
+    row_categories, mapping = load_category_state(file_path, "key")
+    assert row_categories.tolist() == ["LIDL", "NO CATEGORY"]
+    assert mapping == previous_mapping
+    assert load_category_state(file_path, "other key") is None
+
+    # State of other input replaces the whole file, no temporary files left
+    save_category_state(file_path, "other key", {}, pd.Series(["LIDL"]))
+    assert load_category_state(file_path, "key") is None
+    assert load_category_state(file_path, "other key")[0].tolist() == ["LIDL"]
+    assert [path.name for path in tmp_path.iterdir()] == ["output_categories.npz"]
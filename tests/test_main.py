@@ -0,0 +1,220 @@
+"""
+This file is used to test function in 'main.py' file
+"""
+
+import contextlib
+import logging
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+import main
+from utils.summary_handling import read_summary
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEADER = (
+    "Data transakcji;Data księgowania;Dane kontrahenta;Tytuł;Nr rachunku;"
+    "Nazwa banku;Szczegóły;Nr transakcji;Kwota transakcji (waluta rachunku);"
+    "Waluta;Kwota blokady/zwolnienie blokady;Waluta;Kwota płatności w walucie;"
+    "Waluta;Konto;Saldo po transakcji;Waluta"
+)
+
+
+def write_export(file_path, rows: list[tuple[str, str, str, str]]) -> str:
+    """
+    Write ING export with (date, contractor, title, amount) rows.
+    """
+    lines = [HEADER] + [
+        f"{date};;{contractor};{title};;;;;{amount};PLN;;;;;KONTO Direct - KD;1,0;PLN"
+        for date, contractor, title, amount in rows
+    ]
+    with open(file_path, "w", encoding="cp1250") as file:
+        file.write("\n".join(lines) + "\n")
+    return str(file_path)
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    mapping_folder = tmp_path / "files" / "mapping"
+    mapping_folder.mkdir(parents=True)
+    for name in ("category_mapping.json", "field_mapping.json"):
+        shutil.copy(os.path.join(ROOT, "files", name), mapping_folder / name)
+    for folder in ("input", "output", "uncategorised"):
+        (tmp_path / "files" / folder).mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def run_python(code: str, cwd) -> str:
+    """
+    Run 'code' in new interpreter (modules are imported again) and return
+    its output.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=cwd,
+        env={**os.environ, "PYTHONPATH": ROOT},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.strip()
+
+
+@pytest.fixture
+def overlapping_exports(workspace):  # pylint: disable=redefined-outer-name
+    january = [
+        ("02.01.2025", "ORLEN STACJA", "Płatność kartą", "-100,00"),
+        ("02.01.2025", "ORLEN STACJA", "Płatność kartą", "-100,00"),
+        ("15.01.2025", "Kiosk", "Gazeta", "-5,00"),
+    ]
+    february = [
+        ("03.02.2025", "LIDL", "Płatność kartą", "-20,50"),
+        ("04.02.2025", "Kiosk", "Gazeta", "-7,00"),
+    ]
+    input_folder = workspace / "files" / "input"
+    return (
+        write_export(input_folder / "Lista_transakcji_nr_1.csv", january),
+        write_export(input_folder / "Lista_transakcji_nr_2.csv", january[1:] + february),
+    )
+
+
+# #################################################
+# #### import / main ##############################
+# #################################################
+
+
+@pytest.mark.main
+def test_import_main_is_light(tmp_path):
+    output = run_python(
+        "import logging, sys, main; "
+        "print(sorted({'pandas', 'numpy'} & set(sys.modules)), "
+        "len(logging.getLogger().handlers))",
+        tmp_path,
+    )
+    assert output == "[] 0"
+    # No log files or folders are created on import
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.main
+def test_main_without_input_files(workspace):  # pylint: disable=redefined-outer-name
+    output = run_python(
+        "import sys, main; print(main.main([]), 'pandas' in sys.modules)", workspace
+    )
+    assert output == "0 False"
+
+
+# #################################################
+# #### parse_args #################################
+# #################################################
+
+
+@pytest.mark.main
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["--dry-run", "--worker"],
+        ["--sample"],
+        ["--sample", "100"],
+        ["--stratify", "month"],
+        ["--seed", "1"],
+    ],
+)
+def test_parse_args_invalid_combination(argv, capsys):
+    with pytest.raises(SystemExit):
+        main.parse_args(argv)
+    assert "--" in capsys.readouterr().err
+
+
+@pytest.mark.main
+def test_parse_args_dry_run():
+    args = main.parse_args(["--dry-run", "--sample", "--stratify", "month"])
+    assert args.sample == main.DRY_RUN_SAMPLE_SIZE
+    assert args.stratify == "month"
+
+
+# #################################################
+# #### estimate_coverage ##########################
+# #################################################
+
+
+@pytest.mark.coverage
+def test_estimate_coverage(overlapping_exports):  # pylint: disable=redefined-outer-name
+    logger = logging.getLogger(__name__)
+    file_path = overlapping_exports[1]
+    exact = main.estimate_coverage(file_path, logger)
+    assert exact["rows"] == exact["sampled_rows"] == 4
+    assert exact["strata"] == 1
+    # Both 'Kiosk' rows have no category
+    assert exact["no_category_rows"]["share"] == 0.5
+    assert exact["no_category_spend"]["share"] == pytest.approx(12 / 132.5)
+
+    # Sample of each month, larger than month, gives exact shares
+    report = main.estimate_coverage(file_path, logger, 10, "month", seed=1)
+    assert report["strata"] == 2
+    for name in ("no_category_rows", "no_category_spend"):
+        assert report[name]["share"] == pytest.approx(exact[name]["share"])
+        low, high = report[name]["interval"]
+        assert low == pytest.approx(high)
+
+    report = main.estimate_coverage(file_path, logger, 1, "month", seed=1)
+    assert report["rows"] == 4
+    assert report["sampled_rows"] == 2
+    # Nothing is written
+    assert os.listdir(os.path.join("files", "output")) == []
+
+
+# #################################################
+# #### process_transaction_file ###################
+# #################################################
+
+
+@pytest.mark.queue
+def test_process_transaction_file_concurrent_workers(
+    overlapping_exports,
+):  # pylint: disable=redefined-outer-name
+    logger = logging.getLogger(__name__)
+    january, january_february = overlapping_exports
+    parameters = {"result_cache": False, "file_outputs": True}
+    other_worker = []
+
+    @contextlib.contextmanager
+    def output_lock():
+        # Other worker saves its outputs after this one dropped seen rows
+        if not other_worker:
+            other_worker.append(
+                main.process_transaction_file(january_february, logger, **parameters)
+            )
+        yield
+
+    main.process_transaction_file(
+        january, logger, output_lock=output_lock, **parameters
+    )
+
+    summary = read_summary(os.path.join("files", "output", "summary.csv"))
+    # Each of 5 distinct transactions is summarised once
+    assert sum(count for _, count in summary.values()) == 5
+    assert sum(amount for amount, _ in summary.values()) == -23250
+
+
+@pytest.mark.result_cache
+def test_process_transaction_file_result_cache_key(
+    overlapping_exports, caplog
+):  # pylint: disable=redefined-outer-name
+    logger = logging.getLogger(__name__)
+    file_path = overlapping_exports[0]
+    parameters = {"result_cache": True, "dedup": False, "incremental": False}
+    with caplog.at_level(logging.INFO, logger=__name__):
+        main.process_transaction_file(file_path, logger, **parameters)
+        main.process_transaction_file(file_path, logger, stream=True, **parameters)
+        main.process_transaction_file(file_path, logger, **parameters)
+    restored = [
+        record for record in caplog.records if "restored" in record.getMessage()
+    ]
+    # Streaming run is not restored from result of default run
+    assert len(restored) == 1
@@ -0,0 +1,108 @@
+"""
+This file is used to test function in 'matcher_handling.py' file
+"""
+
+import json
+import pytest
+import numpy as np
+import pandas as pd
+from utils.matcher_handling import CategoryMatcher
+from utils.parallel_handling import categorise_data
+
+
+@pytest.fixture
+def categories():
+    mapping = {
+        "Contractor": {
+            "Lidl": "LIDL",
+            "Polska": "INNE",
+            "ORLEN": "PALIWO",
+            "sklep.pl": {"category": "INTERNET", "kind": "regex"},
+            "none": "BRAK",
+        },
+        "Title": {
+            "Blik": "GOTÓWKA",
+            "Wypłata gotówki": "GOTÓWKA",
+            "^nan$": {"category": "BRAK", "kind": "regex"},
+        },
+    }
+    return mapping
+
+
+@pytest.fixture
+def transactions():
+    return [
+        ("Lidl Polska", "Płatność kartą"),
+        ("LIDL", "Płatność kartą"),
+        ("ORLEN STACJA", "BLIK przelew"),
+        ("sklepXpl", "Zakupy"),
+        ("Kiosk", np.nan),
+        (None, "Przelew"),
+        ("Kiosk", "Przelew"),
+    ]
+
+
+# #################################################
+# #### CategoryMatcher ############################
+# #################################################
+
+
+@pytest.mark.matcher
+def test_category_matcher_same_as_categorise_data(
+    categories, transactions
+):  # pylint: disable=redefined-outer-name
+    data = pd.DataFrame(transactions, columns=["Dane kontrahenta", "Tytuł"])
+    expected = categorise_data(data, categories, min_rows=1000)["category"].tolist()
+
+    matcher = CategoryMatcher(categories)
+    assert matcher.categorise_many(transactions) == expected
+    assert expected[:4] == ["INNE", "LIDL", "GOTÓWKA", "INTERNET"]
+    assert expected[-1] == "NO CATEGORY"
+
+
+@pytest.mark.matcher
+def test_category_matcher_dictionaries(
+    categories,
+):  # pylint: disable=redefined-outer-name
+    matcher = CategoryMatcher(categories)
+    rows = [
+        {"Dane kontrahenta": "ORLEN", "Tytuł": "Płatność kartą"},
+        {"contractor": "Kiosk", "title": "Wypłata gotówki"},
+    ]
+    # Missing fields are treated like None values: 'none' text
+    assert matcher.categorise_many(rows) == ["PALIWO", "BRAK"]
+    assert matcher.categorise_many(rows[1:], "contractor", "title") == ["GOTÓWKA"]
+
+
+@pytest.mark.matcher
+def test_category_matcher_from_file(
+    tmp_path, categories
+):  # pylint: disable=redefined-outer-name
+    file_path = tmp_path / "category_mapping.json"
+    file_path.write_text(json.dumps(categories), encoding="utf-8")
+
+    matcher = CategoryMatcher.from_file(str(file_path))
+    assert matcher.categorise("Lidl", None) == "LIDL"
+    assert matcher.categorise("Lidl", None) == "LIDL"
+    assert matcher.cache_info().hits == 1
+
+
+@pytest.mark.matcher
+def test_category_matcher_normalised_titles(
+    categories,
+):  # pylint: disable=redefined-outer-name
+    matcher = CategoryMatcher(categories)
+    assert matcher.categorise("Kiosk", "WYPLATA GOTOWKI 01.02.2025") == "GOTÓWKA"
+    assert matcher.categorise("Kiosk", "Wypłata gotówki 14.03.2025") == "GOTÓWKA"
+    # Titles differing only in dates share cache entry
+    assert matcher.cache_info().hits == 1
+
+
+@pytest.mark.matcher
+def test_category_matcher_literal_keys():
+    matcher = CategoryMatcher(
+        {"Contractor": {"ALDI Sp. z o.o": "ALDI", "c+c": "HURT"}, "Title": {}}
+    )
+    assert matcher.categorise("aldi sp. z o.o.", "") == "ALDI"
+    assert matcher.categorise("ALDI Spx z o.o", "") == "NO CATEGORY"
+    assert matcher.categorise("C+C DELIKOMAT", "") == "HURT"
@@ -0,0 +1,75 @@
+"""
+This file is used to test function in 'memory_handling.py' file
+"""
+
+import json
+import tracemalloc
+import pytest
+from utils.memory_handling import MemoryProfiler, rss_bytes
+
+
+# #################################################
+# #### MemoryProfiler #############################
+# #################################################
+
+
+@pytest.mark.memory_profile
+def test_stage_records_peak_and_top_sites():
+    with MemoryProfiler(top=3) as profiler:
+        with profiler.stage("outer"):
+            kept = bytearray(2 * 1024 * 1024)
+            with profiler.stage("inner"):
+                temporary = bytearray(8 * 1024 * 1024)
+                del temporary
+    assert not tracemalloc.is_tracing()
+
+    outer, inner = profiler.stages["outer"], profiler.stages["inner"]
+    assert inner["peak_growth_mb"] >= 8
+    # Peak of nested stage is included in outer stage
+    assert outer["peak_growth_mb"] >= 10
+    assert 2 <= outer["traced_delta_mb"] < 3
+    assert "test_memory_handling.py:" in outer["top_sites"][0]["site"]
+    assert outer["top_sites"][0]["size_delta_mb"] >= 2
+    assert len(kept) == 2 * 1024 * 1024
+
+
+@pytest.mark.memory_profile
+def test_iterate_aggregates_calls():
+    with MemoryProfiler() as profiler:
+        chunks = list(profiler.iterate("read", (bytes(1000) for _ in range(3))))
+    assert len(chunks) == 3
+    # The last call ends iteration
+    assert profiler.stages["read"]["calls"] == 4
+
+
+@pytest.mark.memory_profile
+def test_disabled_profiler_does_not_trace():
+    profiler = MemoryProfiler(enabled=False)
+    with profiler:
+        with profiler.stage("stage"):
+            assert not tracemalloc.is_tracing()
+    assert not profiler.stages
+
+
+@pytest.mark.memory_profile
+def test_save_report_and_history(tmp_path):
+    for _ in range(2):
+        with MemoryProfiler() as profiler:
+            with profiler.stage("stage"):
+                pass
+            file_path = profiler.save(str(tmp_path), "export", {"file": "export.csv"})
+
+    with open(file_path, "r", encoding="utf-8") as file:
+        report = json.load(file)
+    assert report["run"] == "export"
+    assert report["file"] == "export.csv"
+    assert report["stages"]["stage"]["calls"] == 1
+
+    lines = (tmp_path / "memory_history.jsonl").read_text().splitlines()
+    assert len(lines) == 2
+    assert "top_sites" not in json.loads(lines[0])["stages"]["stage"]
+
+
+@pytest.mark.memory_profile
+def test_rss_bytes():
+    assert rss_bytes() > 0
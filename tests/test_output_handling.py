@@ -0,0 +1,153 @@
+"""
+This file is used to test function in 'output_handling.py' file
+"""
+
+import json
+import pytest
+import pandas as pd
+from utils.output_handling import output_suffix, OutputWriter
+
+
+@pytest.fixture
+def fields():
+    return {
+        "title": "Tytuł",
+        "contractor": "Dane kontrahenta",
+        "transaction_date": "Data transakcji",
+        "amount": "Amount",
+        "account": "Konto",
+        "category": "category",
+    }
+
+
+@pytest.fixture
+def categorised_data():
+    data = pd.DataFrame(
+        {
+            "Data transakcji": pd.to_datetime(
+                ["02.01.2025", "15.01.2025", "03.02.2025"], format="%d.%m.%Y"
+            ),
+            "Dane kontrahenta": ["ORLEN", "Kiosk", "LIDL"],
+            "Tytuł": ["Płatność kartą", "Gazeta", "Płatność kartą"],
+            "Amount": [-10000, -500, -2050],
+            "Konto": ["KONTO Direct - KD"] * 3,
+            "category": ["PALIWO", "NO CATEGORY", "LIDL"],
+        }
+    )
+    return data
+
+
+# #################################################
+# #### output_suffix ##############################
+# #################################################
+
+
+@pytest.mark.output
+def test_output_suffix():
+    assert output_suffix("") == ""
+    assert output_suffix("KONTO Direct - KD") == "_konto_direct_kd"
+    assert output_suffix("Konto Oszczędnościowe") == "_konto_oszczednosciowe"
+
+
+# #################################################
+# #### OutputWriter ###############################
+# #################################################
+
+
+@pytest.mark.output
+@pytest.mark.parametrize("stream", [False, True])
+def test_output_writer_files(
+    tmp_path, fields, categorised_data, stream
+):  # pylint: disable=redefined-outer-name
+    columns = categorised_data.columns.tolist()
+    categories = {"Contractor": {"ORLEN": "PALIWO"}, "Title": {}}
+
+    with OutputWriter(fields, columns, "_kd", stream) as writer:
+        writer.add(categorised_data.iloc[:2])
+        writer.add(categorised_data.iloc[2:])
+        assert writer.write_output(str(tmp_path)) == 1
+        writer.write_summary(str(tmp_path))
+        writer.write_uncategorised(str(tmp_path), categories)
+        assert len(writer.written_files) == 5
+        assert writer.summary_file == str(tmp_path / "summary_kd.csv")
+
+    output = pd.read_excel(tmp_path / "output_kd.xlsx", index_col=0)
+    assert output["category"].tolist()[0] == "NO CATEGORY"
+    assert sorted(output.index.tolist()) == [0, 1, 2]
+    assert sorted(output["Amount"].tolist()) == [-100.0, -20.5, -5.0]
+    assert (tmp_path / "summary_kd.csv").exists()
+    with open(tmp_path / "contractor_kd.json", encoding="utf-8") as file:
+        assert json.load(file) == {"Kiosk": "NO CATEGORY"}
+    # Titles are reported normalised
+    with open(tmp_path / "title_kd.json", encoding="utf-8") as file:
+        assert json.load(file) == {"gazeta": "NO CATEGORY"}
+    assert (tmp_path / "title_suggestions_kd.json").exists()
+
+
+@pytest.mark.output
+def test_output_writer_file_suffix(
+    tmp_path, fields, categorised_data
+):  # pylint: disable=redefined-outer-name
+    columns = categorised_data.columns.tolist()
+    categories = {"Contractor": {}, "Title": {}}
+
+    for file_suffix in ("_nr_1", "_nr_2"):
+        with OutputWriter(fields, columns, "_kd", file_suffix=file_suffix) as writer:
+            writer.add(categorised_data)
+            writer.write_output(str(tmp_path))
+            writer.write_summary(str(tmp_path))
+            writer.write_uncategorised(str(tmp_path), categories)
+            assert writer.summary_file == str(tmp_path / "summary_kd.csv")
+
+    # Outputs of each input file are kept, summary is shared
+    for file_suffix in ("_nr_1", "_nr_2"):
+        assert (tmp_path / f"output{file_suffix}_kd.xlsx").exists()
+        assert (tmp_path / f"title{file_suffix}_kd.json").exists()
+        assert (tmp_path / f"contractor_suggestions{file_suffix}_kd.json").exists()
+    assert not (tmp_path / "output_kd.xlsx").exists()
+    assert not (tmp_path / "summary_nr_1_kd.csv").exists()
+
+
+@pytest.mark.output
+def test_output_writer_max_values(
+    tmp_path, fields, categorised_data, caplog
+):  # pylint: disable=redefined-outer-name
+    columns = categorised_data.columns.tolist()
+    data = pd.concat([categorised_data] * 4, ignore_index=True)
+    data["category"] = "NO CATEGORY"
+    data["Dane kontrahenta"] = [f"Sklep {i}" for i in range(len(data))]
+
+    with OutputWriter(fields, columns, "", True, max_values=5) as writer:
+        for start in range(0, len(data), 3):
+            writer.add(data.iloc[start : start + 3])
+        # Memory of reports is bounded by distinct values, not rows
+        contractors = writer.no_category["Dane kontrahenta"]
+        assert list(contractors) == [f"Sklep {i}" for i in range(5)]
+        assert len(writer.no_category["Tytuł"]) == 2
+        with caplog.at_level("WARNING"):
+            writer.write_uncategorised(str(tmp_path), {"Contractor": {}, "Title": {}})
+
+    assert writer.truncated == {"Dane kontrahenta"}
+    assert "Only 5 distinct contractor values" in caplog.text
+    with open(tmp_path / "contractor.json", encoding="utf-8") as file:
+        assert len(json.load(file)) == 5
+
+
+@pytest.mark.output
+@pytest.mark.parametrize("stream", [False, True])
+def test_output_writer_by_month(
+    tmp_path, fields, categorised_data, stream
+):  # pylint: disable=redefined-outer-name
+    columns = categorised_data.columns.tolist()
+
+    with OutputWriter(fields, columns, "", stream, by_month=True) as writer:
+        writer.add(categorised_data.iloc[:1])
+        writer.add(categorised_data.iloc[1:])
+        assert writer.write_output(str(tmp_path)) == 1
+
+    january = pd.read_excel(tmp_path / "output_2025-01.xlsx", index_col=0)
+    february = pd.read_excel(tmp_path / "output_2025-02.xlsx", index_col=0)
+    assert january.index.tolist() == [1, 0]
+    assert february.index.tolist() == [2]
+    assert str(february["Data transakcji"].iloc[0]).startswith("2025-02-03")
+    assert not (tmp_path / "output.xlsx").exists()
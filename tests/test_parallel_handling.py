@@ -0,0 +1,115 @@
+"""
+This file is used to test function in 'parallel_handling.py' file
+"""
+
+import pytest
+import pandas as pd
+from utils.parallel_handling import split_partitions, categorise_data
+
+
+@pytest.fixture
+def transaction_data():
+    data = pd.DataFrame(
+        {
+            "Dane kontrahenta": [
+                "Lidl Polska",
+                "Płatność Smart Gym ",
+                "Kiosk",
+                "ORLEN STACJA",
+                "Value5",
+                "lidl Polska",
+                "Kiosk",
+            ],
+            "Tytuł": [
+                "Płatność kartą",
+                "Karnet",
+                "Blik",
+                "Płatność kartą",
+                "Wypłata gotówki",
+                "Płatność kartą",
+                "Przelew",
+            ],
+        }
+    )
+    return data
+
+
+@pytest.fixture
+def categories():
+    mapping = {
+        "Contractor": {"Lidl": "LIDL", "Smart Gym": "FITNESS", "ORLEN": "PALIWO"},
+        "Title": {"Blik": "GOTÓWKA", "Wypłata gotówki": "GOTÓWKA"},
+    }
+    return mapping
+
+
+# #################################################
+# #### split_partitions ###########################
+# #################################################
+
+
+@pytest.mark.categorise_data
+def test_split_partitions_keep_all_rows(
+    transaction_data,
+):  # pylint: disable=redefined-outer-name
+    partitions = split_partitions(transaction_data, 3)
+    assert len(partitions) == 3
+    assert pd.concat(partitions).equals(transaction_data)
+
+
+@pytest.mark.categorise_data
+def test_split_partitions_invalid_number(
+    transaction_data,
+):  # pylint: disable=redefined-outer-name
+    with pytest.raises(ValueError):
+        split_partitions(transaction_data, 0)
+
+
+# #################################################
+# #### categorise_data ############################
+# #################################################
+
+
+# below threshold
+@pytest.mark.categorise_data
+def test_categorise_data_single_process(
+    transaction_data, categories
+):  # pylint: disable=redefined-outer-name
+    data = categorise_data(transaction_data, categories, min_rows=1000)
+    assert data["category"].tolist() == [
+        "LIDL",
+        "FITNESS",
+        "GOTÓWKA",
+        "PALIWO",
+        "GOTÓWKA",
+        "LIDL",
+        "NO CATEGORY",
+    ]
+
+
+# parallel result equals single process result
+@pytest.mark.categorise_data
+def test_categorise_data_worker_processes(
+    transaction_data, categories
+):  # pylint: disable=redefined-outer-name
+    expected = categorise_data(transaction_data, categories, min_rows=1000)
+    data = categorise_data(transaction_data, categories, min_rows=1, workers=2)
+    assert data.equals(expected)
+
+
+# early exit result equals default evaluation
+@pytest.mark.categorise_data
+@pytest.mark.parametrize("workers", [1, 2])
+def test_categorise_data_early_exit(
+    transaction_data, categories, workers
+):  # pylint: disable=redefined-outer-name
+    expected = categorise_data(transaction_data, categories, min_rows=1000)
+    data = categorise_data(
+        transaction_data,
+        categories,
+        min_rows=1,
+        workers=workers,
+        early_exit=True,
+        rule_hits={"Contractor": {"ORLEN": 10}},
+    )
+    assert data.equals(expected)
@@ -0,0 +1,71 @@
+"""
+This file is used to test function in 'profile_handling.py' file
+"""
+
+import os
+import pstats
+import time
+import pytest
+from utils.profile_handling import CpuProfiler, StackSampler
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(100))
+    return total
+
+
+# #################################################
+# #### StackSampler ###############################
+# #################################################
+
+
+@pytest.mark.cpu_profile
+def test_stack_sampler_collapsed_and_pstats():
+    sampler = StackSampler(interval=0.001)
+    sampler.start()
+    busy(0.1)
+    sampler.stop()
+
+    lines = sampler.collapsed()
+    assert lines
+    assert any("test_stack_sampler_collapsed_and_pstats" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+    data = sampler.pstats_data()
+    busy_stats = next(value for key, value in data.items() if key[2] == "busy")
+    primitive, calls, _, total, callers = busy_stats
+    assert primitive == calls > 0
+    assert total == pytest.approx(calls * 0.001)
+    assert [key[2] for key in callers] == ["test_stack_sampler_collapsed_and_pstats"]
+
+
+# #################################################
+# #### CpuProfiler ################################
+# #################################################
+
+
+@pytest.mark.cpu_profile
+@pytest.mark.parametrize("mode", ["cprofile", "sample"])
+def test_cpu_profiler_saves_pstats_and_collapsed(tmp_path, mode):
+    with CpuProfiler(mode, interval=0.001) as profiler:
+        busy(0.05)
+    pstats_path, collapsed_path = profiler.save(str(tmp_path), "export")
+
+    assert os.path.basename(pstats_path).startswith("cpu_export_")
+    stats = pstats.Stats(pstats_path)
+    assert any(key[2] == "busy" for key in stats.stats)
+    with open(collapsed_path, "r", encoding="utf-8") as file:
+        assert "busy (" in file.read()
+
+
+@pytest.mark.cpu_profile
+def test_cpu_profiler_disabled(tmp_path):
+    with CpuProfiler(None) as profiler:
+        busy(0.001)
+    assert profiler.save(str(tmp_path), "export") == []
+    assert not os.listdir(tmp_path)
+    with pytest.raises(ValueError):
+        CpuProfiler("perf")
@@ -0,0 +1,85 @@
+"""
+This file is used to test function in 'queue_handling.py' file
+"""
+
+import json
+import os
+import time
+import pytest
+from utils.queue_handling import WorkQueue
+
+
+def accept_csv(name):
+    return name.endswith(".csv")
+
+
+@pytest.fixture
+def input_folder(tmp_path):
+    for name in ("a.csv", "b.csv", "notes.txt"):
+        (tmp_path / name).write_text(name)
+    return tmp_path
+
+
+# #################################################
+# #### WorkQueue ##################################
+# #################################################
+
+
+@pytest.mark.queue
+def test_workers_claim_each_file_once(
+    input_folder,
+):  # pylint: disable=redefined-outer-name
+    first = WorkQueue(str(input_folder), accept_csv, worker_id="first")
+    second = WorkQueue(str(input_folder), accept_csv, worker_id="second")
+
+    claimed = [first.claim(), second.claim(), first.claim()]
+    assert claimed[2] is None
+    assert sorted(os.path.basename(path) for path, _ in claimed[:2]) == [
+        "a.csv",
+        "b.csv",
+    ]
+
+    (path_a, lease_a), (path_b, lease_b) = claimed[:2]
+    first.finish(path_a, lease_a)
+    second.finish(path_b, lease_b, error="Invalid file")
+
+    assert sorted(os.listdir(first.done_folder)) == ["a.csv"]
+    assert sorted(os.listdir(first.failed_folder)) == ["b.csv", "b.csv.error"]
+    assert os.listdir(first.processing_folder) == []
+    assert (input_folder / "notes.txt").exists()
+
+
+@pytest.mark.queue
+def test_expired_lease_is_claimed_again(
+    input_folder,
+):  # pylint: disable=redefined-outer-name
+    stopped = WorkQueue(str(input_folder), accept_csv, worker_id="stopped")
+    path, lease = stopped.claim()
+    # Worker stopped without renewing its lease
+    lease.release = lambda: None
+    old = time.time() - 1000
+    os.utime(lease.lease_path, (old, old))
+
+    queue = WorkQueue(str(input_folder), accept_csv, lease_seconds=60, worker_id="new")
+    claimed_path, new_lease = queue.claim()
+    assert claimed_path == path
+    with open(new_lease.lease_path, "r", encoding="utf-8") as file:
+        assert json.load(file)["worker"] == "new"
+
+    # Stopped worker finishing late does not move the file
+    assert stopped.finish(path, lease) == path
+    queue.finish(claimed_path, new_lease)
+    assert os.listdir(queue.done_folder) == [os.path.basename(path)]
+
+
+@pytest.mark.queue
+def test_queue_drains_folder(input_folder):  # pylint: disable=redefined-outer-name
+    queue = WorkQueue(str(input_folder), accept_csv)
+    names = []
+    for path, lease in queue:
+        names.append(os.path.basename(path))
+        with queue.lock("outputs") as output_lease:
+            assert output_lease.owned
+        queue.finish(path, lease)
+    assert names == ["a.csv", "b.csv"]
+    assert sorted(os.listdir(queue.done_folder)) == ["a.csv", "b.csv"]
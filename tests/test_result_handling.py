@@ -0,0 +1,105 @@
+"""
+This file is used to test function in 'result_handling.py' file
+"""
+
+import os
+import pytest
+from utils.result_handling import (
+    code_version,
+    result_key,
+    save_result,
+    restore_result,
+    evict_results,
+)
+from utils.cache_handling import file_hash
+from utils.summary_handling import read_summary, save_summary
+
+
+@pytest.fixture
+def run_files(tmp_path):
+    input_file = tmp_path / "input.csv"
+    input_file.write_text("a;b\n1;2")
+    mapping_file = tmp_path / "category_mapping.json"
+    mapping_file.write_text('{"Title": {}, "Contractor": {}}')
+    return str(input_file), str(mapping_file)
+
+
+# #################################################
+# #### result_key #################################
+# #################################################
+
+
+@pytest.mark.result_cache
+def test_result_key_depends_on_input_mapping_and_parameters(
+    run_files,
+):  # pylint: disable=redefined-outer-name
+    input_file, mapping_file = run_files
+    key = result_key(input_file, [mapping_file], {"stream": False})
+    assert key == result_key(input_file, [mapping_file], {"stream": False})
+    assert key != result_key(input_file, [mapping_file], {"stream": True})
+    # Precomputed hash of input file gives the same key
+    input_hash = file_hash(input_file)
+    assert key == result_key("other.csv", [mapping_file], {"stream": False}, input_hash)
+
+    with open(mapping_file, "w", encoding="utf-8") as file:
+        file.write('{"Title": {"BLIK": "BLIK"}, "Contractor": {}}')
+    assert key != result_key(input_file, [mapping_file], {"stream": False})
+
+
+@pytest.mark.result_cache
+def test_code_version_depends_on_source_files(tmp_path):
+    (tmp_path / "utils").mkdir()
+    (tmp_path / "main.py").write_text("print(1)")
+    version = code_version(str(tmp_path))
+
+    (tmp_path / "utils" / "data_handling.py").write_text("X = 1")
+    assert version != code_version(str(tmp_path))
+
+
+# #################################################
+# #### save_result / restore_result ###############
+# #################################################
+
+
+@pytest.mark.result_cache
+def test_save_and_restore_result(tmp_path):
+    output_file = tmp_path / "output" / "title.json"
+    output_file.parent.mkdir()
+    output_file.write_text('{"Gazeta": "NO CATEGORY"}')
+    summary_file = str(tmp_path / "output" / "summary.csv")
+    run_summary = {("2025-01", "LIDL", ""): [-500, 1]}
+    save_summary({("2024-12", "LIDL", ""): [-100, 1]}, summary_file)
+
+    entry = str(tmp_path / "results" / "key")
+    assert restore_result(entry) is None
+    save_result(entry, [str(output_file)], [(run_summary, summary_file)])
+
+    output_file.unlink()
+    restored = restore_result(entry, "add")
+    assert restored == [str(output_file), summary_file]
+    assert output_file.read_text() == '{"Gazeta": "NO CATEGORY"}'
+    assert read_summary(summary_file) == {
+        ("2024-12", "LIDL", ""): [-100, 1],
+        ("2025-01", "LIDL", ""): [-500, 1],
+    }
+
+
+# #################################################
+# #### evict_results ##############################
+# #################################################
+
+
+@pytest.mark.result_cache
+def test_evict_results_least_recently_used(tmp_path):
+    output_file = tmp_path / "output.xlsx"
+    output_file.write_bytes(b"x" * 1024)
+    cache_folder = tmp_path / "results"
+    for position, key in enumerate(["old", "used", "new"]):
+        save_result(str(cache_folder / key), [str(output_file)], [])
+        manifest = cache_folder / key / "manifest.json"
+        os.utime(manifest, (1000 + position, 1000 + position))
+    restore_result(str(cache_folder / "used"))
+
+    removed = evict_results(str(cache_folder), 2.5 / 1024)
+    assert removed == [str(cache_folder / "old")]
+    assert sorted(os.listdir(cache_folder)) == ["new", "used"]
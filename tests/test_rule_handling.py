@@ -0,0 +1,199 @@
+"""
+This file is used to test function in 'rule_handling.py' file
+"""
+
+import os
+import pickle
+import subprocess
+import sys
+import pytest
+import pandas as pd
+from utils.rule_handling import RuleSet, parse_rule, mapping_categories, title_regex
+from utils.data_handling import (
+    categorise_field,
+    categorise_early_exit,
+    first_matches,
+    match_matrix,
+)
+from utils.rule_stats_handling import RuleCounter
+
+
+@pytest.fixture
+def mapping():
+    return {
+        "ALDI Sp. z o.o": "ALDI",
+        "orlen": {"category": "PALIWO", "kind": "prefix"},
+        "obi": {"category": "MIESZKANIE", "kind": "word"},
+        r"\d{4}xx": {"category": "KARTA", "kind": "regex"},
+    }
+
+
+@pytest.fixture
+def data():
+    return pd.DataFrame(
+        {
+            "Dane kontrahenta": [
+                "ALDI SP. Z O.O. 123",
+                "ALDI SPX Z O.O",
+                "  ORLEN STACJA 12",
+                "STACJA ORLEN",
+                "OBI Warszawa",
+                "HOBIT",
+                "Karta 1234XX OBI",
+                None,
+            ]
+        }
+    )
+
+
+# #################################################
+# #### parse_rule #################################
+# #################################################
+
+
+@pytest.mark.rules
+def test_parse_rule(mapping):  # pylint: disable=redefined-outer-name
+    assert parse_rule("ALDI Sp. z o.o", mapping["ALDI Sp. z o.o"]) == (
+        "literal",
+        "ALDI",
+    )
+    assert parse_rule("obi", mapping["obi"]) == ("word", "MIESZKANIE")
+    assert parse_rule("x", {"category": "X"}) == ("literal", "X")
+    with pytest.raises(ValueError):
+        parse_rule("x", {"category": "X", "kind": "glob"})
+    assert mapping_categories(mapping)["orlen"] == "PALIWO"
+
+
+# #################################################
+# #### RuleSet ####################################
+# #################################################
+
+
+@pytest.mark.rules
+def test_rule_set_kinds(mapping):  # pylint: disable=redefined-outer-name
+    rules = RuleSet(mapping.items())
+    assert not rules.literal
+    assert list(rules)[0] == ("aldi sp. z o.o", "ALDI")
+    texts = ["aldi sp. z o.o. 1", "aldi spx z o.o", "  orlen 1", "stacja orlen"]
+    texts += ["obi-centrum", "hobit", "karta 1234xx obi"]
+    # The last matching rule decides
+    assert first_matches(rules, texts).tolist() == [0, -1, 1, -1, 2, -1, 3]
+    assert match_matrix(rules, ["karta 1234xx obi"]).tolist() == [
+        [False, False, True, True]
+    ]
+    assert rules.first_match("karta 1234xx obi", [2, 3]) == 2
+
+
+@pytest.mark.rules
+def test_rule_set_literal_fast_path():
+    rules = RuleSet({"C+C": "HURT", "(a)": "A"}.items())
+    assert rules.literal
+    texts = ["c+c delikomat", "cc", "x (a)"]
+    assert first_matches(rules, texts).tolist() == [0, -1, 1]
+    assert pickle.loads(pickle.dumps(rules)).first_match("c+c") == 0
+
+
+@pytest.mark.rules
+def test_rule_set_overlapping_keys():
+    mapping = {
+        "lidl": "LIDL",
+        "lidl polska": "SKLEP",
+        "polska": "POLSKA",
+        "lid": {"category": "LID", "kind": "word"},
+        "li": {"category": "LI", "kind": "prefix"},
+    }
+    rules = RuleSet(mapping.items())
+    # Keys starting at the same position and inside longer keys are all found
+    assert rules.matching("lidl polska sp") == {0, 1, 2, 4}
+    assert rules.matching("sklep lidl polska") == {0, 1, 2}
+    assert rules.matching("lid 1") == {3, 4}
+    assert rules.first_match("lidl polska sp") == 4
+    assert rules.first_match("lidl polska sp", [2, 1, 0]) == 2
+    assert rules.first_match("aldi") == -1
+
+
+class SearchSpy:  # pylint: disable=too-few-public-methods
+    """
+    Compiled pattern recording searched texts.
+    """
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.searched = []
+
+    def search(self, text):
+        self.searched.append(text)
+        return self.pattern.search(text)
+
+
+@pytest.mark.rules
+def test_rule_set_first_match_stops_early():
+    mapping = {
+        "^przelew": {"category": "PRZELEW", "kind": "regex"},
+        "orlen": "PALIWO",
+        "stacja$": {"category": "PALIWO", "kind": "regex"},
+    }
+    rules = RuleSet(mapping.items())
+    spies = [SearchSpy(rules.patterns[0]), None, SearchSpy(rules.patterns[2])]
+    rules.patterns = spies
+    assert rules.first_match("przelew orlen stacja") == 2
+    assert spies[0].searched == []
+    assert rules.first_match("przelew orlen") == 1
+    assert spies[0].searched == []
+    # Rules after the first matching one in order are not evaluated
+    assert rules.first_match("przelew orlen stacja", [0, 2]) == 0
+    assert spies[2].searched == ["przelew orlen stacja", "przelew orlen"]
+    assert rules.first_match("przelew", [1, 2, 0]) == 0
+
+@pytest.mark.rules
+def test_title_regex_rules(caplog):
+    mapping = {
+        r"wypłata\s+gotówki": {"category": "GOTÓWKA", "kind": "regex"},
+        r"karty \d{4}xx": {"category": "KARTA", "kind": "regex"},
+        r"karty <card>$": {"category": "KARTA", "kind": "regex"},
+        r"^x{2}": {"category": "X", "kind": "regex"},
+    }
+    with caplog.at_level("WARNING"):
+        rules = RuleSet(mapping.items(), normalise=True)
+    # Only the key with digits is reported
+    assert [record.args for record in caplog.records] == [(r"karty \d{4}xx",)]
+    assert title_regex("[0-9]") == "[0-9]"
+    assert rules.keys[0] == r"wypłata\s+gotówki"
+    assert rules.matching(rules.text("WYPŁATA  GOTÓWKI 01.02.2025")) == {0}
+    assert rules.matching(rules.text("Płatność kartą Nr karty 4246xx2886")) == {2}
+
+
+@pytest.mark.rules
+def test_rule_handling_without_pandas():
+    code = (
+        "import sys, utils.matcher_handling; "
+        "sys.exit('pandas' in sys.modules or 'numpy' in sys.modules)"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, check=False)
+    assert result.returncode == 0
+
+
+@pytest.mark.rules
+def test_categorise_field_rule_kinds(
+    mapping, data
+):  # pylint: disable=redefined-outer-name
+    field = "Dane kontrahenta"
+    counter = RuleCounter(len(data), {field: len(mapping)})
+    result = categorise_field(data, mapping, field, counter)
+    assert result["category"].tolist() == [
+        "ALDI",
+        "NO CATEGORY",
+        "PALIWO",
+        "NO CATEGORY",
+        "MIESZKANIE",
+        "NO CATEGORY",
+        "KARTA",
+        "NO CATEGORY",
+    ]
+    assert counter.counts()[field]["hits"].tolist() == [1, 1, 2, 1]
+    assert counter.counts()[field]["wins"].tolist() == [1, 1, 1, 1]
+
+    rules = RuleSet(mapping.items())
+    early = categorise_early_exit(data, [(field, rules, None)])
+    assert early["category"].tolist() == result["category"].tolist()
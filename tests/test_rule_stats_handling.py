@@ -0,0 +1,103 @@
+"""
+This file is used to test function in 'rule_stats_handling.py' file
+"""
+
+import pytest
+import pandas as pd
+from utils.parallel_handling import categorise_data
+from utils.rule_stats_handling import (
+    update_rule_stats,
+    read_rule_stats,
+    save_rule_stats,
+    rule_report,
+)
+
+
+@pytest.fixture
+def transaction_data():
+    data = pd.DataFrame(
+        {
+            "Dane kontrahenta": ["Lidl Polska", "ORLEN STACJA", "Kiosk", "Lidl"],
+            "Tytuł": ["Płatność kartą", "Blik", "Blik", "Płatność kartą"],
+        }
+    )
+    return data
+
+
+@pytest.fixture
+def categories():
+    mapping = {
+        "Contractor": {"Lidl": "LIDL", "ORLEN": "PALIWO", "Smart Gym": "FITNESS"},
+        "Title": {"Blik": "GOTÓWKA"},
+    }
+    return mapping
+
+
+# #################################################
+# #### RuleCounter ################################
+# #################################################
+
+
+@pytest.mark.rule_stats
+def test_rule_counts_hits_and_wins(
+    transaction_data, categories
+):  # pylint: disable=redefined-outer-name
+    rule_counts = {}
+    categorise_data(transaction_data, categories, min_rows=1000, rule_counts=rule_counts)
+
+    # 'ORLEN' matched one row, which was overwritten by title rule 'Blik'
+    assert rule_counts["Dane kontrahenta"]["hits"].tolist() == [2, 1, 0]
+    assert rule_counts["Dane kontrahenta"]["wins"].tolist() == [2, 0, 0]
+    assert rule_counts["Tytuł"]["hits"].tolist() == [2]
+    assert rule_counts["Tytuł"]["wins"].tolist() == [2]
+
+
+@pytest.mark.rule_stats
+def test_rule_counts_worker_processes(
+    transaction_data, categories
+):  # pylint: disable=redefined-outer-name
+    expected = {}
+    categorise_data(transaction_data, categories, min_rows=1000, rule_counts=expected)
+    rule_counts = {}
+    categorise_data(
+        transaction_data, categories, min_rows=1, workers=2, rule_counts=rule_counts
+    )
+
+    for field, counts in expected.items():
+        for name, values in counts.items():
+            assert rule_counts[field][name].tolist() == values.tolist()
+
+
+# #################################################
+# #### update_rule_stats / rule_report ############
+# #################################################
+
+
+@pytest.mark.rule_stats
+def test_rule_stats_accumulate_and_report(
+    tmp_path, transaction_data, categories
+):  # pylint: disable=redefined-outer-name
+    file_path = str(tmp_path / "stats" / "rule_stats.json")
+    fields = {"Contractor": "Dane kontrahenta", "Title": "Tytuł"}
+    for _ in range(2):
+        rule_counts = {}
+        categorise_data(
+            transaction_data, categories, min_rows=1000, rule_counts=rule_counts
+        )
+        stats = update_rule_stats(
+            read_rule_stats(file_path), categories, fields, rule_counts, 4
+        )
+        save_rule_stats(stats, file_path)
+
+    stats = read_rule_stats(file_path)
+    assert stats["runs"] == 2
+    assert stats["rows"] == 8
+    assert stats["rules"]["Contractor"]["ORLEN"] == {
+        "hits": 2,
+        "overwritten": 2,
+        "category": "PALIWO",
+    }
+
+    report = rule_report(stats, categories)
+    assert report["never_fired"] == {"Contractor": ["Smart Gym"], "Title": []}
+    assert report["always_shadowed"] == {"Contractor": ["ORLEN"], "Title": []}
@@ -0,0 +1,190 @@
+"""
+This file is used to test function in 'service_handling.py' file
+"""
+
+import http.client
+import json
+import threading
+import time
+import pytest
+from utils.service_handling import parse_transactions, Metrics, CategorisationServer
+
+
+@pytest.fixture
+def mapping_file(tmp_path):
+    file_path = tmp_path / "category_mapping.json"
+    mapping = {
+        "Contractor": {"Lidl": "LIDL", "ORLEN": "PALIWO"},
+        "Title": {"Blik": "GOTÓWKA"},
+    }
+    file_path.write_text(json.dumps(mapping), encoding="utf-8")
+    return file_path
+
+
+@pytest.fixture
+def server(mapping_file):  # pylint: disable=redefined-outer-name
+    server = CategorisationServer(
+        ("127.0.0.1", 0), str(mapping_file), workers=2, queue_size=2, batch_size=2
+    )
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def wait_finished(server):  # pylint: disable=redefined-outer-name
+    # Metrics of request are recorded after its response is sent
+    deadline = time.monotonic() + 5
+    while server.metrics.in_flight and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def request(server, method, path, body=None, headers=None):
+    # pylint: disable=redefined-outer-name
+    connection = http.client.HTTPConnection(*server.server_address[:2], timeout=5)
+    try:
+        connection.request(method, path, body, headers or {})
+        response = connection.getresponse()
+        return response.status, response.read().decode("utf-8")
+    finally:
+        connection.close()
+
+
+# #################################################
+# #### parse_transactions #########################
+# #################################################
+
+
+@pytest.mark.service
+def test_parse_transactions_json_lines():
+    body = '{"Dane kontrahenta": "Lidl", "Tytuł": "Zakupy"}\n\n["ORLEN", null]\n'
+    assert parse_transactions(body, "application/x-ndjson") == [
+        ("Lidl", "Zakupy"),
+        ("ORLEN", None),
+    ]
+
+
+@pytest.mark.service
+def test_parse_transactions_csv():
+    body = "Dane kontrahenta;Tytuł;Kwota\nLidl;Zakupy;-1,00\n"
+    assert parse_transactions(body, "text/csv") == [("Lidl", "Zakupy")]
+    with pytest.raises(ValueError, match="Tytuł"):
+        parse_transactions("Dane kontrahenta\nLidl\n", "text/csv")
+
+
+@pytest.mark.service
+@pytest.mark.parametrize(
+    "body",
+    [
+        "{not json",
+        '"text"',
+        "[1, 2, 3]",
+        '[["x"], "y"]',
+        '{"Dane kontrahenta": "Lidl", "Tytuł": 5}',
+    ],
+)
+def test_parse_transactions_invalid(body):
+    with pytest.raises(ValueError, match="(?i)line 1"):
+        parse_transactions(body, "application/x-ndjson")
+
+
+# #################################################
+# #### Metrics ####################################
+# #################################################
+
+
+@pytest.mark.service
+def test_metrics_snapshot():
+    metrics = Metrics()
+    for latency in (0.001, 0.002, 0.010):
+        metrics.start()
+        metrics.finish(latency, transactions=5)
+    metrics.reject()
+
+    snapshot = metrics.snapshot()
+    assert snapshot["requests"] == 3
+    assert snapshot["transactions"] == 15
+    assert snapshot["rejected"] == 1
+    assert snapshot["in_flight"] == 0
+    assert snapshot["latency_ms"]["p50"] == 2.0
+    assert snapshot["latency_ms"]["max"] == 10.0
+
+
+# #################################################
+# #### CategorisationServer #######################
+# #################################################
+
+
+@pytest.mark.service
+def test_server_categorise_json_lines(server):  # pylint: disable=redefined-outer-name
+    body = "\n".join(
+        json.dumps(transaction, ensure_ascii=False)
+        for transaction in [
+            {"Dane kontrahenta": "Lidl Polska", "Tytuł": "Zakupy"},
+            ["ORLEN", "Blik"],
+            ["Kiosk", "Gazeta"],
+        ]
+    )
+    status, text = request(server, "POST", "/categorise", body.encode("utf-8"))
+
+    assert status == 200
+    assert [json.loads(line)["category"] for line in text.splitlines()] == [
+        "LIDL",
+        "GOTÓWKA",
+        "NO CATEGORY",
+    ]
+
+
+@pytest.mark.service
+def test_server_categorise_csv(server):  # pylint: disable=redefined-outer-name
+    body = "Dane kontrahenta,Tytuł\nORLEN,Paliwo\nKiosk,Blik\n"
+    status, text = request(
+        server,
+        "POST",
+        "/categorise?sep=,",
+        body.encode("utf-8"),
+        {"Content-Type": "text/csv"},
+    )
+    assert status == 200
+    assert text.splitlines() == ["category", "PALIWO", "GOTÓWKA"]
+
+
+@pytest.mark.service
+def test_server_errors_and_metrics(server):  # pylint: disable=redefined-outer-name
+    assert request(server, "POST", "/categorise", b"{not json")[0] == 400
+    assert request(server, "GET", "/unknown")[0] == 404
+    request(server, "POST", "/categorise", b'["Lidl", ""]')
+    wait_finished(server)
+
+    status, text = request(server, "GET", "/metrics")
+    metrics = json.loads(text)
+    assert status == 200
+    assert metrics["requests"] == 2
+    assert metrics["errors"] == 1
+    assert metrics["transactions"] == 1
+    assert "p95" in metrics["latency_ms"]
+
+
+@pytest.mark.service
+def test_server_rejects_invalid_request(server):  # pylint: disable=redefined-outer-name
+    status, text = request(server, "POST", "/categorise", b'["Lidl", ""]\n[["x"], "y"]')
+    assert status == 400
+    assert "line 2" in text
+    status, text = request(
+        server, "POST", "/categorise", headers={"Content-Length": "-1"}
+    )
+    assert status == 400
+    assert text == "Invalid Content-Length"
+
+
+@pytest.mark.service
+def test_server_reloads_changed_mapping(
+    server, mapping_file
+):  # pylint: disable=redefined-outer-name
+    mapping_file.write_text(
+        json.dumps({"Contractor": {"Kiosk": "PRASA"}, "Title": {}}), encoding="utf-8"
+    )
+    status, text = request(server, "POST", "/categorise", b'["Kiosk", ""]')
+    assert status == 200
+    assert json.loads(text)["category"] == "PRASA"
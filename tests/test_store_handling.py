@@ -0,0 +1,160 @@
+"""
+This file is used to test function in 'store_handling.py' file
+"""
+
+import contextlib
+import os
+import subprocess
+import sys
+
+import pytest
+import pandas as pd
+from utils.store_handling import (
+    open_store,
+    append_transactions,
+    spend_per_category_per_month,
+    top_contractors,
+)
+
+
+@pytest.fixture
+def fields():
+    return {
+        "title": "Tytuł",
+        "contractor": "Dane kontrahenta",
+        "transaction_date": "Data transakcji",
+        "amount": "Kwota transakcji (waluta rachunku)",
+        "account": "Konto",
+        "category": "category",
+    }
+
+
+@pytest.fixture
+def categorised_data():
+    data = pd.DataFrame(
+        {
+            "Data transakcji": pd.to_datetime(
+                ["02.01.2025", "15.01.2025", "03.02.2025", "20.12.2024"], format="%d.%m.%Y"
+            ),
+            "Dane kontrahenta": ["ORLEN", "BP", "ORLEN", "LIDL"],
+            "Tytuł": ["Płatność kartą", "Płatność kartą", None, "Płatność kartą"],
+            "Kwota transakcji (waluta rachunku)": [-10010, -5020, -2000, -999],
+            "Konto": ["KONTO Direct - KD"] * 4,
+            "category": ["PALIWO", "PALIWO", "PALIWO", "LIDL"],
+        }
+    )
+    return data
+
+
+@pytest.fixture
+def store(tmp_path):
+    connection = open_store(str(tmp_path / "store" / "transactions.sqlite"))
+    yield connection
+    connection.close()
+
+
+# #################################################
+# #### open_store #################################
+# #################################################
+
+
+def test_open_store_creates_indexes(store):  # pylint: disable=redefined-outer-name
+    indexes = {
+        row[0]
+        for row in store.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    }
+    assert {
+        "ix_transactions_date",
+        "ix_transactions_category_date",
+        "ix_transactions_contractor",
+        "ix_transactions_source",
+    } <= indexes
+
+
+# #################################################
+# #### append_transactions ########################
+# #################################################
+
+
+def test_append_transactions_success(
+    store, categorised_data, fields
+):  # pylint: disable=redefined-outer-name
+    inserted = append_transactions(
+        store, categorised_data, fields, "files/input/file.csv", batch_size=3
+    )
+    assert inserted == 4
+    rows = store.execute(
+        "SELECT transaction_date, amount, title, source_file FROM transactions ORDER BY id"
+    ).fetchall()
+    assert rows[0] == ("2025-01-02", -10010, "Płatność kartą", "file.csv")
+    assert rows[2][2] is None
+
+
+def test_append_transactions_rerun_replaces_source(
+    store, categorised_data, fields
+):  # pylint: disable=redefined-outer-name
+    append_transactions(store, categorised_data, fields, "files/input/file.csv")
+    append_transactions(store, categorised_data.iloc[:1], fields, "other.csv")
+    # Chunks of one run: only the first one replaces rows of previous run
+    for chunk in (categorised_data.iloc[:2], categorised_data.iloc[2:]):
+        append_transactions(
+            store,
+            chunk,
+            fields,
+            "files/input/processing/file.csv",
+            commit=False,
+            replace_source=chunk.index[0] == 0,
+        )
+    store.commit()
+    rows = store.execute(
+        "SELECT source_file, COUNT(*) FROM transactions GROUP BY source_file"
+    ).fetchall()
+    assert sorted(rows) == [("file.csv", 4), ("other.csv", 1)]
+
+
+# #################################################
+# #### queries ####################################
+# #################################################
+
+
+def test_spend_per_category_per_month(
+    store, categorised_data, fields
+):  # pylint: disable=redefined-outer-name
+    append_transactions(store, categorised_data, fields, "file.csv")
+    rows = spend_per_category_per_month(store, 2025)
+    assert rows == [("2025-01", "PALIWO", 15030, 2), ("2025-02", "PALIWO", 2000, 1)]
+
+
+def test_top_contractors(
+    store, categorised_data, fields
+):  # pylint: disable=redefined-outer-name
+    append_transactions(store, categorised_data, fields, "file.csv")
+    rows = top_contractors(store, "PALIWO", 2025, limit=1)
+    assert rows == [("ORLEN", 12010, 2)]
+
+
+def test_query_without_pandas(
+    tmp_path, categorised_data, fields
+):  # pylint: disable=redefined-outer-name
+    db_path = str(tmp_path / "store.sqlite")
+    with contextlib.closing(open_store(db_path)) as connection:
+        append_transactions(connection, categorised_data, fields, "file.csv")
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = (
+        "import sys, query; "
+        f"query.main(['--db', {db_path!r}, 'monthly', '--year', '2025']); "
+        "print('pandas' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.splitlines() == [
+        "2025-01\tPALIWO\t150.30\t2",
+        "2025-02\tPALIWO\t20.00\t1",
+        "False",
+    ]
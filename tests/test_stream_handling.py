@@ -0,0 +1,85 @@
+"""
+This file is used to test function in 'stream_handling.py' file
+"""
+
+import numpy as np
+import pytest
+import pandas as pd
+from utils.stream_handling import (
+    chunk_size_for_budget,
+    ChunkSpill,
+    write_excel_stream,
+)
+
+
+@pytest.fixture
+def chunk():
+    data = pd.DataFrame(
+        {
+            "Dane kontrahenta": ["LIDL", "ORLEN", None],
+            "Amount": [-1.5, -2.25, np.nan],
+            "category": ["LIDL", "PALIWO", "NO CATEGORY"],
+        },
+        index=[10, 11, 12],
+    )
+    return data
+
+
+# #################################################
+# #### chunk_size_for_budget ######################
+# #################################################
+
+
+@pytest.mark.stream
+def test_chunk_size_for_budget_scales_with_budget(
+    chunk,
+):  # pylint: disable=redefined-outer-name
+    small = chunk_size_for_budget(chunk, 1, min_rows=1)
+    large = chunk_size_for_budget(chunk, 10, min_rows=1)
+    assert 0 < small < large
+
+
+@pytest.mark.stream
+def test_chunk_size_for_budget_minimum(chunk):  # pylint: disable=redefined-outer-name
+    assert chunk_size_for_budget(chunk, 0.0001, min_rows=50) == 50
+    assert chunk_size_for_budget(chunk.iloc[0:0], 10, min_rows=50) == 50
+
+
+# #################################################
+# #### ChunkSpill #################################
+# #################################################
+
+
+@pytest.mark.stream
+def test_chunk_spill_read_in_written_order(
+    chunk,
+):  # pylint: disable=redefined-outer-name
+    with ChunkSpill() as spill:
+        spill.write(chunk.iloc[:2])
+        spill.write(chunk.iloc[0:0])
+        spill.write(chunk.iloc[2:])
+        chunks = list(spill.read())
+        assert spill.rows == 3
+
+    assert len(chunks) == 2
+    assert pd.concat(chunks).equals(chunk)
+
+
+# #################################################
+# #### write_excel_stream #########################
+# #################################################
+
+
+@pytest.mark.stream
+def test_write_excel_stream_same_as_to_excel(
+    tmp_path, chunk
+):  # pylint: disable=redefined-outer-name
+    streamed_file = str(tmp_path / "streamed.xlsx")
+    rows = write_excel_stream(
+        [chunk.iloc[:1], chunk.iloc[1:]], chunk.columns.tolist(), streamed_file
+    )
+    assert rows == 3
+
+    expected_file = str(tmp_path / "expected.xlsx")
+    chunk.to_excel(expected_file)
+    assert pd.read_excel(streamed_file).equals(pd.read_excel(expected_file))
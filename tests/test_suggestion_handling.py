@@ -0,0 +1,88 @@
+"""
+This file is used to test function in 'suggestion_handling.py' file
+"""
+
+import pytest
+from utils.suggestion_handling import (
+    ngrams,
+    build_ngram_index,
+    suggest_categories,
+    suggest_for_uncategorised,
+)
+
+
+@pytest.fixture
+def index():
+    entries = {
+        "ORLEN": "PALIWO",
+        "ORLEN STACJA NR 44": "PALIWO",
+        "LIDL": "LIDL",
+        "LEROY MERLIN": "MIESZKANIE",
+    }
+    return build_ngram_index(entries)
+
+
+# #################################################
+# #### ngrams #####################################
+# #################################################
+
+
+@pytest.mark.suggestions
+def test_ngrams_lowercase_and_whitespace():
+    assert ngrams("  Ab   C ") == {" ab", "ab ", "b c", " c "}
+    assert ngrams("A") == {" a "}
+
+
+# #################################################
+# #### suggest_categories #########################
+# #################################################
+
+
+@pytest.mark.suggestions
+def test_suggest_categories_best_match_first(
+    index,
+):  # pylint: disable=redefined-outer-name
+    suggestions = suggest_categories(index, " ORLEN STACJA NR 45 KATOWICE ")
+    assert suggestions[0]["category"] == "PALIWO"
+    assert suggestions[0]["match"] == "ORLEN STACJA NR 44"
+    assert 0 < suggestions[0]["score"] <= 1
+
+
+@pytest.mark.suggestions
+def test_suggest_categories_top_k(index):  # pylint: disable=redefined-outer-name
+    suggestions = suggest_categories(index, "LIDL ORLEN LEROY", top_k=2)
+    assert len(suggestions) == 2
+    assert len({s["category"] for s in suggestions}) == 2
+
+
+@pytest.mark.suggestions
+def test_suggest_categories_no_shared_ngrams(
+    index,
+):  # pylint: disable=redefined-outer-name
+    assert not suggest_categories(index, "xyz")
+
+
+@pytest.mark.suggestions
+@pytest.mark.parametrize("reverse", [False, True])
+def test_suggest_categories_compares_unrounded_scores(reverse):
+    # Both scores round to 0.676
+    entries = [
+        ("lidl katowice nr paliw 44 45 stacja", "PALIWO"),
+        ("x stacja zoo orlen paliw katowice lidl", "PALIWO"),
+    ]
+    ngram_index = build_ngram_index(dict(entries[::-1] if reverse else entries))
+    suggestions = suggest_categories(ngram_index, "orlen stacja paliw nr 44 katowice")
+    assert suggestions == [
+        {
+            "category": "PALIWO",
+            "score": 0.676,
+            "match": "lidl katowice nr paliw 44 45 stacja",
+        }
+    ]
+
+
+@pytest.mark.suggestions
+def test_suggest_for_uncategorised(index):  # pylint: disable=redefined-outer-name
+    suggestions = suggest_for_uncategorised(index, ["lidl sklep", "qqq"])
+    assert suggestions["lidl sklep"][0]["category"] == "LIDL"
+    assert suggestions["qqq"] == []
@@ -0,0 +1,160 @@
+"""
+This file is used to test function in 'summary_handling.py' file
+"""
+
+import pytest
+import pandas as pd
+from utils.dedup_handling import HashIndex
+from utils.summary_handling import (
+    update_summary,
+    merge_summary,
+    merge_source_summary,
+    read_summary,
+    save_summary,
+    write_merged_summary,
+)
+
+
+@pytest.fixture
+def categorised_data():
+    data = pd.DataFrame(
+        {
+            "Data transakcji": pd.to_datetime(
+                ["02.01.2025", "15.01.2025", "03.02.2025", "04.02.2025"], format="%d.%m.%Y"
+            ),
+            "Dane kontrahenta": [" ORLEN ", "BP", "ORLEN", "LIDL"],
+            "Amount": [-10010, -5020, -2000, -999],
+            "category": ["PALIWO", "PALIWO", "PALIWO", "LIDL"],
+        }
+    )
+    return data
+
+
+# #################################################
+# #### update_summary #############################
+# #################################################
+
+
+@pytest.mark.summary
+def test_update_summary_chunks_equal_whole(
+    categorised_data,
+):  # pylint: disable=redefined-outer-name
+    whole = update_summary({}, categorised_data, "Data transakcji", "Amount")
+
+    summary = {}
+    for i in range(0, len(categorised_data), 3):
+        chunk = categorised_data.iloc[i : i + 3]
+        summary = update_summary(summary, chunk, "Data transakcji", "Amount")
+
+    assert summary.keys() == whole.keys()
+    assert summary[("2025-01", "PALIWO", "")] == [-15030, 2]
+    assert summary[("2025-02", "LIDL", "")] == [-999, 1]
+
+
+@pytest.mark.summary
+def test_update_summary_by_contractor(
+    categorised_data,
+):  # pylint: disable=redefined-outer-name
+    summary = update_summary(
+        {}, categorised_data, "Data transakcji", "Amount", "category", "Dane kontrahenta"
+    )
+    assert summary[("2025-01", "PALIWO", "ORLEN")] == [-10010, 1]
+    assert summary[("2025-01", "PALIWO", "BP")] == [-5020, 1]
+
+
+# #################################################
+# #### merge_summary ##############################
+# #################################################
+
+
+@pytest.mark.summary
+def test_merge_summary_replace_month():
+    existing = {("2025-01", "LIDL", ""): [-10, 1], ("2025-02", "LIDL", ""): [-5, 1]}
+    new = {("2025-02", "PALIWO", ""): [-20, 2]}
+
+    merged = merge_summary(existing, new, "replace")
+    assert merged == {
+        ("2025-01", "LIDL", ""): [-10, 1],
+        ("2025-02", "PALIWO", ""): [-20, 2],
+    }
+
+
+@pytest.mark.summary
+def test_merge_summary_add_month():
+    existing = {("2025-02", "LIDL", ""): [-5, 1]}
+    new = {("2025-02", "LIDL", ""): [-20, 2]}
+
+    merged = merge_summary(existing, new, "add")
+    assert merged == {("2025-02", "LIDL", ""): [-25, 3]}
+    assert existing == {("2025-02", "LIDL", ""): [-5, 1]}
+
+
+@pytest.mark.summary
+def test_merge_summary_unknown_mode():
+    with pytest.raises(ValueError):
+        merge_summary({}, {}, "recompute")
+
+
+@pytest.mark.summary
+def test_merge_source_summary_replaces_own_contribution():
+    existing = {("2025-02", "LIDL", ""): [-60, 3], ("2025-01", "LIDL", ""): [-5, 1]}
+    previous = {("2025-02", "LIDL", ""): [-30, 1], ("2025-01", "LIDL", ""): [-5, 1]}
+    new = {("2025-02", "LIDL", ""): [-35, 2]}
+
+    merged = merge_source_summary(existing, previous, new)
+    assert merged == {("2025-02", "LIDL", ""): [-65, 4]}
+    assert merge_source_summary({}, None, new) == new
+
+
+# #################################################
+# #### write_merged_summary #######################
+# #################################################
+
+
+@pytest.mark.summary
+def test_write_merged_summary_overlapping_exports(tmp_path):
+    fields = ["Data transakcji", "Amount"]
+    summary_file = str(tmp_path / "summary.csv")
+    index_file = str(tmp_path / "hash_index.npz")
+
+    def export(amounts):
+        return pd.DataFrame(
+            {
+                "Data transakcji": pd.to_datetime(["2025-02-03"] * len(amounts)),
+                "Amount": amounts,
+                "category": "LIDL",
+            }
+        )
+
+    def run(source, data):
+        index = HashIndex(index_file, fields, source)
+        data = index.drop_seen(data)
+        summary = update_summary({}, data, "Data transakcji", "Amount")
+        write_merged_summary(summary_file, summary, "replace", source)
+        index.commit()
+
+    # Export B repeats -20.00 of export A: only -30.00 is new
+    run("A", export([-1000, -2000]))
+    run("B", export([-2000, -3000]))
+    assert read_summary(summary_file) == {("2025-02", "LIDL", ""): [-6000, 3]}
+    # Processing any export again does not change the summary
+    run("B", export([-2000, -3000]))
+    run("A", export([-1000, -2000]))
+    assert read_summary(summary_file) == {("2025-02", "LIDL", ""): [-6000, 3]}
+
+
+# #################################################
+# #### read_summary / save_summary ################
+# #################################################
+
+
+@pytest.mark.summary
+def test_save_and_read_summary(tmp_path):
+    file_path = str(tmp_path / "summary.csv")
+    assert read_summary(file_path) == {}
+
+    summary = {("2025-01", "LIDL", ""): [-15030, 2], ("2025-02", "LIDL", ""): [-5, 1]}
+    save_summary(summary, file_path)
+    with open(file_path, encoding="utf-8") as file:
+        assert "2025-01;LIDL;;-150.30;2" in file.read()
+    assert read_summary(file_path) == summary
@@ -0,0 +1,82 @@
+"""
+This file is used to test function in 'title_handling.py' file
+"""
+
+import numpy as np
+import pytest
+import pandas as pd
+from utils.title_handling import normalise_title
+from utils.data_handling import categorise_title, normalise_titles
+
+
+@pytest.fixture
+def titles():
+    return pd.Series(
+        [
+            " Płatność kartą  12.03.2025 Nr karty 4246xx2886",
+            "PŁATNOŚĆ KARTĄ 01.02.2025 Nr karty 5375xx1234",
+            " Wypłata gotówki 2025-01-31 10:22",
+            "Zakup 1 234,56 PLN terminal 88123456",
+            "Allegro 49.99 zł",
+            None,
+        ]
+    )
+
+
+# #################################################
+# #### normalise_title ############################
+# #################################################
+
+
+@pytest.mark.titles
+def test_normalise_title():
+    assert (
+        normalise_title(" Płatność kartą  12.03.2025 Nr karty 4246xx2886")
+        == "platnosc karta <date> nr karty <card>"
+    )
+    assert normalise_title("Wypłata gotówki 2025-01-31 10:22") == (
+        "wyplata gotowki <date>"
+    )
+    assert normalise_title("Zakup 1 234,56 PLN terminal 88123456") == (
+        "zakup <amount> terminal <number>"
+    )
+    assert normalise_title("Allegro 49.99 zł") == "allegro <amount>"
+    assert normalise_title("Smart Gym") == "smart gym"
+
+
+# #################################################
+# #### normalise_titles ###########################
+# #################################################
+
+
+@pytest.mark.titles
+def test_normalise_titles_same_as_normalise_title(
+    titles,
+):  # pylint: disable=redefined-outer-name
+    normalised = normalise_titles(titles)
+    assert normalised.tolist()[:-1] == [normalise_title(t) for t in titles[:-1]]
+    assert normalised.iloc[0] == normalised.iloc[1]
+    assert normalised.nunique() == 4
+    assert np.isnan(normalised.iloc[-1])
+    assert normalised.index.equals(titles.index)
+
+
+@pytest.mark.titles
+def test_categorise_title_normalised(
+    titles,
+):  # pylint: disable=redefined-outer-name
+    data = pd.DataFrame({"Tytuł": titles})
+    mapping = {
+        "płatność kartą": "KARTA",
+        "WYPLATA GOTOWKI": "GOTÓWKA",
+        "terminal <number>": "TERMINAL",
+    }
+    categories = categorise_title(data, mapping)["category"].tolist()
+    assert categories == [
+        "KARTA",
+        "KARTA",
+        "GOTÓWKA",
+        "TERMINAL",
+        "NO CATEGORY",
+        "NO CATEGORY",
+    ]
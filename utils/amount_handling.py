@@ -0,0 +1,16 @@
+"""
+This file contains all method related to amounts:
+    -format_amount
+
+Amounts are kept as integer minor units (grosze). This module does not need
+pandas, so store queries (see 'query.py') stay light.
+"""
+
+
+def format_amount(amount: int) -> str:
+    """
+    Format amount in minor units (grosze) as decimal text, e.g. -12345 -> "-123.45".
+    """
+    amount = int(amount)
+    sign = "-" if amount < 0 else ""
+    return f"{sign}{abs(amount) // 100}.{abs(amount) % 100:02d}"
@@ -0,0 +1,162 @@
+"""
+This file contains all method related to cache of parsed input:
+    -file_hash
+    -snapshot_key
+    -save_snapshot
+    -load_snapshot
+    -evict_folders
+    -evict_snapshots
+
+Snapshot is a folder with one NumPy '.npy' file per column. Text columns are
+saved as fixed width unicode arrays, so all columns can be memory-mapped.
+Snapshots are evicted least recently used first when cache exceeds size limit.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+
+LOGGER = logging.getLogger(__name__)
+
+# Change when snapshot layout or transform logic changes, to invalidate old snapshots
+SNAPSHOT_VERSION = 3
+META_FILE = "meta.json"
+INDEX_FILE = "__index__.npy"
+
+
+def file_hash(file_path: str, block_size: int = 1024 * 1024) -> str:
+    """
+    Return sha256 hex digest of file content.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        while block := file.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def snapshot_key(
+    file_path: str, parameters: dict, input_hash: str | None = None
+) -> str:
+    """
+    Return snapshot key built from input file content and transform parameters.
+    'input_hash' is 'file_hash' of 'file_path' if already computed.
+    """
+    digest = hashlib.sha256()
+    digest.update((input_hash or file_hash(file_path)).encode())
+    digest.update(json.dumps(parameters, sort_keys=True, default=str).encode())
+    digest.update(str(SNAPSHOT_VERSION).encode())
+    return digest.hexdigest()
+
+
+def save_snapshot(folder: str, data: pd.DataFrame) -> None:
+    """
+    Save data as snapshot in 'folder'. Existing snapshot is replaced atomically.
+    """
+    parent = os.path.dirname(os.path.abspath(folder))
+    os.makedirs(parent, exist_ok=True)
+    temp_folder = tempfile.mkdtemp(dir=parent)
+
+    columns = []
+    for position, column in enumerate(data.columns):
+        values = data[column]
+        file_name = f"{position}.npy"
+        if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_datetime64_dtype(
+            values
+        ):
+            np.save(os.path.join(temp_folder, file_name), values.to_numpy())
+            kind = "values"
+        else:
+            mask = values.isna().to_numpy()
+            text = values.where(~mask, "").astype(str).to_numpy(dtype=str)
+            np.save(os.path.join(temp_folder, file_name), text)
+            np.save(os.path.join(temp_folder, f"{position}.mask.npy"), mask)
+            kind = "text"
+        columns.append({"name": column, "file": file_name, "kind": kind})
+
+    np.save(os.path.join(temp_folder, INDEX_FILE), data.index.to_numpy())
+    with open(os.path.join(temp_folder, META_FILE), "w", encoding="utf-8") as file:
+        json.dump({"version": SNAPSHOT_VERSION, "columns": columns}, file)
+
+    shutil.rmtree(folder, ignore_errors=True)
+    os.replace(temp_folder, folder)
+    LOGGER.debug("Snapshot saved in: %s (%s rows)", folder, len(data))
+
+
+def load_snapshot(folder: str) -> pd.DataFrame | None:
+    """
+    Load snapshot from 'folder'. Return None if snapshot does not exist.
+    Column files are memory-mapped.
+    """
+    meta_file = os.path.join(folder, META_FILE)
+    if not os.path.exists(meta_file):
+        return None
+
+    with open(meta_file, "r", encoding="utf-8") as file:
+        meta = json.load(file)
+    if meta["version"] != SNAPSHOT_VERSION:
+        return None
+
+    data = {}
+    for column in meta["columns"]:
+        values = np.load(os.path.join(folder, column["file"]), mmap_mode="r")
+        if column["kind"] == "text":
+            mask = np.load(os.path.join(folder, column["file"][:-4] + ".mask.npy"))
+            data[column["name"]] = pd.Series(values.astype(object)).mask(mask)
+        else:
+            data[column["name"]] = pd.Series(values)
+
+    data = pd.DataFrame(data)
+    data.index = pd.Index(np.load(os.path.join(folder, INDEX_FILE)))
+    # Last use time for LRU eviction
+    os.utime(meta_file)
+    LOGGER.debug("Snapshot loaded from: %s (%s rows)", folder, len(data))
+    return data
+
+
+def _folder_size(folder: str) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(folder) if entry.is_file())
+
+
+def evict_folders(cache_folder: str, marker_file: str, max_size_mb: float) -> list[str]:
+    """
+    Remove least recently used entry folders of 'cache_folder' until total
+    size is within 'max_size_mb'. Entry is a folder with 'marker_file', whose
+    modification time is its last use time. Return removed entry folders.
+    """
+    if not os.path.isdir(cache_folder):
+        return []
+
+    entries = []
+    for entry in os.scandir(cache_folder):
+        marker_path = os.path.join(entry.path, marker_file)
+        if entry.is_dir() and os.path.exists(marker_path):
+            entries.append(
+                (os.path.getmtime(marker_path), _folder_size(entry.path), entry.path)
+            )
+
+    total_size = sum(size for _, size, _ in entries)
+    removed = []
+    for _, size, folder in sorted(entries):
+        if total_size <= max_size_mb * 1024 * 1024:
+            break
+        shutil.rmtree(folder, ignore_errors=True)
+        total_size -= size
+        removed.append(folder)
+        LOGGER.debug("Cache entry evicted: %s", folder)
+    return removed
+
+
+def evict_snapshots(cache_folder: str, max_size_mb: float) -> list[str]:
+    """
+    Remove least recently used snapshots from 'cache_folder' until total
+    size is within 'max_size_mb'. Return removed snapshot folders.
+    """
+    return evict_folders(cache_folder, META_FILE, max_size_mb)
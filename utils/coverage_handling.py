@@ -0,0 +1,208 @@
+"""
+This file contains all method related to category coverage estimation:
+    -Reservoir
+    -StratifiedSample
+    -wilson_interval
+    -coverage_report
+
+Rows are sampled in one pass over chunks with reservoir sampling (Algorithm R),
+uniformly or separately for each stratum (e.g. month or account). Only sampled
+rows are categorised. Share of rows and spend without category is estimated
+with stratified estimator; exact row count and spend of each stratum are known
+from the pass, so only the uncategorised share is estimated.
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+
+class Reservoir:
+    """
+    Uniform random sample of at most 'size' rows of chunks added in order.
+    Size None keeps all rows.
+    """
+
+    def __init__(self, size: int | None, rng: np.random.Generator):
+        self.size = size
+        self.rng = rng
+        self.seen = 0
+        self._sample = pd.DataFrame()
+        # Chunks kept whole when size is None, concatenated once
+        self._parts: list[pd.DataFrame] = []
+
+    @property
+    def sample(self) -> pd.DataFrame:
+        """
+        Rows sampled so far.
+        """
+        if self._parts:
+            if len(self._sample):
+                self._parts.insert(0, self._sample)
+            self._sample = pd.concat(self._parts, ignore_index=True)
+            self._parts = []
+        return self._sample
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        """
+        Add chunk rows to the stream. Each row seen so far stays in sample
+        with the same probability.
+        """
+        if self.size is None:
+            self._parts.append(chunk)
+            self.seen += len(chunk)
+            return
+        filled = max(0, min(self.size - self.seen, len(chunk)))
+        # Row number k (0-based) replaces random slot j <= k when j < size
+        row_numbers = np.arange(self.seen + filled, self.seen + len(chunk))
+        slots = self.rng.integers(0, row_numbers + 1)
+        replacing = np.flatnonzero(slots < self.size)
+        slots = slots[replacing]
+        # The last row written into a slot wins, as in sequential algorithm
+        unique_slots, last = np.unique(slots[::-1], return_index=True)
+        rows = replacing[::-1][last] + filled
+        self.seen += len(chunk)
+        if filled == 0 and len(rows) == 0:
+            return
+
+        take = np.arange(len(self._sample) + filled)
+        take[unique_slots] = len(self._sample) + filled + np.arange(len(rows))
+        parts = [chunk.iloc[:filled], chunk.iloc[rows]]
+        if len(self._sample):
+            parts.insert(0, self._sample)
+        candidates = pd.concat(parts, ignore_index=True)
+        self._sample = candidates.iloc[take].reset_index(drop=True)
+
+
+class StratifiedSample:
+    """
+    Reservoir sample of each stratum with exact row count and spend of strata.
+    Without 'strata' function all rows form one stratum (uniform sample).
+    Size None keeps all rows.
+    """
+
+    def __init__(
+        self,
+        size: int | None,
+        amount_field: str,
+        strata=None,
+        seed: int | None = None,
+    ):
+        self.size = size
+        self.amount_field = amount_field
+        self.strata = strata
+        self.rng = np.random.default_rng(seed)
+        self.reservoirs: dict[str, Reservoir] = {}
+        self.rows: dict[str, int] = {}
+        self.spend: dict[str, int] = {}
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        """
+        Add chunk rows to sample of their stratum.
+        """
+        groups = {"": chunk} if self.strata is None else self.strata(chunk)
+        for name, group in groups.items():
+            name = str(name)
+            if name not in self.reservoirs:
+                self.reservoirs[name] = Reservoir(self.size, self.rng)
+                self.rows[name] = 0
+                self.spend[name] = 0
+            self.reservoirs[name].add(group)
+            self.rows[name] += len(group)
+            self.spend[name] += int(-group[self.amount_field].sum())
+
+    def samples(self) -> dict[str, pd.DataFrame]:
+        """
+        Return sample of each stratum.
+        """
+        return {name: reservoir.sample for name, reservoir in self.reservoirs.items()}
+
+
+def wilson_interval(
+    share: float, size: float, confidence: float = 0.95
+) -> tuple[float, float]:
+    """
+    Return Wilson score interval of proportion 'share' observed in 'size'
+    trials. Non-integer (effective) size is accepted.
+    """
+    if size <= 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    denominator = 1 + z**2 / size
+    center = (share + z**2 / (2 * size)) / denominator
+    margin = z * np.sqrt(share * (1 - share) / size + z**2 / (4 * size**2))
+    margin /= denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def coverage_report(
+    sample: StratifiedSample,
+    categorised: dict[str, pd.DataFrame],
+    category_field: str = "category",
+    no_category_value: str = "NO CATEGORY",
+    confidence: float = 0.95,
+) -> dict:
+    """
+    Estimate share of rows and spend without category from categorised
+    sample of each stratum.
+
+    Row share interval is Wilson interval with effective sample size of
+    stratified estimator; spend share interval is normal approximation.
+    Finite population correction is applied, so sample with all rows
+    gives exact shares with zero width intervals.
+    """
+    total_rows = sum(sample.rows.values())
+    total_spend = sum(sample.spend.values())
+    row_share = row_variance = spend_share = spend_variance = 0.0
+    sampled = strata = 0
+    for name, data in categorised.items():
+        size, rows = len(data), sample.rows[name]
+        if size == 0:
+            continue
+        sampled += size
+        strata += 1
+        missing = (data[category_field] == no_category_value).to_numpy()
+        missing_spend = np.where(missing, -data[sample.amount_field].to_numpy(), 0)
+        correction = 1 - size / rows
+        weight = rows / total_rows
+        share = missing.mean()
+        row_share += weight * share
+        if size > 1:
+            row_variance += weight**2 * correction * share * (1 - share) / (size - 1)
+        if total_spend:
+            spend_weight = rows / total_spend
+            spend_share += spend_weight * missing_spend.mean()
+            if size > 1:
+                spend_variance += (
+                    spend_weight**2 * correction * missing_spend.var(ddof=1) / size
+                )
+
+    if sampled == total_rows:
+        row_interval = (row_share, row_share)
+    else:
+        # Without variance (no or only uncategorised rows) sample size is used
+        effective_size = (
+            row_share * (1 - row_share) / row_variance if row_variance else sampled
+        )
+        row_interval = wilson_interval(row_share, effective_size, confidence)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    spend_margin = z * np.sqrt(spend_variance)
+    spend_interval = (
+        max(0.0, spend_share - spend_margin),
+        min(1.0, spend_share + spend_margin),
+    )
+    return {
+        "rows": total_rows,
+        "sampled_rows": sampled,
+        "strata": strata,
+        "confidence": confidence,
+        "no_category_rows": {
+            "share": float(row_share),
+            "interval": [float(value) for value in row_interval],
+        },
+        "no_category_spend": {
+            "share": float(spend_share),
+            "interval": [float(value) for value in spend_interval],
+        },
+    }
@@ -1,9 +1,19 @@
 """
 This file contains all method related to data transformation:
+    -parse_amount_minor
     -transform data
+    -split_by_account
+    -split_by_month
+    -compile_categories
+    -normalise_titles
+    -rule_texts
+    -first_matches
+    -match_matrix
     -categorise_field
     -categorise_contractor
     -categorise_title
+    -evaluation_order
+    -categorise_early_exit
 
 """
 
@@ -11,23 +21,77 @@ import logging
 import pandas as pd
 import numpy as np
 
+from utils.rule_handling import RuleSet
+from utils.title_handling import FOLD_TABLE, TITLE_FRAGMENTS, fragment_token
 
 LOGGER = logging.getLogger(__name__)
 
 
+def parse_amount_minor(values: pd.Series) -> np.ndarray:
+    """
+    Parse polish amounts like "-123,45" into int64 minor units (grosze).
+    Text is parsed column by column of character codes, without per-row Python.
+    Accepted characters: digits, "-", one decimal point ("," or ".") with up
+    to 2 digits after it, spaces used as thousands separator.
+    Numeric values are treated as amounts in main units.
+    """
+    if pd.api.types.is_integer_dtype(values):
+        return values.to_numpy(dtype=np.int64) * 100
+    if pd.api.types.is_float_dtype(values):
+        return np.round(values.to_numpy(dtype=np.float64) * 100).astype(np.int64)
+
+    text = np.asarray(values.to_numpy(), dtype=str)
+    width = text.dtype.itemsize // 4
+    # One row per character position, each step works on a contiguous column
+    columns = text.view(np.uint32).reshape(len(text), width).T.copy()
+
+    value = np.zeros(len(text), dtype=np.int64)
+    fraction_digits = np.zeros(len(text), dtype=np.int64)
+    any_digit = np.zeros(len(text), dtype=bool)
+    separator_seen = np.zeros(len(text), dtype=bool)
+    minus_seen = np.zeros(len(text), dtype=bool)
+    invalid = np.zeros(len(text), dtype=bool)
+    for codes in columns:
+        digits = codes - ord("0")  # unsigned, other characters give big numbers
+        digit = digits < 10
+        separator = (codes == ord(",")) | (codes == ord("."))
+        minus = codes == ord("-")
+        ignored = (codes == 0) | (codes == ord(" ")) | (codes == 0xA0)
+        invalid |= ~(digit | separator | minus | ignored)
+        invalid |= (separator & separator_seen) | (minus & minus_seen)
+        value = np.where(digit, value * 10 + digits, value)
+        fraction_digits += digit & separator_seen
+        any_digit |= digit
+        separator_seen |= separator
+        minus_seen |= minus
+
+    invalid |= (fraction_digits > 2) | ~any_digit
+    if invalid.any():
+        raise ValueError(f"Invalid amount: '{text[invalid.argmax()]}'")
+    value *= 10 ** (2 - fraction_digits)
+    return np.where(minus_seen, -value, value)
+
+
 def transform_data(
     data_chunk: pd.DataFrame,
     mandatory_fields: list[str],
     amount_field_name: str = "Kwota transakcji (waluta rachunku)",
     account_field_name: str = "Konto",
-    account_field_value: str = "KONTO Direct - KD",
+    account_field_value: str | list[str] = "KONTO Direct - KD",
+    date_field_name: str | None = None,
+    date_format: str = "%d.%m.%Y",
 ) -> pd.DataFrame:
     """
     Transform chunk data base d on the following details:
     -Remove blocked transactions (transactions without amount)
-    -Keep only data from account KONTO Direct - KD
-    -Unify decimal point to "."
+    -Keep only data from account(s) 'account_field_value' (KONTO Direct - KD)
+    -Convert amount into int64 minor units (grosze), e.g. "-123,45" -> -12345
     -Keep only negative transactions (spendings)
+    -Parse 'date_field_name' (if provided) with explicit 'date_format'
+     into dates with day precision: time is dropped and dtype is
+     datetime64[s], the coarsest unit pandas supports (datetime64[D] is
+     not a valid pandas dtype). 'values.to_numpy().astype("datetime64[D]")'
+     gives NumPy day dates without loss.
     """
 
     fields = data_chunk.columns.tolist()
@@ -42,21 +106,144 @@ def transform_data(
     )
     # Remove blocked transactions (transactions without amount)
     data = data.dropna(subset=[amount_field_name])
-    data = data[data[account_field_name] == account_field_value]
+    if isinstance(account_field_value, str):
+        account_field_value = [account_field_value]
+    data = data[data[account_field_name].isin(account_field_value)]
     # In polish files "," character is set as decimal point.
-    # Change it into "."
-    col = data[amount_field_name].astype(str).str.replace(",", ".")
-    data[amount_field_name] = col.astype(float)
+    # Amounts are kept as integer grosze to avoid float rounding
+    data[amount_field_name] = parse_amount_minor(data[amount_field_name])
 
     data = data[data[amount_field_name] < 0]
+    if date_field_name:
+        # Explicit format: no per-row format inference, repeated dates parsed once.
+        # Dates are truncated to days; pandas cannot store datetime64[D]
+        dates = pd.to_datetime(data[date_field_name], format=date_format, cache=True)
+        data[date_field_name] = dates.dt.normalize().astype("datetime64[s]")
     return data
 
 
+def split_by_account(
+    data: pd.DataFrame,
+    account_field_name: str = "Konto",
+    accounts: list[str] | None = None,
+) -> dict[str, pd.DataFrame]:
+    """
+    Split data into partitions per account with a single groupby.
+    Accounts from 'accounts' without rows get empty partition.
+    """
+    partitions = {
+        account: partition
+        for account, partition in data.groupby(account_field_name, sort=False)
+    }
+    for account in accounts or []:
+        partitions.setdefault(account, data.iloc[0:0])
+    return partitions
+
+
+def split_by_month(
+    data: pd.DataFrame, date_field_name: str = "Data transakcji"
+) -> dict[str, pd.DataFrame]:
+    """
+    Split data into partitions per month 'yyyy-mm' of parsed date field.
+    """
+    months = data[date_field_name].to_numpy().astype("datetime64[M]").astype(str)
+    return {month: partition for month, partition in data.groupby(months, sort=True)}
+
+
+def compile_categories(
+    categories: dict[str, str | dict] | RuleSet, normalise: bool = False
+) -> RuleSet:
+    """
+    Compile mapping 'categories' into RuleSet of (lowercase key, category) rules.
+    Rules keep mapping order, so the last matching key still wins.
+    With 'normalise' rules match normalised titles (see 'title_handling').
+    """
+    if isinstance(categories, RuleSet):
+        return categories
+    if isinstance(categories, dict):
+        categories = categories.items()
+    return RuleSet(categories, normalise)
+
+
+def normalise_titles(values: pd.Series) -> pd.Series:
+    """
+    Return normalised titles of 'values' (see 'title_handling'). Fragments are
+    replaced in each distinct value once; whitespace and diacritics are
+    folded only in distinct values left after that. Missing values stay
+    missing.
+    """
+    codes, uniques = pd.factorize(values)
+    replaced = (
+        pd.Series(uniques, dtype=object)
+        .astype(str)
+        .str.casefold()
+        .str.replace(TITLE_FRAGMENTS, fragment_token, regex=True)
+    )
+    replaced_codes, distinct = pd.factorize(replaced)
+    normalised = (
+        pd.Series(distinct, dtype=object)
+        .str.split()
+        .str.join(" ")
+        .str.translate(FOLD_TABLE)
+        .to_numpy(dtype=object)
+    )
+    result = np.full(len(codes), np.nan, dtype=object)
+    present = codes >= 0
+    result[present] = normalised[replaced_codes[codes[present]]]
+    return pd.Series(result, index=values.index, name=values.name)
+
+
+def rule_texts(rules: RuleSet, values: pd.Series) -> tuple[np.ndarray, list[str]]:
+    """
+    Return codes of 'values' and distinct texts matched by 'rules'
+    (see 'RuleSet.text'). Missing values are matched as 'nan' text. Rules are
+    tested once per distinct text instead of once per row.
+    """
+    codes, uniques = pd.factorize(values.astype(str).to_numpy())
+    if not rules.normalise:
+        return codes, [value.lower() for value in uniques]
+    # Distinct titles collapse after normalisation
+    text_codes, texts = pd.factorize(
+        normalise_titles(pd.Series(uniques, dtype=object)).to_numpy()
+    )
+    return text_codes[codes], list(texts)
+
+
+def first_matches(
+    rules: RuleSet, texts: list[str], order: list[int] | None = None
+) -> np.ndarray:
+    """
+    Return 'RuleSet.first_match' position for each text.
+    """
+    if order is not None:
+        order = list(order)
+    return np.fromiter(
+        (rules.first_match(text, order) for text in texts),
+        dtype=np.int64,
+        count=len(texts),
+    )
+
+
+def match_matrix(rules: RuleSet, texts: list[str]) -> np.ndarray:
+    """
+    Return boolean matrix: [text, rule] is True when rule matches text.
+    """
+    matrix = np.zeros((len(texts), len(rules)), dtype=bool)
+    for row, text in enumerate(texts):
+        matrix[row, list(rules.matching(text))] = True
+    return matrix
+
+
 def categorise_field(
-    data: pd.DataFrame, categories: dict[str, str], field_name: str
+    data: pd.DataFrame,
+    categories: dict[str, str | dict] | RuleSet,
+    field_name: str,
+    counter=None,
 ) -> pd.DataFrame:
     """
     Categorise data in column 'field_name' based on provided mapping 'categories'.
+    Mapping can be provided as dictionary or as rules from 'compile_categories'.
+    Optional 'counter' (RuleCounter) records rows matched by each rule.
     """
 
     fields = data.columns.tolist()
@@ -72,41 +259,138 @@ def categorise_field(
     if "category" not in fields:
         data["category"] = "NO CATEGORY"
 
-    lower_field = f"{field_name} lower"
-    data[lower_field] = data[field_name].astype(str).str.lower()
+    rules = compile_categories(categories)
+    codes, texts = rule_texts(rules, data[field_name])
+    if counter is None or not len(rules):
+        winners = first_matches(rules, texts)
+    else:
+        matrix = match_matrix(rules, texts)
+        # Rules recorded in mapping order, so the last matching rule owns row
+        for position in range(len(rules)):
+            counter.record(field_name, position, matrix[codes, position])
+        last = len(rules) - 1 - np.argmax(matrix[:, ::-1], axis=1)
+        winners = np.where(matrix.any(axis=1), last, -1)
+    LOGGER.debug(
+        "Tested %d rules on %d distinct values of '%s'",
+        len(rules),
+        len(texts),
+        field_name,
+    )
 
-    for key, category in categories.items():
-        LOGGER.debug("Searching key: %s", key.lower())
-        mask = data[lower_field].str.contains(key.lower(), na=False)
-        LOGGER.debug("Found %d matches for key: %s", sum(mask), key.lower())
-        data.loc[mask, "category"] = category
+    row_winners = winners[codes]
+    matched = row_winners >= 0
+    if matched.any():
+        category_values = np.asarray(rules.categories, dtype=object)
+        data.loc[matched, "category"] = category_values[row_winners[matched]]
 
-    return data.drop(lower_field, axis=1)
+    return data
 
 
 def categorise_contractor(
     data: pd.DataFrame,
-    categories: dict[str, str],
+    categories: dict[str, str | dict] | RuleSet,
     contractor_field_name: str = "Dane kontrahenta",
+    counter=None,
 ) -> pd.DataFrame:
     """
     Categorise data in column 'contractor_field_name' based on provided mapping 'categories'.
     """
 
-    data = categorise_field(data, categories, contractor_field_name)
+    data = categorise_field(data, categories, contractor_field_name, counter)
     return data
 
 
 def categorise_title(
     data: pd.DataFrame,
-    categories: dict[str, str],
+    categories: dict[str, str | dict] | RuleSet,
     title_field_name: str = "Tytuł",
+    counter=None,
 ) -> pd.DataFrame:
     """
     Categorise data in column 'title_field_name' based on provided mapping 'categories'.
+    Titles and keys are normalised before matching (see 'title_handling').
     """
 
-    data = categorise_field(data, categories, title_field_name)
+    categories = compile_categories(categories, normalise=True)
+    data = categorise_field(data, categories, title_field_name, counter)
+    return data
+
+
+def evaluation_order(
+    rules: RuleSet | list[tuple[str, str]], hits: list[int] | None = None
+) -> list[int]:
+    """
+    Return positions of 'rules' in early exit evaluation order: the last
+    (highest priority) rule first. Consecutive rules with the same category
+    can be tested in any order, so within such runs rules with more 'hits'
+    are tested first.
+    """
+    runs = []
+    for position in reversed(range(len(rules))):
+        if runs and rules[runs[-1][-1]][1] == rules[position][1]:
+            runs[-1].append(position)
+        else:
+            runs.append([position])
+    if hits is not None:
+        # Stable sort keeps priority order of rules with equal hits
+        runs = [sorted(run, key=lambda p: -hits[p]) for run in runs]
+    return [position for run in runs for position in run]
+
+
+def categorise_early_exit(
+    data: pd.DataFrame,
+    field_rules: list[tuple[str, RuleSet, list[int] | None]],
+    counter=None,
+) -> pd.DataFrame:
+    """
+    Categorise data with the same result as applying 'categorise_field' for
+    each field in order, but test fields and rules from the highest priority
+    down and stop testing a row once its category is decided.
+
+    Parameters
+    ---------
+    data: pd.DataFrame
+        Data to categorise.
+    field_rules: list
+        (field name, rules from 'compile_categories', evaluation order or None)
+        in application order, e.g. contractor rules first, then title rules.
+    counter: RuleCounter
+        Optional counter. Only decisive matches are recorded.
+
+    Returns
+    -------
+    pd.DataFrame
+        Data with 'category' column.
+    """
+    for field_name, _, _ in field_rules:
+        if field_name not in data.columns:
+            raise KeyError(f"Field '{field_name}' does not exist.")
+
+    data = data.copy()
+    if "category" not in data.columns:
+        data["category"] = "NO CATEGORY"
+    categories = data["category"].to_numpy(dtype=object).copy()
+
+    # Positions of rows without decided category; shrinks with each match
+    unresolved = np.arange(len(data))
+    for field_name, rules, order in reversed(field_rules):
+        if not len(unresolved):
+            break
+        rules = compile_categories(rules)
+        if order is None:
+            order = evaluation_order(rules)
+        codes, texts = rule_texts(rules, data[field_name].iloc[unresolved])
+        # Deciding rule of each distinct value is the first matching in order
+        winners = first_matches(rules, texts, order)[codes]
+        matched = winners >= 0
+        rows, winners = unresolved[matched], winners[matched]
+        if counter is not None:
+            for position in np.unique(winners):
+                counter.record(field_name, position, rows[winners == position])
+        categories[rows] = np.asarray(rules.categories, dtype=object)[winners]
+        unresolved = unresolved[~matched]
+
+    data["category"] = categories
     return data
 
 
@@ -0,0 +1,236 @@
+"""
+This file contains all method related to deduplication of transactions
+from overlapping exports:
+    -add_field_counts
+    -row_hashes
+    -HashIndex
+
+Each transaction is identified by 64-bit hash of its identifying fields and
+its occurrence number among identical rows of the same file, so repeated
+identical transactions of one export are kept. Hash index is a uint64 array
+sorted once per commit and saved in a single '.npz' file together with source
+file of each hash. Rows are looked up in hash table of the index (O(1) per
+row), and occurrence numbers in counts of field hashes of previous chunks.
+Rows already seen in the same source file are kept, so processing the same
+export again gives the same result.
+"""
+
+import json
+import logging
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+def add_field_counts(counts: dict[int, int], field_hashes: np.ndarray) -> None:
+    """
+    Add occurrences of 'field_hashes' to 'counts' (field hash -> count).
+    """
+    uniques, occurrences = np.unique(field_hashes, return_counts=True)
+    for value, occurrence in zip(uniques.tolist(), occurrences.tolist()):
+        counts[value] = counts.get(value, 0) + occurrence
+
+
+def _occurrences(hashes: np.ndarray, previous: dict[int, int]) -> np.ndarray:
+    """
+    Return occurrence number of each hash: number of equal hashes before it
+    in 'hashes' plus its count in 'previous'.
+    """
+    order = np.argsort(hashes, kind="stable")
+    sorted_hashes = hashes[order]
+    is_start = np.r_[True, sorted_hashes[1:] != sorted_hashes[:-1]]
+    starts = np.flatnonzero(is_start)
+    run_lengths = np.diff(np.r_[starts, len(hashes)])
+    within = np.arange(len(hashes)) - np.repeat(starts, run_lengths)
+
+    occurrences = np.empty(len(hashes), dtype=np.uint64)
+    occurrences[order] = within
+    if previous:
+        # One dictionary lookup per distinct hash
+        before = np.fromiter(
+            (previous.get(value, 0) for value in sorted_hashes[starts].tolist()),
+            dtype=np.uint64,
+            count=len(starts),
+        )
+        occurrences[order] += np.repeat(before, run_lengths)
+    return occurrences
+
+
+def row_hashes(
+    data: pd.DataFrame, fields: list[str], previous: dict[int, int] | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return (row hashes, field hashes) of 'data'.
+    Field hashes are hashes of identifying 'fields' only. Row hashes combine
+    field hash with occurrence number of the row, counted also in 'previous'
+    counts of field hashes of previous chunks of the same file
+    (see 'add_field_counts').
+    """
+    field_hashes = pd.util.hash_pandas_object(data[fields], index=False).to_numpy()
+    occurrences = _occurrences(field_hashes, previous or {})
+    hashes = pd.util.hash_pandas_object(
+        pd.DataFrame({"hash": field_hashes, "occurrence": occurrences}), index=False
+    ).to_numpy()
+    return hashes, field_hashes
+
+
+class HashIndex:
+    """
+    Persistent index of transaction hashes. Rows are checked with 'drop_seen'
+    chunk by chunk; new hashes are saved only by 'commit', after the file
+    was processed successfully. Index saved meanwhile by another process
+    is merged on commit; 'reload' tells if it already has rows of this file.
+    """
+
+    def __init__(self, file_path: str, fields: list[str], source: str):
+        self.file_path = file_path
+        self.fields = fields
+        self.source = source
+        self._loaded_stat = None
+        self._load()
+        # Rows of known source were checked before, so result of the file is final
+        self.known_source = source in self.source_names
+        self._register_source()
+        # Field hash counts of previous chunks; the last chunk is counted only
+        # when the next one comes, so single chunk files are not counted at all
+        self._file_counts: dict[int, int] = {}
+        self._uncounted: np.ndarray | None = None
+        self._pending: list[np.ndarray] = []
+
+    def _stat(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self) -> None:
+        """
+        Load index from file, or start empty index if file does not exist.
+        """
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.sources = np.empty(0, dtype=np.uint32)
+        self.source_names: list[str] = []
+        self._hash_table: pd.Index | None = None
+        self._loaded_stat = self._stat()
+        if self._loaded_stat is not None:
+            with np.load(self.file_path) as index:
+                self.hashes = index["hashes"]
+                self.sources = index["sources"]
+                self.source_names = json.loads(str(index["source_names"]))
+
+    def _register_source(self) -> None:
+        if self.source not in self.source_names:
+            self.source_names.append(self.source)
+        self._source_id = self.source_names.index(self.source)
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def _positions(self, hashes: np.ndarray) -> np.ndarray:
+        """
+        Return positions of 'hashes' in index, -1 for hashes not in index.
+        Hash table of index is built once and reused for all chunks.
+        """
+        if self._hash_table is None:
+            self._hash_table = pd.Index(self.hashes)
+        return self._hash_table.get_indexer(hashes)
+
+    def drop_seen(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Return rows of 'data' not seen in other source files.
+        Chunks of one file have to be passed in file order.
+        """
+        if self._uncounted is not None:
+            add_field_counts(self._file_counts, self._uncounted)
+        hashes, field_hashes = row_hashes(data, self.fields, self._file_counts)
+        self._uncounted = field_hashes
+
+        if len(self.hashes):
+            positions = self._positions(hashes)
+            found = positions >= 0
+            seen = found.copy()
+            seen[found] = self.sources[positions[found]] != self._source_id
+        else:
+            found = seen = np.zeros(len(hashes), dtype=bool)
+        self._pending.append(hashes[~found])
+
+        if seen.any():
+            LOGGER.info("Dropped %s already seen transactions", int(seen.sum()))
+        return data[~seen]
+
+    def reload(self) -> bool:
+        """
+        Reload index saved by another process since it was loaded. Return True
+        if rows kept by 'drop_seen' were saved meanwhile from other source
+        files; then state of the file is reset and its chunks have to be
+        checked again with 'drop_seen', from the first one. Call it while
+        holding the lock used for 'commit', so index cannot change again.
+        """
+        if self._stat() == self._loaded_stat:
+            return False
+        pending = np.concatenate([np.empty(0, dtype=np.uint64), *self._pending])
+        self._load()
+        self._register_source()
+        if len(self.hashes):
+            positions = self._positions(pending)
+        else:
+            positions = np.full(len(pending), -1)
+        found = positions >= 0
+        if (self.sources[positions[found]] != self._source_id).any():
+            self._file_counts = {}
+            self._uncounted = None
+            self._pending = []
+            return True
+        # Rows saved meanwhile from the same source are not added again
+        self._pending = [pending[~found]]
+        return False
+
+    def commit(self) -> None:
+        """
+        Add new hashes to index and save it atomically.
+        """
+        new_hashes = np.concatenate([np.empty(0, dtype=np.uint64), *self._pending])
+        self._pending = []
+        if self._stat() != self._loaded_stat:
+            # Index saved by another process meanwhile: add new hashes to its content.
+            # Source names are only appended, so ids of loaded sources do not change
+            self._load()
+            self._register_source()
+            new_hashes = new_hashes[~np.isin(new_hashes, self.hashes)]
+        hashes = np.concatenate([self.hashes, new_hashes])
+        sources = np.concatenate(
+            [self.sources, np.full(len(new_hashes), self._source_id, dtype=np.uint32)]
+        )
+        order = np.argsort(hashes, kind="stable")
+        self.hashes = hashes[order]
+        self.sources = sources[order]
+        self._hash_table = None
+
+        folder = os.path.dirname(os.path.abspath(self.file_path))
+        os.makedirs(folder, exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(dir=folder, suffix=".npz")
+        try:
+            with os.fdopen(handle, "wb") as file:
+                np.savez(
+                    file,
+                    hashes=self.hashes,
+                    sources=self.sources,
+                    source_names=np.array(json.dumps(self.source_names)),
+                )
+            os.replace(temp_path, self.file_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        self._loaded_stat = self._stat()
+        LOGGER.debug(
+            "Hash index saved in: %s (%s hashes, %s new)",
+            self.file_path,
+            len(self.hashes),
+            len(new_hashes),
+        )
@@ -1,22 +1,69 @@
 """
 This file contains all method related to files:
+-is_transaction_file
 -get_transaction_file
+-open_transaction_file
 -read_csv_file
 -verify_csv_file
+
+Transaction files can be compressed ('.zip', '.gz', '.xz'). They are
+decompressed as a stream while CSV is parsed, without extracting to disk.
 """
 
+import contextlib
+import gzip
+import io
 import logging
+import lzma
 import os
-import pandas as pd
+import time
+import zipfile
+
+# pandas is imported inside functions reading files, so file discovery
+# does not pay pandas import time
 
 LOGGER = logging.getLogger(__name__)
 
+COMPRESSED_EXTENSIONS = (".zip", ".gz", ".xz")
+
+
+def _matches_extension(file: str, extension: str, compressed: bool) -> bool:
+    """
+    Check if file has 'extension', optionally followed by compression extension
+    (e.g. '.csv.gz'). Zip archives match also without 'extension' ('.zip').
+    """
+    base, file_extension = os.path.splitext(file.lower())
+    if file_extension == extension.lower():
+        return True
+    if not compressed or file_extension not in COMPRESSED_EXTENSIONS:
+        return False
+    return file_extension == ".zip" or os.path.splitext(base)[-1] == extension.lower()
+
+
+def is_transaction_file(
+    file: str,
+    pattern: str = "lista_transakcji_nr_",
+    extension: str = ".csv",
+    compressed: bool = True,
+) -> bool:
+    """
+    Check if file name starts with 'pattern' and has 'extension'.
+    With 'compressed' also '.zip', '.gz' and '.xz' files are accepted.
+    """
+    return os.path.basename(file).lower().startswith(
+        pattern.lower()
+    ) and _matches_extension(file, extension, compressed)
+
 
 def get_transaction_file(
-    folder_path: str, pattern: str = "lista_transakcji_nr_", extension: str = ".csv"
+    folder_path: str,
+    pattern: str = "lista_transakcji_nr_",
+    extension: str = ".csv",
+    compressed: bool = True,
 ) -> str:
     """
-    Get path to transaction file from provided folder with data
+    Get path to transaction file from provided folder with data.
+    With 'compressed' also '.zip', '.gz' and '.xz' files are accepted.
     """
     LOGGER.debug("Input argument - folder_path: %s", folder_path)
     LOGGER.debug("Input argument - pattern: %s", pattern)
@@ -30,10 +77,7 @@ def get_transaction_file(
     LOGGER.debug("Number of files in folder: %s", len(files))
 
     for file in files:
-        if (
-            os.path.basename(file).lower().startswith(pattern.lower())
-            and os.path.splitext(file)[-1].lower() == extension.lower()
-        ):
+        if is_transaction_file(file, pattern, extension, compressed):
             file_path = os.path.join(folder_path, file)
             LOGGER.debug("Selected file: %s", file_path)
             return file_path
@@ -43,15 +87,87 @@ def get_transaction_file(
     )
 
 
+class _CountingReader(io.RawIOBase):
+    """
+    Binary stream counting bytes read from wrapped stream.
+    """
+
+    def __init__(self, stream):
+        super().__init__()
+        self._stream = stream
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = self._stream.readinto(buffer)
+        self.bytes_read += size
+        return size
+
+
+@contextlib.contextmanager
+def open_transaction_file(file_path: str, extension: str = ".csv"):
+    """
+    Open transaction file as binary stream of uncompressed content.
+    Zip archive is read from its first member with 'extension'.
+    Number of uncompressed bytes read is available as 'stream.raw.bytes_read'.
+    """
+    file_path = os.fspath(file_path)
+    file_extension = os.path.splitext(file_path)[-1].lower()
+    with contextlib.ExitStack() as stack:
+        if file_extension == ".gz":
+            stream = stack.enter_context(gzip.open(file_path, "rb"))
+        elif file_extension == ".xz":
+            stream = stack.enter_context(lzma.open(file_path, "rb"))
+        elif file_extension == ".zip":
+            archive = stack.enter_context(zipfile.ZipFile(file_path))
+            members = [
+                name
+                for name in archive.namelist()
+                if name.lower().endswith(extension.lower())
+            ]
+            if not members:
+                raise FileNotFoundError(
+                    f"No file with extension '{extension}' in archive '{file_path}'"
+                )
+            stream = stack.enter_context(archive.open(members[0]))
+        else:
+            stream = stack.enter_context(open(file_path, "rb"))
+
+        yield io.BufferedReader(_CountingReader(stream), buffer_size=1024 * 1024)
+
+
 def read_csv_file(file_path: str, custom_separator=",", custom_chunksize=100):
     """
     Read data from CSV file in chunks
     Rerurn generator of dataframes
+    Compressed files are decompressed as a stream. Read throughput against
+    uncompressed size is logged when the whole file was read.
     """
-    # Encoding: latin1
-    # Encoding: cp1250
-    yield from pd.read_csv(
-        file_path, sep=custom_separator, encoding="cp1250", chunksize=custom_chunksize
+    import pandas as pd  # pylint: disable=import-outside-toplevel
+
+    with open_transaction_file(file_path) as stream:
+        # Encoding: latin1
+        # Encoding: cp1250
+        chunks = pd.read_csv(
+            stream, sep=custom_separator, encoding="cp1250", chunksize=custom_chunksize
+        )
+        # Time spent in reading only, without processing of yielded chunks
+        elapsed = 0.0
+        start = time.perf_counter()
+        for chunk in chunks:
+            elapsed += time.perf_counter() - start
+            yield chunk
+            start = time.perf_counter()
+        elapsed = max(elapsed + time.perf_counter() - start, 1e-9)
+        bytes_read = stream.raw.bytes_read
+    LOGGER.info(
+        "Read %.1f MB uncompressed (%.1f MB on disk) in %.2f s: %.1f MB/s",
+        bytes_read / 1e6,
+        os.path.getsize(file_path) / 1e6,
+        elapsed,
+        bytes_read / 1e6 / elapsed,
     )
 
 
@@ -66,6 +182,7 @@ def verify_csv_file(gen, mandatory_columns: list[str]):
     -missing rows
     -missing columns
     -empty file"""
+    import pandas as pd  # pylint: disable=import-outside-toplevel
 
     try:
         data = next(gen)
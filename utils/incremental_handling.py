@@ -0,0 +1,230 @@
+"""
+This file contains all method related to incremental re-categorisation:
+    -changed_keys
+    -changed_rules
+    -affected_rows
+    -recategorise
+    -category_state_key
+    -save_category_state
+    -load_category_state
+
+Row category depends only on mapping keys found in its contractor and title.
+When keys are added, removed or changed, only rows matched by previous or
+new rule of one of these keys can get a different category. Other rows keep
+previous category, as long as the order of unchanged keys (last key wins) is
+the same. State is reused only for the same rows categorised by the same code,
+because matching itself can change between versions.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from utils.data_handling import first_matches, rule_texts
+from utils.parallel_handling import categorise_data
+from utils.result_handling import code_version
+from utils.rule_handling import RuleSet
+
+
+LOGGER = logging.getLogger(__name__)
+
+# Change when matching semantics change (e.g. title normalisation), to invalidate
+# saved categories
+STATE_VERSION = 2
+
+
+def changed_keys(
+    old: dict[str, str | dict], new: dict[str, str | dict]
+) -> list[str] | None:
+    """
+    Return keys added, removed or mapped to different category or rule kind
+    in 'new' mapping.
+    Return None if order of keys present in both mappings changed,
+    because then precedence of any key could change.
+    """
+    old_common = [key for key in old if key in new]
+    new_common = [key for key in new if key in old]
+    if old_common != new_common:
+        return None
+
+    keys = [key for key in new if key not in old or old[key] != new[key]]
+    keys.extend(key for key in old if key not in new)
+    return keys
+
+
+def changed_rules(
+    old: dict[str, str | dict],
+    new: dict[str, str | dict],
+    keys: list[str],
+    normalise: bool = False,
+) -> RuleSet:
+    """
+    Return rules of changed 'keys' in both 'old' and 'new' mapping, so rows
+    matched by previous or current version of a rule are found.
+    Title rules are compiled with 'normalise'.
+    """
+    items = [(key, new[key]) for key in keys if key in new]
+    items.extend(
+        (key, old[key]) for key in keys if key in old and old[key] != new.get(key)
+    )
+    return RuleSet(items, normalise)
+
+
+def _contains_any(
+    values: pd.Series, rules: list[str] | RuleSet, normalise: bool = False
+) -> pd.Series:
+    """
+    Return mask of values matched by any rule. Plain keys are literal rules,
+    matched in normalised values with 'normalise'. Rules are matched the same
+    way as in 'categorise_field'.
+    """
+    if not isinstance(rules, RuleSet):
+        rules = RuleSet(((key, "") for key in rules), normalise)
+    if not len(rules):
+        return pd.Series(False, index=values.index)
+    codes, texts = rule_texts(rules, values)
+    matched = first_matches(rules, texts) >= 0
+    return pd.Series(matched[codes], index=values.index)
+
+
+def affected_rows(
+    data: pd.DataFrame,
+    contractor_keys: list[str] | RuleSet,
+    title_keys: list[str] | RuleSet,
+    contractor_field: str = "Dane kontrahenta",
+    title_field: str = "Tytuł",
+) -> pd.Series:
+    """
+    Return mask of rows which category could change because of changed keys.
+    """
+    return _contains_any(data[contractor_field], contractor_keys) | _contains_any(
+        data[title_field], title_keys, normalise=True
+    )
+
+
+def recategorise(
+    data: pd.DataFrame,
+    previous_categories: np.ndarray,
+    previous_mapping: dict[str, dict[str, str]],
+    categories: dict[str, dict[str, str]],
+    contractor_field: str = "Dane kontrahenta",
+    title_field: str = "Tytuł",
+    category_field: str = "category",
+    **categorise_parameters,
+) -> tuple[pd.DataFrame, int] | None:
+    """
+    Categorise data reusing categories from previous run.
+    Only rows affected by changed keys are categorised again, with
+    'categorise_parameters' of 'categorise_data' (e.g. 'min_rows', 'workers',
+    'early_exit').
+    Return categorised data and number of recategorised rows,
+    or None if all rows have to be categorised.
+    """
+    if len(previous_categories) != len(data):
+        return None
+    contractor_keys = changed_keys(
+        previous_mapping["Contractor"], categories["Contractor"]
+    )
+    title_keys = changed_keys(previous_mapping["Title"], categories["Title"])
+    if contractor_keys is None or title_keys is None:
+        LOGGER.debug("Order of mapping keys changed")
+        return None
+
+    LOGGER.debug(
+        "Changed keys - contractor: %s, title: %s", contractor_keys, title_keys
+    )
+    data = data.drop(columns=[category_field], errors="ignore")
+    mask = affected_rows(
+        data,
+        changed_rules(
+            previous_mapping["Contractor"], categories["Contractor"], contractor_keys
+        ),
+        changed_rules(
+            previous_mapping["Title"], categories["Title"], title_keys, normalise=True
+        ),
+        contractor_field,
+        title_field,
+    )
+    data[category_field] = np.asarray(previous_categories, dtype=object)
+
+    affected = int(mask.sum())
+    if affected:
+        subset = categorise_data(
+            data.loc[mask].drop(columns=[category_field]),
+            categories,
+            contractor_field,
+            title_field,
+            **categorise_parameters,
+        ).rename(columns={"category": category_field})
+        data.loc[mask, category_field] = subset[category_field]
+    return data, affected
+
+
+def category_state_key(input_key: str, data: pd.DataFrame, fields: list[str]) -> str:
+    """
+    Return key of category state built from 'input_key', state and code
+    version and hash of 'fields' of categorised rows.
+    """
+    digest = hashlib.sha256(input_key.encode())
+    digest.update(str(STATE_VERSION).encode())
+    digest.update(code_version().encode())
+    digest.update(
+        pd.util.hash_pandas_object(data[fields], index=False).to_numpy().tobytes()
+    )
+    return digest.hexdigest()
+
+
+def save_category_state(
+    file_path: str,
+    key: str,
+    categories: dict[str, dict[str, str]],
+    row_categories: pd.Series,
+) -> None:
+    """
+    Save per-row categories with mapping used and input key in
+    '<file_path>.npz'. File is written into temporary file which replaces
+    the previous state, so readers (also other workers) never see partially
+    written state or categories of other input.
+    """
+    state_file = f"{file_path}.npz"
+    folder = os.path.dirname(os.path.abspath(state_file))
+    os.makedirs(folder, exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(dir=folder, suffix=".npz")
+    try:
+        with os.fdopen(handle, "wb") as file:
+            np.savez(
+                file,
+                row_categories=row_categories.to_numpy(dtype=str),
+                state=np.array(
+                    json.dumps(
+                        {"key": key, "categories": categories}, ensure_ascii=False
+                    )
+                ),
+            )
+        os.replace(temp_path, state_file)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def load_category_state(
+    file_path: str, key: str
+) -> tuple[np.ndarray, dict[str, dict[str, str]]] | None:
+    """
+    Load per-row categories and mapping saved for the same input 'key'.
+    Return None if there is no state for this input.
+    """
+    state_file = f"{file_path}.npz"
+    if not os.path.exists(state_file):
+        return None
+
+    with np.load(state_file) as saved:
+        state = json.loads(saved["state"].item())
+        if state["key"] != key:
+            return None
+        return saved["row_categories"], state["categories"]
@@ -0,0 +1,96 @@
+"""
+This file contains all method related to categorisation of single transactions:
+    -CategoryMatcher
+
+CategoryMatcher categorises transactions one at a time without pandas,
+with the same result as 'categorise_contractor' followed by 'categorise_title':
+rules (see 'rule_handling') are matched in lowercase contractor and normalised
+title, the last matching key wins and title rules take precedence over
+contractor rules.
+"""
+
+import functools
+import json
+from collections.abc import Iterable, Mapping
+
+from utils.rule_handling import RuleSet
+
+
+NO_CATEGORY = "NO CATEGORY"
+
+
+class CategoryMatcher:
+    """
+    Categorise (contractor, title) pairs with mapping loaded from
+    'category_mapping.json'. Results are cached by contractor and normalised
+    title, so titles differing only in dates, card numbers or amounts share
+    cache entry.
+    """
+
+    def __init__(
+        self,
+        categories: Mapping[str, Mapping[str, str | Mapping]],
+        cache_size: int = 65536,
+    ):
+        self._rules = {
+            "Contractor": RuleSet(categories["Contractor"].items()),
+            "Title": RuleSet(categories["Title"].items(), normalise=True),
+        }
+        self._cached = functools.lru_cache(maxsize=cache_size)(self._categorise)
+        self.cache_info = self._cached.cache_info
+
+    @classmethod
+    def from_file(cls, file_path: str, cache_size: int = 65536) -> "CategoryMatcher":
+        """
+        Create matcher from category mapping file.
+        """
+        with open(file_path, "r", encoding="utf-8") as file:
+            return cls(json.load(file), cache_size)
+
+    def match(self, mapping_name: str, value) -> str | None:
+        """
+        Return category of the last key of mapping 'mapping_name' found in
+        'value' or None. Value is converted to text like in 'categorise_field'.
+        """
+        rules = self._rules[mapping_name]
+        return self._match_text(rules, rules.text(value))
+
+    @staticmethod
+    def _match_text(rules: RuleSet, text: str) -> str | None:
+        position = rules.first_match(text)
+        return None if position < 0 else rules.categories[position]
+
+    def _categorise(self, contractor, title_text: str) -> str:
+        """
+        Return category of transaction with 'contractor' and normalised title.
+        """
+        category = self._match_text(self._rules["Title"], title_text)
+        if category is None:
+            category = self.match("Contractor", contractor)
+        return NO_CATEGORY if category is None else category
+
+    def categorise(self, contractor, title) -> str:
+        """
+        Return category of transaction with 'contractor' and 'title'.
+        """
+        return self._cached(contractor, self._rules["Title"].text(title))
+
+    def categorise_many(
+        self,
+        transactions: Iterable[Mapping | tuple],
+        contractor_field: str = "Dane kontrahenta",
+        title_field: str = "Tytuł",
+    ) -> list[str]:
+        """
+        Categorise (contractor, title) tuples or dictionaries with
+        'contractor_field' and 'title_field' keys.
+        """
+        categories = []
+        for transaction in transactions:
+            if isinstance(transaction, Mapping):
+                transaction = (
+                    transaction.get(contractor_field),
+                    transaction.get(title_field),
+                )
+            categories.append(self.categorise(*transaction))
+        return categories
@@ -0,0 +1,263 @@
+"""
+This file contains all method related to memory profiling:
+    -rss_bytes
+    -MemoryProfiler
+
+Opt-in profiler recording, for each pipeline stage, peak of memory traced by
+'tracemalloc', RSS change and top allocation sites (lines with the largest
+growth of traced memory during the first call of the stage). Stages called
+many times (e.g. for each chunk) are aggregated. Report of each run is saved
+as JSON file and summary line is appended to history file, so memory use of
+runs can be compared.
+"""
+
+import contextlib
+import importlib
+import json
+import logging
+import os
+import time
+import tracemalloc
+from collections.abc import Iterable, Iterator
+
+LOGGER = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+def rss_bytes() -> int | None:
+    """
+    Return resident set size of current process or None if unknown.
+    Peak RSS is returned where current RSS is not available.
+    """
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return max_rss if os.uname().sysname == "Darwin" else max_rss * 1024
+
+
+class MemoryProfiler:
+    """
+    Record memory use of pipeline stages. Disabled profiler only passes
+    stages through, without tracing.
+    Modules from 'preload' are imported before tracing starts: allocations of
+    imports would be attributed to stages and slow down snapshots.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        top: int = 10,
+        frames: int = 1,
+        preload: Iterable[str] = (),
+    ):
+        self.enabled = enabled
+        self.top = top
+        self.frames = frames
+        self.preload = tuple(preload)
+        self.stages: dict[str, dict] = {}
+        self._active: list[dict] = []
+        self._started_tracing = False
+        self._start = time.perf_counter()
+        self._start_rss = None
+
+    def start(self) -> None:
+        """
+        Start tracing allocations.
+        """
+        if not self.enabled:
+            return
+        for module in self.preload:
+            importlib.import_module(module)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        self._start = time.perf_counter()
+        self._start_rss = rss_bytes()
+
+    def stop(self) -> None:
+        """
+        Stop tracing allocations if it was started by this profiler.
+        """
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self) -> "MemoryProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """
+        Record memory use of the block as stage 'name'. Peak of nested
+        stage is included in peak of outer stage.
+        """
+        if not self.enabled or not tracemalloc.is_tracing():
+            yield
+            return
+
+        stats = self.stages.setdefault(
+            name,
+            {
+                "calls": 0,
+                "seconds": 0.0,
+                "peak_traced_mb": 0.0,
+                "peak_growth_mb": 0.0,
+                "traced_delta_mb": 0.0,
+                "rss_delta_mb": 0.0,
+                "top_sites": [],
+            },
+        )
+        first_call = stats["calls"] == 0
+        snapshot = tracemalloc.take_snapshot() if first_call else None
+
+        current, peak = tracemalloc.get_traced_memory()
+        # Peak so far belongs to active outer stages, before it is reset
+        for active in self._active:
+            active["peak"] = max(active["peak"], peak)
+        tracemalloc.reset_peak()
+        active = {"peak": current}
+        self._active.append(active)
+        rss = rss_bytes()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            end_current, peak = tracemalloc.get_traced_memory()
+            end_rss = rss_bytes()
+            self._active.pop()
+            peak = max(active["peak"], peak)
+            if self._active:
+                self._active[-1]["peak"] = max(self._active[-1]["peak"], peak)
+
+            stats["calls"] += 1
+            stats["seconds"] = round(stats["seconds"] + elapsed, 6)
+            stats["peak_traced_mb"] = round(max(stats["peak_traced_mb"], peak / MB), 3)
+            stats["peak_growth_mb"] = round(
+                max(stats["peak_growth_mb"], (peak - current) / MB), 3
+            )
+            stats["traced_delta_mb"] = round(
+                stats["traced_delta_mb"] + (end_current - current) / MB, 3
+            )
+            if rss is not None and end_rss is not None:
+                stats["rss_delta_mb"] = round(
+                    stats["rss_delta_mb"] + (end_rss - rss) / MB, 3
+                )
+            if snapshot is not None:
+                stats["top_sites"] = self._top_sites(snapshot)
+
+    def _top_sites(self, start_snapshot: tracemalloc.Snapshot) -> list[dict]:
+        """
+        Return lines with the largest growth of traced memory since
+        'start_snapshot'. Allocations of tracemalloc and profiler are skipped.
+        """
+        skipped = {tracemalloc.__file__, __file__}
+        differences = [
+            difference
+            for difference in tracemalloc.take_snapshot().compare_to(
+                start_snapshot, "lineno"
+            )
+            if difference.size_diff > 0
+            and difference.traceback[0].filename not in skipped
+        ]
+        return [
+            {
+                "site": f"{difference.traceback[0].filename}:"
+                f"{difference.traceback[0].lineno}",
+                "size_delta_mb": round(difference.size_diff / MB, 3),
+                "count_delta": difference.count_diff,
+            }
+            for difference in differences[: self.top]
+        ]
+
+    def iterate(self, name: str, iterable: Iterable) -> Iterator:
+        """
+        Yield items of 'iterable', recording each step as stage 'name'
+        (e.g. reading of CSV chunks by generator).
+        """
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def report(self) -> dict:
+        """
+        Return report of recorded stages.
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(
+            [peak / MB]
+            + [active["peak"] / MB for active in self._active]
+            + [stats["peak_traced_mb"] for stats in self.stages.values()]
+        )
+        end_rss = rss_bytes()
+        return {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seconds": round(time.perf_counter() - self._start, 3),
+            "peak_traced_mb": round(peak, 3),
+            "traced_mb": round(current / MB, 3),
+            "rss_mb": None if end_rss is None else round(end_rss / MB, 3),
+            "rss_delta_mb": (
+                None
+                if end_rss is None or self._start_rss is None
+                else round((end_rss - self._start_rss) / MB, 3)
+            ),
+            "stages": self.stages,
+        }
+
+    def save(self, folder: str, run_name: str, details: dict | None = None) -> str:
+        """
+        Save report as '<folder>/memory_<run_name>_<timestamp>.json' and
+        append stage peaks to '<folder>/memory_history.jsonl'.
+        Return report file path.
+        """
+        report = {"run": run_name, **(details or {}), **self.report()}
+        os.makedirs(folder, exist_ok=True)
+        stamp = report["timestamp"].replace(":", "").replace("-", "")
+        file_path = os.path.join(folder, f"memory_{run_name}_{stamp}.json")
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=True, ensure_ascii=False)
+
+        # History line without allocation sites
+        history = {key: value for key, value in report.items() if key != "stages"}
+        history["stages"] = {
+            name: {
+                "peak_traced_mb": stats["peak_traced_mb"],
+                "peak_growth_mb": stats["peak_growth_mb"],
+                "rss_delta_mb": stats["rss_delta_mb"],
+            }
+            for name, stats in report["stages"].items()
+        }
+        with open(
+            os.path.join(folder, "memory_history.jsonl"), "a", encoding="utf-8"
+        ) as file:
+            file.write(json.dumps(history, ensure_ascii=False) + "\n")
+
+        for name, stats in report["stages"].items():
+            LOGGER.info(
+                "Memory %s: peak %.1f MB traced (+%.1f MB), RSS %+.1f MB (%s calls)",
+                name,
+                stats["peak_traced_mb"],
+                stats["peak_growth_mb"],
+                stats["rss_delta_mb"],
+                stats["calls"],
+            )
+        LOGGER.info("Memory profile saved in: %s", file_path)
+        return file_path
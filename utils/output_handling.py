@@ -0,0 +1,287 @@
+"""
+This file contains all method related to output files:
+    -output_suffix
+    -OutputWriter
+
+OutputWriter collects categorised chunks of one output (whole file or one
+partition) and writes: output.xlsx, summary.csv, uncategorised title.json
+(keyed by normalised title), contractor.json and category suggestions.
+Optionally output.xlsx is split into one file per month, e.g. output_2025-11.xlsx.
+"""
+
+import itertools
+import json
+import logging
+import os
+import re
+import unicodedata
+
+import pandas as pd
+
+from utils.data_handling import (
+    start_with_no_category,
+    no_category_dict,
+    split_by_month,
+    normalise_titles,
+)
+from utils.rule_handling import mapping_categories
+from utils.stream_handling import ChunkSpill, write_excel_stream
+from utils.summary_handling import update_summary, write_merged_summary
+from utils.suggestion_handling import build_ngram_index, suggest_for_uncategorised
+from utils.title_handling import normalise_title
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+def output_suffix(partition: str) -> str:
+    """
+    Return file name suffix for partition name, e.g. 'KONTO Direct - KD'
+    -> '_konto_direct_kd'. Empty partition name gives empty suffix.
+    """
+    ascii_name = unicodedata.normalize("NFKD", partition.lower().replace("ł", "l"))
+    ascii_name = ascii_name.encode("ascii", "ignore").decode()
+    slug = re.sub(r"[^0-9a-z]+", "_", ascii_name).strip("_")
+    return f"_{slug}" if slug else ""
+
+
+class OutputWriter:  # pylint: disable=too-many-instance-attributes
+    """
+    Collect categorised chunks and write output files with 'suffix' in name.
+    In streaming mode chunks are spilled to temporary files instead of
+    being kept in memory. With 'by_month' output Excel file is written
+    separately for each month of transaction date. 'file_suffix' is added
+    to names of output and uncategorised files, but not to summary file,
+    which is merged across input files. Uncategorised and categorised
+    values grow with distinct values, not rows; with 'max_values' at most
+    that many are kept per field.
+    """
+
+    def __init__(
+        self,
+        fields: dict[str, str],
+        columns: list[str],
+        suffix: str = "",
+        stream: bool = False,
+        by_month: bool = False,
+        file_suffix: str = "",
+        max_values: int | None = None,
+    ):  # pylint: disable=too-many-arguments
+        self.fields = fields
+        self.columns = columns
+        self.suffix = suffix
+        self.file_suffix = file_suffix
+        self.max_values = max_values
+        self.stream = stream
+        self.by_month = by_month
+        self.summary = {}
+        self.no_category = {fields["title"]: {}, fields["contractor"]: {}}
+        self.categorised_values = {fields["title"]: {}, fields["contractor"]: {}}
+        # Fields of which values above 'max_values' were left out
+        self.truncated: set[str] = set()
+        # Output and uncategorised files written so far, summary file path
+        self.written_files: list[str] = []
+        self.summary_file: str | None = None
+        self._chunks = []
+        # month ("" without month partitioning) -> ('NO CATEGORY' spill, other spill)
+        self._spills: dict[str, tuple[ChunkSpill, ChunkSpill]] = {}
+
+    def add(self, data: pd.DataFrame, summary_by_contractor: bool = False) -> None:
+        """
+        Add categorised chunk.
+        """
+        category_field = self.fields["category"]
+        self.summary = update_summary(
+            self.summary,
+            data,
+            self.fields["transaction_date"],
+            self.fields["amount"],
+            category_field,
+            self.fields["contractor"] if summary_by_contractor else None,
+        )
+        is_no_category = data[category_field] == "NO CATEGORY"
+        # Uncategorised titles are reported as normalised titles
+        title_field = self.fields["title"]
+        values_data = data.assign(**{title_field: normalise_titles(data[title_field])})
+        for field, values in self.no_category.items():
+            if not self._add_values(values, no_category_dict(values_data, field)):
+                self.truncated.add(field)
+            # Categorised values above the limit are only not used for suggestions
+            self._add_values(
+                self.categorised_values[field],
+                values_data[~is_no_category]
+                .dropna(subset=[field])
+                .set_index(field)[category_field]
+                .to_dict(),
+            )
+
+        if self.stream:
+            # Spill both groups, so 'NO CATEGORY' rows can be written first
+            for month, partition in self._partitions(data).items():
+                if month not in self._spills:
+                    self._spills[month] = (ChunkSpill(), ChunkSpill())
+                no_category_spill, category_spill = self._spills[month]
+                is_no_category = partition[category_field] == "NO CATEGORY"
+                no_category_spill.write(partition[is_no_category])
+                category_spill.write(partition[~is_no_category])
+        else:
+            self._chunks.append(data)
+
+    def _add_values(self, values: dict, new: dict) -> bool:
+        """
+        Update 'values' with 'new' values, keeping at most 'max_values'
+        distinct values. Return False if some new values were left out.
+        """
+        if self.max_values is None or len(values) + len(new) <= self.max_values:
+            values.update(new)
+            return True
+        complete = True
+        for value, category in new.items():
+            if value in values or len(values) < self.max_values:
+                values[value] = category
+            else:
+                complete = False
+        return complete
+
+    def _partitions(self, data: pd.DataFrame) -> dict[str, pd.DataFrame]:
+        if not self.by_month:
+            return {"": data}
+        return split_by_month(data, self.fields["transaction_date"])
+
+    def _file_path(
+        self, folder: str, name: str, month: str = "", per_file: bool = True
+    ) -> str:
+        base, extension = os.path.splitext(name)
+        suffix = f"{self.file_suffix}{self.suffix}" if per_file else self.suffix
+        month = f"_{month}" if month else ""
+        return os.path.join(folder, f"{base}{suffix}{month}{extension}")
+
+    def _output_values(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Return data formatted for output: amounts in grosze converted to
+        decimal numbers, dates without time.
+        """
+        amount_field = self.fields["amount"]
+        date_field = self.fields["transaction_date"]
+        formatted = {}
+        if amount_field in data.columns:
+            formatted[amount_field] = data[amount_field] / 100
+        if date_field in data.columns and pd.api.types.is_datetime64_dtype(
+            data[date_field]
+        ):
+            formatted[date_field] = data[date_field].dt.date
+        return data.assign(**formatted)
+
+    def write_output(self, output_folder: str) -> int:
+        """
+        Write output Excel file with 'NO CATEGORY' rows on top.
+        Amounts are converted from grosze to decimal numbers only here.
+        Return number of 'NO CATEGORY' rows.
+        """
+        category_field = self.fields["category"]
+        no_category_rows = 0
+        if self.stream:
+            if not self._spills and not self.by_month:
+                self._spills[""] = (ChunkSpill(), ChunkSpill())
+            for month, (no_category_spill, category_spill) in sorted(
+                self._spills.items()
+            ):
+                output_file = self._file_path(output_folder, "output.xlsx", month)
+                write_excel_stream(
+                    map(
+                        self._output_values,
+                        itertools.chain(
+                            no_category_spill.read(), category_spill.read()
+                        ),
+                    ),
+                    self.columns,
+                    output_file,
+                )
+                no_category_rows += no_category_spill.rows
+                self.written_files.append(output_file)
+                LOGGER.info("Output file saved in: %s", output_file)
+        else:
+            if len(self._chunks) == 1:
+                data = self._chunks[0]
+            else:
+                data = pd.concat(self._chunks) if self._chunks else pd.DataFrame()
+            data = data.reindex(columns=self.columns)
+            for month, partition in self._partitions(data).items():
+                output_file = self._file_path(output_folder, "output.xlsx", month)
+                partition = start_with_no_category(
+                    partition, category_field, "NO CATEGORY"
+                )
+                no_category_rows += partition[
+                    partition[category_field] == "NO CATEGORY"
+                ].shape[0]
+                self._output_values(partition).to_excel(output_file)
+                self.written_files.append(output_file)
+                LOGGER.info("Output file saved in: %s", output_file)
+
+        LOGGER.info("Number of uncategorised rows: %s", no_category_rows)
+        return no_category_rows
+
+    def write_summary(
+        self, output_folder: str, merge_mode: str = "replace", source: str | None = None
+    ) -> None:
+        """
+        Merge summary of this run into summary file. With 'source' previous
+        contribution of the same source replaces (see 'write_merged_summary').
+        """
+        summary_file = self._file_path(output_folder, "summary.csv", per_file=False)
+        write_merged_summary(summary_file, self.summary, merge_mode, source)
+        self.summary_file = summary_file
+        LOGGER.info("Summary file saved in: %s", summary_file)
+
+    def write_uncategorised(
+        self, uncategorised_folder: str, categories: dict, top_k: int = 3
+    ) -> None:
+        """
+        Write uncategorised title and contractor values with category suggestions
+        based on mapping keys and values categorised in this run.
+        """
+        for field, mapping_name, name in (
+            (self.fields["title"], "Title", "title"),
+            (self.fields["contractor"], "Contractor", "contractor"),
+        ):
+            if field in self.truncated:
+                LOGGER.warning(
+                    "Only %s distinct %s values reported, others left out",
+                    self.max_values,
+                    name,
+                )
+            file_path = self._file_path(uncategorised_folder, f"{name}.json")
+            with open(file_path, "w", encoding="utf-8") as f:
+                json.dump(dict(sorted(self.no_category[field].items())), f, indent=True)
+            self.written_files.append(file_path)
+            LOGGER.info("Uncategorised %s saved in: %s", name, file_path)
+
+            entries = mapping_categories(categories[mapping_name])
+            if mapping_name == "Title":
+                entries = {
+                    normalise_title(key): category for key, category in entries.items()
+                }
+            entries.update(self.categorised_values[field])
+            suggestions = suggest_for_uncategorised(
+                build_ngram_index(entries), sorted(self.no_category[field]), top_k
+            )
+            file_path = self._file_path(uncategorised_folder, f"{name}_suggestions.json")
+            with open(file_path, "w", encoding="utf-8") as f:
+                json.dump(suggestions, f, indent=True, ensure_ascii=False)
+            self.written_files.append(file_path)
+            LOGGER.info("Category suggestions saved in: %s", file_path)
+
+    def close(self) -> None:
+        """
+        Remove temporary spill files.
+        """
+        for no_category_spill, category_spill in self._spills.values():
+            no_category_spill.close()
+            category_spill.close()
+        self._spills.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
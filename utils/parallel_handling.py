@@ -0,0 +1,175 @@
+"""
+This file contains all method related to parallel categorisation:
+    -split_partitions
+    -categorise_data
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from utils.data_handling import (
+    compile_categories,
+    categorise_contractor,
+    categorise_title,
+    evaluation_order,
+    categorise_early_exit,
+)
+from utils.rule_handling import RuleSet
+from utils.rule_stats_handling import RuleCounter, add_rule_counts
+
+
+LOGGER = logging.getLogger(__name__)
+
+# Rules and early exit evaluation orders shipped once to every worker process
+# by '_init_worker'
+_WORKER_RULES: dict[str, RuleSet] = {}
+_WORKER_ORDERS: dict[str, list[int]] = {}
+
+
+def _init_worker(
+    rules: dict[str, RuleSet], orders: dict[str, list[int]] | None
+) -> None:
+    """
+    Store compiled rules in worker process. Called once at pool start-up.
+    """
+    _WORKER_RULES.clear()
+    _WORKER_RULES.update(rules)
+    _WORKER_ORDERS.clear()
+    _WORKER_ORDERS.update(orders or {})
+
+
+def _categorise_rules(
+    data: pd.DataFrame,
+    rules: dict[str, RuleSet],
+    contractor_field: str,
+    title_field: str,
+    count_rules: bool = False,
+    orders: dict[str, list[int]] | None = None,
+) -> tuple[pd.DataFrame, dict | None]:
+    """
+    Categorise data with compiled rules. Return categorised data and rule
+    counts (None if 'count_rules' is False). With evaluation 'orders'
+    rules are evaluated with early exit.
+    """
+    counter = None
+    if count_rules:
+        counter = RuleCounter(
+            len(data),
+            {
+                contractor_field: len(rules["Contractor"]),
+                title_field: len(rules["Title"]),
+            },
+        )
+    if orders:
+        data = categorise_early_exit(
+            data,
+            [
+                (contractor_field, rules["Contractor"], orders["Contractor"]),
+                (title_field, rules["Title"], orders["Title"]),
+            ],
+            counter,
+        )
+    else:
+        data = categorise_contractor(
+            data, rules["Contractor"], contractor_field, counter
+        )
+        data = categorise_title(data, rules["Title"], title_field, counter)
+    return data, counter.counts() if counter is not None else None
+
+
+def _categorise_partition(
+    data: pd.DataFrame, contractor_field: str, title_field: str, count_rules: bool
+) -> tuple[pd.DataFrame, dict | None]:
+    """
+    Categorise single partition with rules stored in '_WORKER_RULES'.
+    """
+    return _categorise_rules(
+        data, _WORKER_RULES, contractor_field, title_field, count_rules, _WORKER_ORDERS
+    )
+
+
+def split_partitions(data: pd.DataFrame, partitions: int) -> list[pd.DataFrame]:
+    """
+    Split data into 'partitions' consecutive parts of similar size.
+    """
+    if partitions < 1:
+        raise ValueError("Argument 'partitions' must be greater than 0")
+
+    size = max(1, -(-len(data) // partitions))
+    return [data.iloc[i : i + size] for i in range(0, len(data), size)] or [data]
+
+
+def categorise_data(
+    data: pd.DataFrame,
+    categories: dict[str, dict[str, str | dict]],
+    contractor_field: str = "Dane kontrahenta",
+    title_field: str = "Tytuł",
+    min_rows: int = 50_000,
+    workers: int | None = None,
+    rule_counts: dict | None = None,
+    early_exit: bool = False,
+    rule_hits: dict[str, dict[str, int]] | None = None,
+) -> pd.DataFrame:
+    """
+    Categorise contractor and title fields based on provided mapping 'categories'.
+    Data with at least 'min_rows' rows is split into partitions and categorised
+    in worker processes. Smaller data is categorised in current process.
+    If 'rule_counts' dictionary is provided, hits and wins of each rule
+    are added to it (see 'add_rule_counts').
+    With 'early_exit' rules are evaluated from the highest priority down and
+    each row stops at its deciding rule. Accumulated 'rule_hits'
+    (mapping name -> key -> hits) order rules with the same category.
+    In this mode 'rule_counts' contains decisive matches only.
+    """
+    rules = {
+        "Contractor": compile_categories(categories["Contractor"]),
+        "Title": compile_categories(categories["Title"], normalise=True),
+    }
+    orders = None
+    if early_exit:
+        rule_hits = rule_hits or {}
+        orders = {
+            name: evaluation_order(
+                rules[name],
+                [rule_hits.get(name, {}).get(key, 0) for key in categories[name]],
+            )
+            for name in ("Contractor", "Title")
+        }
+    workers = workers or os.cpu_count() or 1
+
+    if len(data) < min_rows or workers < 2:
+        LOGGER.debug("Categorise %s rows in single process", len(data))
+        data, counts = _categorise_rules(
+            data, rules, contractor_field, title_field, rule_counts is not None, orders
+        )
+        if counts is not None:
+            add_rule_counts(rule_counts, counts)
+        return data
+
+    partitions = split_partitions(data, workers)
+    LOGGER.debug(
+        "Categorise %s rows in %s partitions with %s workers",
+        len(data),
+        len(partitions),
+        workers,
+    )
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(rules, orders)
+    ) as executor:
+        # 'map' returns results in submission order
+        results = executor.map(
+            _categorise_partition,
+            partitions,
+            [contractor_field] * len(partitions),
+            [title_field] * len(partitions),
+            [rule_counts is not None] * len(partitions),
+        )
+        chunks = []
+        for chunk, counts in results:
+            chunks.append(chunk)
+            if counts is not None:
+                add_rule_counts(rule_counts, counts)
+        return pd.concat(chunks)
@@ -0,0 +1,203 @@
+"""
+This file contains all method related to CPU profiling:
+    -StackSampler
+    -CpuProfiler
+
+Two modes are available:
+    "cprofile"  deterministic profile of every call with cProfile; call stacks
+                are sampled at the same time for collapsed stacks
+    "sample"    only call stacks of profiled thread are sampled every
+                'interval' seconds, with low overhead; '.pstats' file is
+                built from samples (times are estimates, call counts are
+                sample counts)
+
+Each profile is saved as '.pstats' file (pstats, snakeviz) and '.collapsed'
+file with one 'frame;frame;... count' line per stack, used by flame graph
+tools (flamegraph.pl, speedscope, inferno). Worker processes of parallel
+categorisation are not profiled.
+"""
+
+import cProfile
+import collections
+import logging
+import marshal
+import os
+import sys
+import threading
+import time
+
+LOGGER = logging.getLogger(__name__)
+
+PROFILE_MODES = ("cprofile", "sample")
+
+
+def _frame_label(code) -> str:
+    """
+    Return flame graph frame label of code object, e.g. 'main (main.py:60)'.
+    """
+    file_name = code.co_filename
+    try:
+        file_name = os.path.relpath(file_name)
+    except ValueError:
+        pass
+    if file_name.startswith(".."):
+        file_name = os.path.basename(code.co_filename)
+    return f"{code.co_name} ({file_name}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Sample call stack of one thread from background thread.
+    Stacks are counted as tuples of code objects, outermost first.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: int | None = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks: collections.Counter = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="stack-sampler", daemon=True
+        )
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(  # pylint: disable=protected-access
+                self.thread_id
+            )
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def start(self) -> None:
+        """
+        Start sampling.
+        """
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop sampling.
+        """
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> list[str]:
+        """
+        Return stacks in collapsed format: 'outer;...;inner count'.
+        """
+        lines = collections.Counter()
+        for stack, count in self.stacks.items():
+            lines[";".join(_frame_label(code) for code in stack)] += count
+        return [f"{stack} {count}" for stack, count in sorted(lines.items())]
+
+    def pstats_data(self) -> dict:
+        """
+        Return samples as data of 'pstats.Stats' (format of marshalled
+        '.pstats' file). Times are sample counts multiplied by interval.
+        """
+        stats = {}
+
+        def function(code) -> tuple:
+            return (code.co_filename, code.co_firstlineno, code.co_name)
+
+        for stack, count in self.stacks.items():
+            seconds = count * self.interval
+            seen = set()
+            for depth, code in enumerate(stack):
+                key = function(code)
+                primitive, calls, own, total, callers = stats.setdefault(
+                    key, [0, 0, 0.0, 0.0, {}]
+                )
+                inner = depth == len(stack) - 1
+                # Recursive frames count once to inclusive time
+                recursive = key in seen
+                seen.add(key)
+                stats[key] = [
+                    primitive + (0 if recursive else count),
+                    calls + count,
+                    own + (seconds if inner else 0.0),
+                    total + (0.0 if recursive else seconds),
+                    callers,
+                ]
+                if depth:
+                    caller = function(stack[depth - 1])
+                    previous = callers.get(caller, (0, 0, 0.0, 0.0))
+                    callers[caller] = (
+                        previous[0] + count,
+                        previous[1] + count,
+                        previous[2] + (seconds if inner else 0.0),
+                        previous[3] + seconds,
+                    )
+        return {key: tuple(value) for key, value in stats.items()}
+
+
+class CpuProfiler:
+    """
+    Profile block of code in 'cprofile' or 'sample' mode.
+    Mode None disables profiling.
+    """
+
+    def __init__(self, mode: str | None = "cprofile", interval: float = 0.005):
+        if mode is not None and mode not in PROFILE_MODES:
+            raise ValueError(f"Profiling mode must be one of {PROFILE_MODES}.")
+        self.mode = mode
+        self.interval = interval
+        self.profile: cProfile.Profile | None = None
+        self.sampler: StackSampler | None = None
+        self.seconds = 0.0
+        self._start = 0.0
+
+    def __enter__(self) -> "CpuProfiler":
+        if self.mode is None:
+            return self
+        self.sampler = StackSampler(self.interval)
+        self.sampler.start()
+        if self.mode == "cprofile":
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.mode is None:
+            return
+        self.seconds = time.perf_counter() - self._start
+        if self.profile is not None:
+            self.profile.disable()
+        self.sampler.stop()
+
+    def save(self, folder: str, label: str) -> list[str]:
+        """
+        Save '<folder>/cpu_<label>_<timestamp>.pstats' and '.collapsed' files.
+        Return saved file paths.
+        """
+        if self.mode is None:
+            return []
+        os.makedirs(folder, exist_ok=True)
+        stamp = time.strftime("%Y%m%dT%H%M%S")
+        base_path = os.path.join(folder, f"cpu_{label}_{stamp}")
+
+        pstats_path = base_path + ".pstats"
+        if self.profile is not None:
+            self.profile.dump_stats(pstats_path)
+        else:
+            with open(pstats_path, "wb") as file:
+                marshal.dump(self.sampler.pstats_data(), file)
+
+        collapsed_path = base_path + ".collapsed"
+        with open(collapsed_path, "w", encoding="utf-8") as file:
+            file.writelines(line + "\n" for line in self.sampler.collapsed())
+
+        LOGGER.info(
+            "CPU profile (%s, %.2f s, %s samples) saved in: %s, %s",
+            self.mode,
+            self.seconds,
+            sum(self.sampler.stacks.values()),
+            pstats_path,
+            collapsed_path,
+        )
+        return [pstats_path, collapsed_path]
@@ -0,0 +1,240 @@
+"""
+This file contains all method related to file-based work queue:
+    -WorkQueue
+    -Lease
+
+Transaction files in input folder are distributed over independent workers
+(processes on any number of hosts sharing the folder) without a broker:
+    1. Worker creates lease file 'processing/<file>.lease' with O_EXCL,
+       so only one worker claims the file.
+    2. Worker moves the file to 'processing' folder with atomic rename.
+    3. Lease file modification time is renewed by background thread while
+       the file is processed. Lease not renewed for 'lease_seconds' expires
+       and the file is claimed again by another worker.
+    4. Processed file is moved to 'done' or 'failed' folder (with
+       '<file>.error' containing error message) and lease is removed.
+
+Expired lease is taken over by renaming it to a unique name, which succeeds
+for one worker only. Hosts clocks should differ by less than lease time.
+"""
+
+import contextlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterator
+
+LOGGER = logging.getLogger(__name__)
+
+LEASE_SUFFIX = ".lease"
+
+
+class Lease:
+    """
+    Lease of one file in 'processing' folder, renewed by background thread.
+    """
+
+    def __init__(self, lease_path: str, worker_id: str, lease_seconds: float):
+        self.lease_path = lease_path
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._renew_loop, name="lease-renewal", daemon=True
+        )
+
+    @property
+    def owned(self) -> bool:
+        """
+        Check if lease file still belongs to this worker.
+        """
+        return _lease_owner(self.lease_path) == self.worker_id
+
+    def _renew_loop(self) -> None:
+        while not self._stop.wait(self.lease_seconds / 3):
+            owner = _lease_owner(self.lease_path)
+            if owner is not None and owner != self.worker_id:
+                LOGGER.warning("Lease lost: %s", self.lease_path)
+                return
+            # Lease file may be missing for a moment while it is put back
+            with contextlib.suppress(FileNotFoundError):
+                os.utime(self.lease_path)
+
+    def start(self) -> None:
+        """
+        Start lease renewal.
+        """
+        self._thread.start()
+
+    def release(self) -> None:
+        """
+        Stop renewal and remove lease file if it is still owned.
+        """
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        if self.owned:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.lease_path)
+
+
+def _lease_owner(lease_path: str) -> str | None:
+    """
+    Return worker id saved in lease file or None.
+    """
+    try:
+        with open(lease_path, "r", encoding="utf-8") as file:
+            return json.load(file).get("worker")
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+class WorkQueue:
+    """
+    Queue of files matching 'accept' in 'folder'. Claimed files are kept in
+    'processing', finished in 'done' and 'failed' subfolders of 'folder'.
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        accept: Callable[[str], bool],
+        lease_seconds: float = 300,
+        worker_id: str | None = None,
+    ):
+        self.folder = folder
+        self.accept = accept
+        self.lease_seconds = lease_seconds
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.processing_folder = os.path.join(folder, "processing")
+        self.done_folder = os.path.join(folder, "done")
+        self.failed_folder = os.path.join(folder, "failed")
+        for path in (self.processing_folder, self.done_folder, self.failed_folder):
+            os.makedirs(path, exist_ok=True)
+
+    def _lease_path(self, name: str) -> str:
+        return os.path.join(self.processing_folder, name + LEASE_SUFFIX)
+
+    def _expired(self, lease_path: str) -> bool:
+        try:
+            return time.time() - os.stat(lease_path).st_mtime > self.lease_seconds
+        except FileNotFoundError:
+            return True
+
+    def _acquire(self, name: str) -> Lease | None:
+        """
+        Create lease for file 'name'. Expired lease is taken over.
+        """
+        lease_path = self._lease_path(name)
+        if os.path.exists(lease_path):
+            if not self._expired(lease_path):
+                return None
+            # Only one worker renames expired lease; others get FileNotFoundError
+            stale_path = f"{lease_path}.{uuid.uuid4().hex}"
+            try:
+                os.rename(lease_path, stale_path)
+            except FileNotFoundError:
+                return None
+            if not self._expired(stale_path):
+                # Renamed lease created meanwhile by another worker: put it back
+                with contextlib.suppress(FileExistsError):
+                    os.link(stale_path, lease_path)
+                os.remove(stale_path)
+                return None
+            os.remove(stale_path)
+            LOGGER.warning("Expired lease taken over: %s", lease_path)
+        try:
+            descriptor = os.open(lease_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return None
+        with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+            json.dump({"worker": self.worker_id, "claimed": time.time()}, file)
+        return Lease(lease_path, self.worker_id, self.lease_seconds)
+
+    def _candidates(self) -> list[tuple[str, str]]:
+        """
+        Return (folder, name) of files which may be claimed. Files left in
+        'processing' (with expired or missing lease) go first.
+        """
+        candidates = []
+        for folder in (self.processing_folder, self.folder):
+            try:
+                names = sorted(os.listdir(folder))
+            except FileNotFoundError:
+                continue
+            candidates.extend(
+                (folder, name)
+                for name in names
+                if self.accept(name)
+                and os.path.isfile(os.path.join(folder, name))
+            )
+        return candidates
+
+    def claim(self) -> tuple[str, Lease] | None:
+        """
+        Claim next file. Return (path in 'processing' folder, started lease)
+        or None when there is nothing to claim.
+        """
+        for folder, name in self._candidates():
+            lease = self._acquire(name)
+            if lease is None:
+                continue
+            claimed_path = os.path.join(self.processing_folder, name)
+            if folder != self.processing_folder:
+                try:
+                    os.rename(os.path.join(folder, name), claimed_path)
+                except FileNotFoundError:
+                    # Finished by another worker meanwhile
+                    lease.release()
+                    continue
+            elif not os.path.exists(claimed_path):
+                lease.release()
+                continue
+            lease.start()
+            LOGGER.info("Claimed %s by worker %s", name, self.worker_id)
+            return claimed_path, lease
+        return None
+
+    def finish(self, file_path: str, lease: Lease, error: str | None = None) -> str:
+        """
+        Move claimed file to 'done' folder, or 'failed' folder when 'error' is
+        set, and release lease. Return new file path.
+        """
+        name = os.path.basename(file_path)
+        if not lease.owned:
+            lease.release()
+            LOGGER.warning("File %s was claimed by another worker", name)
+            return file_path
+        target_folder = self.done_folder if error is None else self.failed_folder
+        target_path = os.path.join(target_folder, name)
+        os.replace(file_path, target_path)
+        if error is not None:
+            with open(target_path + ".error", "w", encoding="utf-8") as file:
+                file.write(error)
+        lease.release()
+        return target_path
+
+    def __iter__(self) -> Iterator[tuple[str, Lease]]:
+        """
+        Claim files until the queue is empty.
+        """
+        while (claimed := self.claim()) is not None:
+            yield claimed
+
+    @contextlib.contextmanager
+    def lock(self, name: str, poll_seconds: float = 0.5):
+        """
+        Hold lease 'name' for the block (e.g. while shared output files
+        are merged). Waits until lease is available.
+        """
+        while (lease := self._acquire(name)) is None:
+            time.sleep(poll_seconds)
+        lease.start()
+        try:
+            yield lease
+        finally:
+            lease.release()
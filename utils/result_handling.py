@@ -0,0 +1,145 @@
+"""
+This file contains all method related to cache of whole run results:
+    -code_version
+    -result_key
+    -save_result
+    -restore_result
+    -evict_results
+
+Result entry is a folder named by hash of input file content, mapping files,
+run parameters and code version. It keeps copies of output files and the
+summary of the run, which is merged into summary file again on restore.
+Entries are evicted least recently used first when cache exceeds size limit.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+from utils.cache_handling import evict_folders, file_hash
+from utils.summary_handling import (
+    read_summary,
+    save_summary,
+    write_merged_summary,
+)
+
+
+LOGGER = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+
+
+def code_version(folder: str | None = None) -> str:
+    """
+    Return hash of Python source files in 'folder' (project folder by default)
+    and its 'utils' subfolder. Any code change invalidates cached results.
+    Version of project folder is computed once per process, as its code is
+    already imported.
+    """
+    if folder is None:
+        return _project_code_version()
+    digest = hashlib.sha256()
+    for subfolder in (folder, os.path.join(folder, "utils")):
+        for name in sorted(os.listdir(subfolder)):
+            if name.endswith(".py"):
+                digest.update(name.encode())
+                digest.update(file_hash(os.path.join(subfolder, name)).encode())
+    return digest.hexdigest()
+
+
+@functools.cache
+def _project_code_version() -> str:
+    return code_version(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def result_key(
+    file_path: str,
+    mapping_files: list[str],
+    parameters: dict,
+    input_hash: str | None = None,
+) -> str:
+    """
+    Return result key built from input file content, mapping files content,
+    run parameters and code version. 'input_hash' is 'file_hash' of
+    'file_path' if already computed.
+    """
+    digest = hashlib.sha256()
+    digest.update((input_hash or file_hash(file_path)).encode())
+    for mapping_file in mapping_files:
+        digest.update(file_hash(mapping_file).encode())
+    digest.update(json.dumps(parameters, sort_keys=True, default=str).encode())
+    digest.update(code_version().encode())
+    return digest.hexdigest()
+
+
+def save_result(
+    folder: str, files: list[str], summaries: list[tuple[dict, str]]
+) -> None:
+    """
+    Save copies of output 'files' and (run summary, summary file path) pairs
+    as result entry in 'folder'. Existing entry is replaced atomically.
+    """
+    parent = os.path.dirname(os.path.abspath(folder))
+    os.makedirs(parent, exist_ok=True)
+    temp_folder = tempfile.mkdtemp(dir=parent)
+
+    manifest = {"files": [], "summaries": []}
+    for position, file_path in enumerate(files):
+        name = f"{position}_{os.path.basename(file_path)}"
+        shutil.copyfile(file_path, os.path.join(temp_folder, name))
+        manifest["files"].append({"name": name, "path": file_path})
+    for position, (summary, summary_file) in enumerate(summaries):
+        name = f"summary_{position}.csv"
+        save_summary(summary, os.path.join(temp_folder, name))
+        manifest["summaries"].append({"name": name, "path": summary_file})
+
+    with open(os.path.join(temp_folder, MANIFEST_FILE), "w", encoding="utf-8") as file:
+        json.dump(manifest, file, ensure_ascii=False)
+
+    shutil.rmtree(folder, ignore_errors=True)
+    os.replace(temp_folder, folder)
+    LOGGER.debug("Result saved in: %s", folder)
+
+
+def restore_result(
+    folder: str, merge_mode: str = "replace", source: str | None = None
+) -> list[str] | None:
+    """
+    Restore output files from result entry in 'folder' and merge run summaries
+    into summary files ('source' as in 'write_merged_summary').
+    Return restored file paths or None if there is no entry.
+    Files are copied, not hard-linked, because outputs are later rewritten in place.
+    """
+    manifest_file = os.path.join(folder, MANIFEST_FILE)
+    if not os.path.exists(manifest_file):
+        return None
+
+    with open(manifest_file, "r", encoding="utf-8") as file:
+        manifest = json.load(file)
+
+    restored = []
+    for entry in manifest["files"]:
+        os.makedirs(os.path.dirname(os.path.abspath(entry["path"])), exist_ok=True)
+        shutil.copyfile(os.path.join(folder, entry["name"]), entry["path"])
+        restored.append(entry["path"])
+    for entry in manifest["summaries"]:
+        summary = read_summary(os.path.join(folder, entry["name"]))
+        write_merged_summary(entry["path"], summary, merge_mode, source)
+        restored.append(entry["path"])
+
+    # Last use time for LRU eviction
+    os.utime(manifest_file)
+    LOGGER.debug("Result restored from: %s", folder)
+    return restored
+
+
+def evict_results(cache_folder: str, max_size_mb: float) -> list[str]:
+    """
+    Remove least recently used result entries from 'cache_folder' until
+    total size is within 'max_size_mb'. Return removed entry folders.
+    """
+    return evict_folders(cache_folder, MANIFEST_FILE, max_size_mb)
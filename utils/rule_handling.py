@@ -0,0 +1,263 @@
+"""
+This file contains all method related to category mapping rules:
+    -parse_rule
+    -mapping_categories
+    -title_regex
+    -RuleSet
+
+Mapping value is a category (literal rule) or an object with rule kind:
+    "LIDL": "LIDL"                                          literal substring
+    "ALDI": {"category": "ALDI", "kind": "prefix"}          value starts with key
+    "OBI": {"category": "MIESZKANIE", "kind": "word"}       key as whole word(s)
+    "^allegro\\s": {"category": "ZAKUPY", "kind": "regex"}  regular expression
+
+Keys are matched case-insensitively. Only 'regex' rules use regular
+expression engine, so '.', '+' or '(' in other keys match themselves.
+Rules with 'normalise' (title rules) are matched against normalised values
+(see 'title_handling'); their non-regex keys are normalised the same way.
+Diacritics of regex title keys are folded; digits of regex title keys are
+reported, because numbers in normalised titles are mostly tokens.
+Rules of one mapping are compiled once into RuleSet. Keys of non-regex rules
+are escaped into one combined pattern (a trie of keys), so a single scan of a
+value finds every key occurring in it; prefix and word rules only verify
+their position. Regex rules are searched one by one, and when only the deciding
+rule is needed, searching stops at it. The deciding rule is the last matching
+key in mapping order. This module does not need pandas, so single transaction
+matching (see 'matcher_handling') stays light.
+"""
+
+import functools
+import logging
+import re
+from collections.abc import Iterable, Mapping, Sequence
+
+from utils.title_handling import FOLD_TABLE, normalise_title
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+RULE_KINDS = ("literal", "prefix", "word", "regex")
+# Digits of regular expression, without repetition counts like '{4}'
+REGEX_DIGITS = re.compile(r"\\d|(?<!\\)\d(?![\d,]*\})")
+
+
+def parse_rule(key: str, value: str | Mapping) -> tuple[str, str]:
+    """
+    Return (kind, category) of mapping entry. Raise ValueError for unknown kind.
+    """
+    if isinstance(value, Mapping):
+        kind = value.get("kind", "literal")
+        category = value["category"]
+    else:
+        kind, category = "literal", value
+    if kind not in RULE_KINDS:
+        raise ValueError(
+            f"Unknown rule kind '{kind}' of key '{key}'. Available: {RULE_KINDS}"
+        )
+    return kind, category
+
+
+def mapping_categories(mapping: Mapping[str, str | Mapping]) -> dict[str, str]:
+    """
+    Return mapping key -> category, without rule kinds.
+    """
+    return {key: parse_rule(key, value)[1] for key, value in mapping.items()}
+
+
+@functools.lru_cache(maxsize=None)
+def title_regex(key: str) -> str:
+    """
+    Return regex title 'key' matching normalised titles: with diacritics
+    folded (case is ignored anyway). Warn once if key refers to digits,
+    because dates, card numbers, amounts and numbers of 4+ digits are
+    replaced by tokens ('<date>', '<card>', '<amount>', '<number>').
+    """
+    if REGEX_DIGITS.search(key):
+        LOGGER.warning(
+            "Regex title key '%s' refers to digits, but it is matched against "
+            "normalised title, where numbers are mostly replaced by tokens "
+            "like '<card>' or '<number>'. Use tokens instead.",
+            key,
+        )
+    return key.translate(FOLD_TABLE)
+
+
+def _is_word_character(character: str) -> bool:
+    return character.isalnum() or character == "_"
+
+
+def _contains_word(text: str, key: str) -> bool:
+    """
+    Check if 'key' occurs in 'text' not adjacent to other word characters
+    (same as regular expression '\\b' around key starting and ending
+    with word character).
+    """
+    check_start = _is_word_character(key[0])
+    check_end = _is_word_character(key[-1])
+    start = text.find(key)
+    while start >= 0:
+        end = start + len(key)
+        if not (
+            (check_start and start > 0 and _is_word_character(text[start - 1]))
+            or (check_end and end < len(text) and _is_word_character(text[end]))
+        ):
+            return True
+        start = text.find(key, start + 1)
+    return False
+
+
+def _trie_pattern(keys: Iterable[str]) -> str:
+    """
+    Return regular expression matching any of 'keys' literally, built as trie
+    of keys, so the longest key starting at given position is matched.
+    """
+    trie: dict = {}
+    for key in keys:
+        node = trie
+        for character in key:
+            node = node.setdefault(character, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [
+            re.escape(character) + build(child)
+            for character, child in sorted(node.items())
+            if character
+        ]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return "(?:" + pattern + ")?" if "" in node else pattern
+
+    return build(trie)
+
+
+class RuleSet:
+    """
+    Compiled rules of one mapping in mapping order. Like list of
+    (lowercase key, category) rules, it can be indexed and iterated.
+    With 'normalise' values and keys are normalised titles.
+    """
+
+    def __init__(
+        self, items: Iterable[tuple[str, str | Mapping]], normalise: bool = False
+    ):
+        self.normalise = normalise
+        self.keys: list[str] = []
+        self.kinds: list[str] = []
+        self.categories: list[str] = []
+        self.patterns: list[re.Pattern | None] = []
+        for key, value in items:
+            kind, category = parse_rule(key, value)
+            if not key:
+                raise ValueError(f"Empty key of category '{category}'.")
+            self.kinds.append(kind)
+            self.categories.append(category)
+            if kind == "regex":
+                self.keys.append(key)
+                pattern = title_regex(key) if normalise else key
+                self.patterns.append(re.compile(pattern, re.IGNORECASE))
+            else:
+                self.keys.append(normalise_title(key) if normalise else key.lower())
+                self.patterns.append(None)
+        # Pure literal rules need no verification of found keys
+        self.literal = all(kind == "literal" for kind in self.kinds)
+        self._regex_positions = [
+            position for position, kind in enumerate(self.kinds) if kind == "regex"
+        ]
+        # Combined pattern finds the longest key starting at each position;
+        # rules of keys being its prefixes occur there too
+        key_positions: dict[str, list[int]] = {}
+        for position, key in enumerate(self.keys):
+            if self.kinds[position] != "regex":
+                key_positions.setdefault(key, []).append(position)
+        self._key_rules = {
+            key: sorted(
+                position
+                for other, positions in key_positions.items()
+                if key.startswith(other)
+                for position in positions
+            )
+            for key in key_positions
+        }
+        self._combined = (
+            re.compile("(?=(" + _trie_pattern(key_positions) + "))")
+            if key_positions
+            else None
+        )
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __getitem__(self, position: int) -> tuple[str, str]:
+        return self.keys[position], self.categories[position]
+
+    def __iter__(self):
+        return iter(zip(self.keys, self.categories))
+
+    def text(self, value) -> str:
+        """
+        Return text of single value matched by rules: lowercase or normalised.
+        """
+        value = str(value)
+        return normalise_title(value) if self.normalise else value.lower()
+
+    def matches(self, position: int, text: str) -> bool:
+        """
+        Check if rule 'position' matches 'text' (see 'text').
+        """
+        kind = self.kinds[position]
+        if kind == "literal":
+            return self.keys[position] in text
+        if kind == "prefix":
+            return text.lstrip().startswith(self.keys[position])
+        if kind == "word":
+            return _contains_word(text, self.keys[position])
+        return self.patterns[position].search(text) is not None
+
+    def _candidates(self, text: str) -> set[int]:
+        """
+        Return positions of non-regex rules whose keys occur in 'text', found
+        with one scan of combined pattern. Prefix and word rules among them
+        are not verified yet.
+        """
+        found: set[int] = set()
+        if self._combined is not None:
+            for key in self._combined.findall(text):
+                found.update(self._key_rules[key])
+        return found
+
+    def matching(self, text: str) -> set[int]:
+        """
+        Return positions of all rules matching 'text' (see 'text').
+        """
+        found = self._candidates(text)
+        if not self.literal:
+            found = {
+                position
+                for position in found
+                if self.kinds[position] == "literal" or self.matches(position, text)
+            }
+        for position in self._regex_positions:
+            if self.patterns[position].search(text) is not None:
+                found.add(position)
+        return found
+
+    def first_match(self, text: str, order: Sequence[int] | None = None) -> int:
+        """
+        Return position of the first rule in 'order' matching 'text'
+        (see 'text'), or -1. Default order is reversed mapping order, so the
+        result is the deciding (last matching) rule. Rules are tested in
+        order and testing stops at the first match, so regex rules after it
+        are not searched.
+        """
+        candidates = self._candidates(text)
+        if order is None:
+            order = sorted(candidates.union(self._regex_positions), reverse=True)
+        for position in order:
+            kind = self.kinds[position]
+            if kind == "regex" or position in candidates:
+                if kind == "literal" or self.matches(position, text):
+                    return position
+        return -1
@@ -0,0 +1,173 @@
+"""
+This file contains all method related to category rule statistics:
+    -RuleCounter
+    -add_rule_counts
+    -update_rule_stats
+    -read_rule_stats
+    -save_rule_stats
+    -rule_report
+
+Rule hits are counted in the matching pass of 'categorise_field'. Rule wins
+are rows where the rule set final category (last matching key wins, title
+rules after contractor rules). Rows matched by the rule but later replaced
+by another key are counted as overwritten.
+"""
+
+import json
+import logging
+import os
+
+import numpy as np
+
+from utils.rule_handling import mapping_categories
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+class RuleCounter:
+    """
+    Count hits and wins of rules for one categorised chunk.
+    'rules' maps field name to number of its rules, in matching order.
+    """
+
+    def __init__(self, rows: int, rules: dict[str, int]):
+        self.hits = {
+            field: np.zeros(count, dtype=np.int64) for field, count in rules.items()
+        }
+        self._offsets = {}
+        offset = 0
+        for field, count in rules.items():
+            self._offsets[field] = offset
+            offset += count
+        self._rules = offset
+        # Global index of rule which set category of each row, -1 for none
+        self._owner = np.full(rows, -1, dtype=np.int64)
+
+    def record(self, field: str, position: int, rows: np.ndarray) -> None:
+        """
+        Record rows matched by rule 'position' of 'field'.
+        'rows' is a boolean mask or array of row positions.
+        """
+        if rows.dtype == bool:
+            self.hits[field][position] += np.count_nonzero(rows)
+        else:
+            self.hits[field][position] += len(rows)
+        self._owner[rows] = self._offsets[field] + position
+
+    def counts(self) -> dict[str, dict[str, np.ndarray]]:
+        """
+        Return hits and wins of each rule: field -> {"hits": ..., "wins": ...}.
+        """
+        wins = np.bincount(self._owner[self._owner >= 0], minlength=self._rules)
+        return {
+            field: {
+                "hits": hits,
+                "wins": wins[self._offsets[field] : self._offsets[field] + len(hits)],
+            }
+            for field, hits in self.hits.items()
+        }
+
+
+def add_rule_counts(
+    total: dict[str, dict[str, np.ndarray]], counts: dict[str, dict[str, np.ndarray]]
+) -> dict[str, dict[str, np.ndarray]]:
+    """
+    Add 'counts' of one chunk to 'total' in place and return 'total'.
+    """
+    for field, field_counts in counts.items():
+        if field not in total:
+            total[field] = {
+                name: values.copy() for name, values in field_counts.items()
+            }
+        else:
+            for name, values in field_counts.items():
+                total[field][name] += values
+    return total
+
+
+def update_rule_stats(
+    stats: dict,
+    categories: dict[str, dict[str, str]],
+    fields: dict[str, str],
+    counts: dict[str, dict[str, np.ndarray]],
+    rows: int,
+) -> dict:
+    """
+    Add rule 'counts' of one run to accumulated 'stats'.
+
+    Parameters
+    ---------
+    stats: dict
+        Accumulated statistics from 'read_rule_stats'.
+    categories: dict
+        Mapping used in the run, e.g. {"Contractor": {...}, "Title": {...}}.
+    fields: dict
+        Mapping name -> categorised field name, e.g. {"Title": "Tytuł"}.
+    counts: dict
+        Rule counts from 'RuleCounter.counts' or 'add_rule_counts'.
+    rows: int
+        Number of categorised rows.
+
+    Returns
+    -------
+    dict
+        Updated statistics.
+    """
+    stats.setdefault("runs", 0)
+    stats.setdefault("rows", 0)
+    stats["runs"] += 1
+    stats["rows"] += rows
+    for mapping_name, field in fields.items():
+        rules = stats.setdefault("rules", {}).setdefault(mapping_name, {})
+        field_counts = counts.get(field)
+        mapping = mapping_categories(categories[mapping_name])
+        for position, (key, category) in enumerate(mapping.items()):
+            rule = rules.setdefault(key, {"hits": 0, "overwritten": 0})
+            rule["category"] = category
+            if field_counts is not None:
+                hits = int(field_counts["hits"][position])
+                rule["hits"] += hits
+                rule["overwritten"] += hits - int(field_counts["wins"][position])
+    return stats
+
+
+def read_rule_stats(file_path: str) -> dict:
+    """
+    Read accumulated rule statistics. Return empty statistics if file does not exist.
+    """
+    if not os.path.exists(file_path):
+        return {"runs": 0, "rows": 0, "rules": {}}
+    with open(file_path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_rule_stats(stats: dict, file_path: str) -> None:
+    """
+    Save accumulated rule statistics.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    with open(file_path, "w", encoding="utf-8") as file:
+        json.dump(stats, file, indent=True, ensure_ascii=False)
+    LOGGER.info("Rule statistics saved in: %s", file_path)
+
+
+def rule_report(stats: dict, categories: dict[str, dict[str, str]]) -> dict:
+    """
+    Return rules of current mapping 'categories' which never fired or were
+    always overwritten by another key, as candidates for pruning.
+    """
+    report = {"runs": stats.get("runs", 0), "never_fired": {}, "always_shadowed": {}}
+    for mapping_name, mapping in categories.items():
+        rules = stats.get("rules", {}).get(mapping_name, {})
+        never_fired = []
+        always_shadowed = []
+        for key in mapping:
+            rule = rules.get(key, {"hits": 0, "overwritten": 0})
+            if rule["hits"] == 0:
+                never_fired.append(key)
+            elif rule["overwritten"] == rule["hits"]:
+                always_shadowed.append(key)
+        report["never_fired"][mapping_name] = never_fired
+        report["always_shadowed"][mapping_name] = always_shadowed
+    return report
@@ -0,0 +1,329 @@
+"""
+This file contains all method related to local categorisation service:
+    -parse_transactions
+    -Metrics
+    -CategorisationHandler
+    -CategorisationServer
+
+Service keeps CategoryMatcher with compiled rules in memory and categorises
+batches of transactions sent as JSON lines or CSV. Requests are handled by
+bounded pool of worker threads; requests above pool and queue capacity are
+rejected with '503 Service Unavailable'.
+
+Endpoints:
+    POST /categorise  JSON lines (objects or [contractor, title] arrays)
+                      or CSV with header ('Content-Type: text/csv', '?sep=;')
+    GET  /metrics     request, transaction and latency statistics
+    GET  /health      'ok'
+"""
+
+import collections
+import csv
+import http.server
+import io
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.matcher_handling import CategoryMatcher
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+def parse_transactions(
+    body: str,
+    content_type: str,
+    contractor_field: str = "Dane kontrahenta",
+    title_field: str = "Tytuł",
+    separator: str = ";",
+) -> list[tuple]:
+    """
+    Parse request body into (contractor, title) pairs.
+    Raise ValueError for invalid JSON line, contractor or title other than
+    string or null, or missing CSV column.
+    """
+    if content_type == "text/csv":
+        reader = csv.DictReader(io.StringIO(body), delimiter=separator)
+        for field in (contractor_field, title_field):
+            if field not in (reader.fieldnames or []):
+                raise ValueError(f"CSV column '{field}' does not exist.")
+        return [(row[contractor_field], row[title_field]) for row in reader]
+
+    transactions = []
+    for line_number, line in enumerate(body.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            transaction = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in line {line_number}: {e}") from e
+        if isinstance(transaction, dict):
+            transaction = (
+                transaction.get(contractor_field),
+                transaction.get(title_field),
+            )
+        elif not isinstance(transaction, list) or len(transaction) != 2:
+            raise ValueError(
+                f"Line {line_number} must be an object or [contractor, title] array."
+            )
+        if not all(value is None or isinstance(value, str) for value in transaction):
+            raise ValueError(
+                f"Contractor and title in line {line_number} must be strings or null."
+            )
+        transactions.append(tuple(transaction))
+    return transactions
+
+
+class Metrics:
+    """
+    Thread-safe request and latency statistics.
+    Latency percentiles are computed from the last 'window' requests.
+    """
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._latencies = collections.deque(maxlen=window)
+        self.requests = 0
+        self.transactions = 0
+        self.errors = 0
+        self.rejected = 0
+        self.in_flight = 0
+
+    def start(self) -> None:
+        """
+        Mark start of request handling.
+        """
+        with self._lock:
+            self.in_flight += 1
+
+    def finish(self, latency: float, transactions: int = 0, error: bool = False):
+        """
+        Record finished request with 'latency' in seconds.
+        """
+        with self._lock:
+            self.in_flight -= 1
+            self.requests += 1
+            self.transactions += transactions
+            self.errors += error
+            self._latencies.append(latency)
+
+    def reject(self) -> None:
+        """
+        Record request rejected because worker pool is full.
+        """
+        with self._lock:
+            self.rejected += 1
+
+    def snapshot(self) -> dict:
+        """
+        Return current statistics as dictionary.
+        """
+        with self._lock:
+            uptime = time.monotonic() - self._started
+            latencies = sorted(self._latencies)
+            result = {
+                "uptime_s": round(uptime, 3),
+                "requests": self.requests,
+                "transactions": self.transactions,
+                "errors": self.errors,
+                "rejected": self.rejected,
+                "in_flight": self.in_flight,
+                "transactions_per_s": round(self.transactions / uptime, 1),
+            }
+        if latencies:
+            result["latency_ms"] = {
+                "p50": round(statistics.median(latencies) * 1000, 3),
+                "p95": round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 3),
+                "max": round(latencies[-1] * 1000, 3),
+            }
+        return result
+
+
+class CategorisationHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Handle service endpoints. Categories are streamed back in batches
+    with chunked transfer encoding.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Idle keep-alive connections release their worker after timeout (seconds)
+    timeout = 10
+    server: "CategorisationServer"
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        LOGGER.debug("%s - %s", self.address_string(), format % args)
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Return metrics or health status.
+        """
+        path = urllib.parse.urlsplit(self.path).path
+        if path == "/metrics":
+            body = json.dumps(self.server.metrics.snapshot()).encode()
+            self._send(200, body, "application/json")
+        elif path == "/health":
+            self._send(200, b"ok", "text/plain")
+        else:
+            self._send(404, b"Not found", "text/plain")
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """
+        Categorise transactions from request body.
+        """
+        url = urllib.parse.urlsplit(self.path)
+        if url.path != "/categorise":
+            self._send(404, b"Not found", "text/plain")
+            return
+
+        start = time.perf_counter()
+        self.server.metrics.start()
+        transactions = []
+        error = True
+        try:
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+            except ValueError:
+                length = -1
+            if length < 0:
+                self.close_connection = True
+                self._send(400, b"Invalid Content-Length", "text/plain")
+                return
+            if length > self.server.max_body_bytes:
+                self.close_connection = True
+                self._send(413, b"Request body too large", "text/plain")
+                return
+
+            content_type = self.headers.get_content_type()
+            separator = urllib.parse.parse_qs(url.query).get("sep", [";"])[0]
+            try:
+                transactions = parse_transactions(
+                    self.rfile.read(length).decode("utf-8"),
+                    content_type,
+                    self.server.contractor_field,
+                    self.server.title_field,
+                    separator,
+                )
+            except (ValueError, UnicodeDecodeError) as e:
+                self._send(400, str(e).encode(), "text/plain")
+                return
+
+            self.send_response(200)
+            self.send_header(
+                "Content-Type",
+                "text/csv" if content_type == "text/csv" else "application/x-ndjson",
+            )
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            matcher = self.server.matcher()
+            if content_type == "text/csv":
+                self._send_chunk(b"category\n")
+            batch_size = self.server.batch_size
+            for batch_start in range(0, len(transactions), batch_size):
+                batch = transactions[batch_start : batch_start + batch_size]
+                categories = matcher.categorise_many(batch)
+                if content_type == "text/csv":
+                    output = io.StringIO()
+                    csv.writer(output, lineterminator="\n").writerows(
+                        [category] for category in categories
+                    )
+                    lines = output.getvalue()
+                else:
+                    lines = "".join(
+                        json.dumps({"category": category}, ensure_ascii=False) + "\n"
+                        for category in categories
+                    )
+                self._send_chunk(lines.encode())
+            self.wfile.write(b"0\r\n\r\n")
+            error = False
+        finally:
+            self.server.metrics.finish(
+                time.perf_counter() - start, len(transactions), error
+            )
+
+
+class CategorisationServer(http.server.HTTPServer):
+    """
+    HTTP server with bounded pool of worker threads and warm CategoryMatcher.
+    Mapping file is loaded again when its modification time changes.
+    """
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        mapping_file: str,
+        contractor_field: str = "Dane kontrahenta",
+        title_field: str = "Tytuł",
+        workers: int = 4,
+        queue_size: int = 16,
+        batch_size: int = 1000,
+        max_body_mb: float = 64,
+    ):  # pylint: disable=too-many-arguments
+        self.mapping_file = mapping_file
+        self.contractor_field = contractor_field
+        self.title_field = title_field
+        self.batch_size = batch_size
+        self.max_body_bytes = int(max_body_mb * 1024 * 1024)
+        self.metrics = Metrics()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="categorise"
+        )
+        # Requests handled or waiting for a worker
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._matcher_lock = threading.Lock()
+        self._matcher = None
+        self._mapping_mtime = None
+        self.matcher()
+        super().__init__(address, CategorisationHandler)
+
+    def matcher(self) -> CategoryMatcher:
+        """
+        Return matcher for current mapping file.
+        """
+        mtime = os.stat(self.mapping_file).st_mtime_ns
+        with self._matcher_lock:
+            if mtime != self._mapping_mtime:
+                self._matcher = CategoryMatcher.from_file(self.mapping_file)
+                self._mapping_mtime = mtime
+                LOGGER.info("Category mapping loaded from: %s", self.mapping_file)
+            return self._matcher
+
+    def process_request(self, request, client_address):
+        if not self._slots.acquire(blocking=False):
+            self.metrics.reject()
+            request.sendall(
+                b"HTTP/1.1 503 Service Unavailable\r\n"
+                b"Content-Length: 0\r\nConnection: close\r\n\r\n"
+            )
+            self.shutdown_request(request)
+            return
+        self._executor.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:  # pylint: disable=broad-except
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,198 @@
+"""
+This file contains all method related to SQLite transaction store:
+    -open_store
+    -append_transactions
+    -spend_per_category_per_month
+    -top_contractors
+"""
+
+import logging
+import os
+import sqlite3
+from datetime import datetime
+
+# pandas is imported inside functions building DataFrames, so queries of
+# the store (see 'query.py') do not pay pandas import time
+
+LOGGER = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    transaction_date TEXT NOT NULL,
+    contractor TEXT,
+    title TEXT,
+    amount INTEGER NOT NULL,
+    account TEXT,
+    category TEXT NOT NULL,
+    source_file TEXT NOT NULL,
+    loaded_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_transactions_date
+    ON transactions (transaction_date);
+CREATE INDEX IF NOT EXISTS ix_transactions_category_date
+    ON transactions (category, transaction_date);
+CREATE INDEX IF NOT EXISTS ix_transactions_contractor
+    ON transactions (contractor);
+CREATE INDEX IF NOT EXISTS ix_transactions_source
+    ON transactions (source_file);
+"""
+
+INSERT = """
+INSERT INTO transactions (
+    transaction_date, contractor, title, amount, account,
+    category, source_file, loaded_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def open_store(db_path: str) -> sqlite3.Connection:
+    """
+    Open SQLite transaction store. Create folder, table and indexes if missing.
+    """
+    folder = os.path.dirname(db_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    connection = sqlite3.connect(db_path)
+    connection.executescript(SCHEMA)
+    LOGGER.debug("Transaction store opened: %s", db_path)
+    return connection
+
+
+def _iso_dates(dates: "pd.Series") -> "pd.Series":
+    """
+    Convert parsed dates into ISO 'yyyy-mm-dd' text.
+    """
+    import pandas as pd  # pylint: disable=import-outside-toplevel
+
+    return pd.Series(
+        dates.to_numpy().astype("datetime64[D]").astype(str), index=dates.index
+    )
+
+
+def append_transactions(
+    connection: sqlite3.Connection,
+    data: "pd.DataFrame",
+    fields: dict[str, str],
+    source_file: str,
+    batch_size: int = 1000,
+    commit: bool = True,
+    replace_source: bool = True,
+) -> int:
+    """
+    Append categorised transactions to the store.
+    All batches of one file are inserted in a single database transaction.
+    Use commit=False to add more chunks of the same file to open transaction,
+    then call 'connection.commit()'.
+    With 'replace_source' rows loaded before from the same source file are
+    deleted in the same database transaction, so processing file again does
+    not duplicate its rows. Use replace_source=False for next chunks of
+    the same file.
+    Amounts are expected and stored as integer grosze.
+
+    Parameters
+    ---------
+    connection: sqlite3.Connection
+        Connection returned by 'open_store'.
+    data: pd.DataFrame
+        Categorised transactions.
+    fields: dict[str, str]
+        Field mapping with keys: transaction_date, contractor, title, amount,
+        account, category.
+    source_file: str
+        Transaction file path saved with each row.
+
+    Returns
+    -------
+    int
+        Number of inserted rows.
+    """
+    import pandas as pd  # pylint: disable=import-outside-toplevel
+
+    columns = pd.DataFrame(
+        {
+            "transaction_date": _iso_dates(data[fields["transaction_date"]]),
+            "contractor": data[fields["contractor"]],
+            "title": data[fields["title"]],
+            "amount": data[fields["amount"]].astype("int64"),
+            "account": data[fields["account"]],
+            "category": data[fields["category"]],
+        }
+    )
+    columns = columns.astype(object).where(columns.notna(), None)
+    columns["source_file"] = os.path.basename(source_file)
+    columns["loaded_at"] = datetime.now().isoformat(timespec="seconds")
+    rows = list(columns.itertuples(index=False, name=None))
+
+    if replace_source:
+        deleted = connection.execute(
+            "DELETE FROM transactions WHERE source_file = ?",
+            (os.path.basename(source_file),),
+        ).rowcount
+        if deleted:
+            LOGGER.debug("Deleted %s rows loaded before from %s", deleted, source_file)
+    for i in range(0, len(rows), batch_size):
+        connection.executemany(INSERT, rows[i : i + batch_size])
+    if commit:
+        connection.commit()
+
+    LOGGER.debug("Inserted %s rows from %s", len(rows), source_file)
+    return len(rows)
+
+
+def _year_filter(year: int | None) -> tuple[str, list[str]]:
+    """
+    Return SQL condition and parameters limiting transactions to 'year'.
+    Range condition lets SQLite use index on transaction_date.
+    """
+    if year is None:
+        return "1 = 1", []
+    return "transaction_date >= ? AND transaction_date < ?", [
+        f"{year}-01-01",
+        f"{year + 1}-01-01",
+    ]
+
+
+def spend_per_category_per_month(
+    connection: sqlite3.Connection, year: int | None = None
+) -> list[tuple[str, str, int, int]]:
+    """
+    Return (month, category, spend in grosze, number of transactions) rows.
+    """
+    condition, parameters = _year_filter(year)
+    query = f"""
+        SELECT substr(transaction_date, 1, 7) AS month,
+               category,
+               -SUM(amount) AS spend,
+               COUNT(*) AS transactions
+        FROM transactions
+        WHERE {condition}
+        GROUP BY month, category
+        ORDER BY month, spend DESC
+    """
+    return connection.execute(query, parameters).fetchall()
+
+
+def top_contractors(
+    connection: sqlite3.Connection,
+    category: str,
+    year: int | None = None,
+    limit: int = 10,
+) -> list[tuple[str, int, int]]:
+    """
+    Return (contractor, spend in grosze, number of transactions) rows
+    for contractors with the highest spend in 'category'.
+    """
+    condition, parameters = _year_filter(year)
+    query = f"""
+        SELECT contractor,
+               -SUM(amount) AS spend,
+               COUNT(*) AS transactions
+        FROM transactions
+        WHERE category = ? AND {condition}
+        GROUP BY contractor
+        ORDER BY spend DESC
+        LIMIT ?
+    """
+    return connection.execute(query, [category, *parameters, limit]).fetchall()
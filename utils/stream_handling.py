@@ -0,0 +1,114 @@
+"""
+This file contains all method related to streaming mode:
+    -chunk_size_for_budget
+    -ChunkSpill
+    -write_excel_stream
+"""
+
+import logging
+import math
+import pickle
+import tempfile
+from collections.abc import Iterable, Iterator
+
+import pandas as pd
+from openpyxl import Workbook
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+def chunk_size_for_budget(
+    sample: pd.DataFrame,
+    memory_budget_mb: float,
+    copies: int = 4,
+    min_rows: int = 100,
+) -> int:
+    """
+    Return number of CSV rows per chunk fitting in 'memory_budget_mb'.
+    Row size is estimated from 'sample'. Each chunk exists in up to 'copies'
+    versions at once (raw, transformed, categorised, written).
+    """
+    if sample.empty:
+        return min_rows
+
+    row_bytes = sample.memory_usage(index=True, deep=True).sum() / len(sample)
+    rows = int(memory_budget_mb * 1024 * 1024 / (row_bytes * copies))
+    LOGGER.debug("Estimated %.0f bytes per row, %s rows per chunk", row_bytes, rows)
+    return max(rows, min_rows)
+
+
+class ChunkSpill:
+    """
+    Temporary file with DataFrame chunks. Chunks are read back one at a time,
+    in the order they were written.
+    """
+
+    def __init__(self, folder: str | None = None):
+        self._file = tempfile.TemporaryFile(dir=folder)
+        self.rows = 0
+
+    def write(self, data: pd.DataFrame) -> None:
+        """
+        Append chunk to spill file.
+        """
+        if data.empty:
+            return
+        pickle.dump(data, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.rows += len(data)
+
+    def read(self) -> Iterator[pd.DataFrame]:
+        """
+        Yield chunks in written order.
+        """
+        self._file.seek(0)
+        while True:
+            try:
+                yield pickle.load(self._file)
+            except EOFError:
+                return
+
+    def close(self) -> None:
+        """
+        Close and remove spill file.
+        """
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _cell(value):
+    """
+    Convert pandas value into value accepted by openpyxl.
+    """
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if value is pd.NA or value is pd.NaT:
+        return None
+    return value
+
+
+def write_excel_stream(
+    chunks: Iterable[pd.DataFrame], columns: list[str], output_file: str
+) -> int:
+    """
+    Write chunks into Excel file row by row, without holding all chunks in memory.
+    Layout follows 'DataFrame.to_excel': index in first column, then 'columns'.
+    Return number of written rows.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sheet1")
+    sheet.append([None, *columns])
+
+    rows = 0
+    for chunk in chunks:
+        for row in chunk[columns].itertuples(index=True, name=None):
+            sheet.append([_cell(value) for value in row])
+        rows += len(chunk)
+
+    workbook.save(output_file)
+    return rows
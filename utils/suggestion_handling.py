@@ -0,0 +1,84 @@
+"""
+This file contains all method related to category suggestions:
+    -ngrams
+    -build_ngram_index
+    -suggest_categories
+    -suggest_for_uncategorised
+
+Suggestions use character n-gram inverted index, so each value is compared
+only with indexed strings sharing at least one n-gram.
+"""
+
+import logging
+from collections import defaultdict
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+def ngrams(value: str, n: int = 3) -> set[str]:
+    """
+    Return set of character n-grams of lowercase value with collapsed whitespace.
+    Value is padded with spaces, so short values have n-grams too.
+    """
+    value = " ".join(str(value).lower().split())
+    value = f" {value} "
+    return {value[i : i + n] for i in range(max(len(value) - n + 1, 1))}
+
+
+def build_ngram_index(entries: dict[str, str], n: int = 3) -> dict:
+    """
+    Build inverted index from 'entries' mapping string -> category.
+
+    Returns
+    -------
+    dict
+        n: n-gram length
+        values: list of (string, category, number of n-grams)
+        postings: n-gram -> list of positions in 'values'
+    """
+    values = []
+    postings = defaultdict(list)
+    for value, category in entries.items():
+        grams = ngrams(value, n)
+        for gram in grams:
+            postings[gram].append(len(values))
+        values.append((value, category, len(grams)))
+
+    LOGGER.debug("Indexed %s values with %s n-grams", len(values), len(postings))
+    return {"n": n, "values": values, "postings": dict(postings)}
+
+
+def suggest_categories(index: dict, value: str, top_k: int = 3) -> list[dict]:
+    """
+    Return up to 'top_k' candidate categories for 'value' with Dice similarity.
+    Each category is scored by its most similar indexed string.
+    """
+    grams = ngrams(value, index["n"])
+    shared = defaultdict(int)
+    for gram in grams:
+        for position in index["postings"].get(gram, ()):
+            shared[position] += 1
+
+    # Scores are compared unrounded; equal scores keep the first indexed string
+    best = {}
+    for position, count in sorted(shared.items()):
+        match, category, match_grams = index["values"][position]
+        score = 2 * count / (len(grams) + match_grams)
+        if category not in best or score > best[category]["score"]:
+            best[category] = {"category": category, "score": score, "match": match}
+
+    suggestions = sorted(best.values(), key=lambda s: s["score"], reverse=True)
+    return [
+        {**suggestion, "score": round(suggestion["score"], 3)}
+        for suggestion in suggestions[:top_k]
+    ]
+
+
+def suggest_for_uncategorised(
+    index: dict, values: list[str], top_k: int = 3
+) -> dict[str, list[dict]]:
+    """
+    Return suggestions for each uncategorised value.
+    """
+    return {value: suggest_categories(index, value, top_k) for value in values}
@@ -0,0 +1,226 @@
+"""
+This file contains all method related to monthly summary:
+    -update_summary
+    -merge_summary
+    -merge_source_summary
+    -read_summary
+    -save_summary
+    -source_summaries_file
+    -read_source_summaries
+    -save_source_summaries
+    -write_merged_summary
+
+Summary is a dictionary of running aggregates:
+    (month, category, contractor) -> [amount in grosze, number of transactions]
+Contractor is an empty string when summary is not split by contractor.
+
+With deduplication, overlapping exports contribute only their new rows to
+a month, so a month cannot be replaced by one export. Contribution of each
+source file is then kept in '<summary>_sources.json' and processing a file
+again replaces only its own previous contribution.
+"""
+
+import csv
+import json
+import logging
+import os
+from decimal import Decimal
+
+import pandas as pd
+
+from utils.amount_handling import format_amount
+
+
+LOGGER = logging.getLogger(__name__)
+
+SUMMARY_COLUMNS = ["month", "category", "contractor", "amount", "transactions"]
+
+Summary = dict[tuple[str, str, str], list]
+
+
+def _months(dates: pd.Series) -> pd.Series:
+    """
+    Convert parsed dates into 'yyyy-mm' months.
+    """
+    return pd.Series(
+        dates.to_numpy().astype("datetime64[M]").astype(str), index=dates.index
+    )
+
+
+def update_summary(
+    summary: Summary,
+    data_chunk: pd.DataFrame,
+    date_field: str,
+    amount_field: str,
+    category_field: str = "category",
+    contractor_field: str | None = None,
+) -> Summary:
+    """
+    Add categorised chunk to running aggregates in 'summary'.
+    Only aggregated values are kept, chunk can be released afterwards.
+    Provide 'contractor_field' to split summary by contractor.
+    """
+    if data_chunk.empty:
+        return summary
+
+    keys = pd.DataFrame(
+        {
+            "month": _months(data_chunk[date_field]),
+            "category": data_chunk[category_field],
+            "contractor": (
+                data_chunk[contractor_field].fillna("").astype(str).str.strip()
+                if contractor_field
+                else ""
+            ),
+        }
+    )
+    aggregates = (
+        data_chunk[amount_field]
+        .groupby([keys["month"], keys["category"], keys["contractor"]])
+        .agg(["sum", "count"])
+    )
+    for key, amount, count in aggregates.itertuples(name=None):
+        aggregate = summary.setdefault(key, [0, 0])
+        aggregate[0] += amount
+        aggregate[1] += count
+
+    return summary
+
+
+def merge_summary(existing: Summary, new: Summary, mode: str = "replace") -> Summary:
+    """
+    Merge aggregates 'new' into 'existing' summary.
+    Modes:
+    -replace: months present in 'new' replace the same months in 'existing'
+    -add: aggregates of the same months are added together
+    """
+    if mode not in ("replace", "add"):
+        raise ValueError(f"Unknown merge mode '{mode}'. Use 'replace' or 'add'.")
+
+    if mode == "replace":
+        new_months = {key[0] for key in new}
+        merged = {k: list(v) for k, v in existing.items() if k[0] not in new_months}
+    else:
+        merged = {k: list(v) for k, v in existing.items()}
+
+    for key, (amount, count) in new.items():
+        aggregate = merged.setdefault(key, [0, 0])
+        aggregate[0] += amount
+        aggregate[1] += count
+    return merged
+
+
+def merge_source_summary(
+    existing: Summary, previous: Summary | None, new: Summary
+) -> Summary:
+    """
+    Replace 'previous' contribution of one source in 'existing' summary with
+    its 'new' contribution. Aggregates of other sources are kept.
+    """
+    merged = {k: list(v) for k, v in existing.items()}
+    for key, (amount, count) in (previous or {}).items():
+        aggregate = merged.get(key)
+        if aggregate is None:
+            continue
+        aggregate[0] -= amount
+        aggregate[1] -= count
+        if aggregate[1] <= 0:
+            del merged[key]
+
+    for key, (amount, count) in new.items():
+        aggregate = merged.setdefault(key, [0, 0])
+        aggregate[0] += amount
+        aggregate[1] += count
+    return merged
+
+
+def read_summary(file_path: str) -> Summary:
+    """
+    Read summary saved by 'save_summary'. Return empty summary if file is missing.
+    """
+    if not os.path.exists(file_path):
+        return {}
+
+    summary = {}
+    with open(file_path, "r", encoding="utf-8", newline="") as file:
+        for row in csv.DictReader(file, delimiter=";"):
+            key = (row["month"], row["category"], row["contractor"])
+            amount = Decimal(row["amount"]) * 100
+            summary[key] = [int(amount), int(row["transactions"])]
+    LOGGER.debug("Read %s aggregates from %s", len(summary), file_path)
+    return summary
+
+
+def save_summary(summary: Summary, file_path: str) -> None:
+    """
+    Save summary as CSV file sorted by month, category and contractor.
+    Amounts are formatted as decimal numbers.
+    """
+    with open(file_path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file, delimiter=";")
+        writer.writerow(SUMMARY_COLUMNS)
+        for key in sorted(summary):
+            amount, count = summary[key]
+            writer.writerow([*key, format_amount(amount), count])
+
+
+def source_summaries_file(summary_file: str) -> str:
+    """
+    Return path of per-source contributions of 'summary_file',
+    e.g. 'summary.csv' -> 'summary_sources.json'.
+    """
+    return os.path.splitext(summary_file)[0] + "_sources.json"
+
+
+def read_source_summaries(file_path: str) -> dict[str, Summary]:
+    """
+    Read contributions of source files saved by 'save_source_summaries'.
+    Return empty dictionary if file is missing.
+    """
+    if not os.path.exists(file_path):
+        return {}
+    with open(file_path, "r", encoding="utf-8") as file:
+        sources = json.load(file)
+    return {
+        source: {
+            (month, category, contractor): [amount, count]
+            for month, category, contractor, amount, count in rows
+        }
+        for source, rows in sources.items()
+    }
+
+
+def save_source_summaries(sources: dict[str, Summary], file_path: str) -> None:
+    """
+    Save contributions of source files as JSON: source -> list of
+    [month, category, contractor, amount in grosze, transactions].
+    """
+    rows = {
+        source: [[*key, *summary[key]] for key in sorted(summary)]
+        for source, summary in sources.items()
+    }
+    with open(file_path, "w", encoding="utf-8") as file:
+        json.dump(rows, file, ensure_ascii=False)
+
+
+def write_merged_summary(
+    summary_file: str, new: Summary, mode: str = "replace", source: str | None = None
+) -> None:
+    """
+    Merge run summary 'new' into 'summary_file'. With 'source' (id of input
+    file of deduplicated run) previous contribution of the source is replaced
+    instead and 'mode' is not used.
+    """
+    existing = read_summary(summary_file)
+    if source is None:
+        save_summary(merge_summary(existing, new, mode), summary_file)
+        return
+
+    sources_file = source_summaries_file(summary_file)
+    sources = read_source_summaries(sources_file)
+    merged = merge_source_summary(existing, sources.get(source), new)
+    # Contributions first: after interruption the same file is processed again
+    # and its contribution replaced, instead of subtracting outdated one
+    sources[source] = new
+    save_source_summaries(sources, sources_file)
+    save_summary(merged, summary_file)
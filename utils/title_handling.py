@@ -0,0 +1,64 @@
+"""
+This file contains all method related to title normalisation:
+    -fragment_token
+    -normalise_title
+
+ING titles embed variable fragments, so almost every title is unique, e.g.
+" Płatność kartą 12.03.2025 Nr karty 4246xx2886". In normalised title
+fragments are replaced by tokens and case and diacritics are folded:
+    dates, with optional time        -> <date>
+    masked card numbers               -> <card>
+    amounts, with optional currency   -> <amount>
+    other numbers of 4+ digits        -> <number>   (terminal IDs, references)
+e.g. "platnosc karta <date> nr karty <card>". Title rules are matched
+against normalised titles, so matching and caching work on a small set of
+distinct values. Normalisation of whole columns is 'normalise_titles' in
+'data_handling', so this module does not need pandas.
+"""
+
+import re
+import unicodedata
+
+
+def _fold_table() -> dict[int, str]:
+    """
+    Return translation table of Latin letters with diacritics into ASCII
+    letters, e.g. 'ą' -> 'a', 'ł' -> 'l'.
+    """
+    table = {ord("ł"): "l", ord("Ł"): "L", ord("đ"): "d", ord("ø"): "o"}
+    for code in range(0x00C0, 0x0180):
+        base = unicodedata.normalize("NFKD", chr(code))[0]
+        if base != chr(code) and base.isascii() and base.isalpha():
+            table[code] = base
+    return table
+
+
+FOLD_TABLE = _fold_table()
+CURRENCIES = r"(?:pln|zł|zl|eur|usd|gbp|chf)"
+# Fragments of casefolded title start with digit or 'x' not preceded by word
+# character. Numbers are replaced inside words too, e.g. terminal ID 't88123456'
+TITLE_FRAGMENTS = re.compile(
+    r"(?<!\w)(?=[\dx])(?:"
+    r"(?P<date>(?:\d{4}-\d{2}-\d{2}|\d{1,2}[./-]\d{1,2}[./-]\d{4})"
+    r"(?:[ t]\d{1,2}:\d{2}(?::\d{2})?)?\b)"
+    r"|(?P<card>\d{4,6}[x*]{2,}\d{4}\b|x{4,}\d{4}\b)"
+    rf"|(?P<amount>\d{{1,3}}(?:[ .]\d{{3}})*,\d{{2}}\b(?:\s?{CURRENCIES}\b)?"
+    rf"|\d+(?:\.\d{{2}})?\s?{CURRENCIES}\b))"
+    r"|(?P<number>\d{4,})"
+)
+
+
+def fragment_token(match: re.Match) -> str:
+    """
+    Return token replacing fragment matched by 'TITLE_FRAGMENTS', e.g. '<date>'.
+    """
+    return f"<{match.lastgroup}>"
+
+
+def normalise_title(title: str) -> str:
+    """
+    Return normalised 'title': casefolded, variable fragments replaced by
+    tokens, whitespace collapsed and without diacritics.
+    """
+    title = TITLE_FRAGMENTS.sub(fragment_token, title.casefold())
+    return " ".join(title.split()).translate(FOLD_TABLE)